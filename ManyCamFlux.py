@@ -1,12 +1,14 @@
 import sys
 import os
+import argparse
+import threading
 from PyQt5.QtWidgets import (QApplication, QDialog, QVBoxLayout, QLabel, 
                            QComboBox, QDialogButtonBox, QSplashScreen, 
                            QCheckBox)
 from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QPixmap, QFont, QIcon
 
-from camera_widgets import CamFluxWidget
+# camera_widgets (and with it cv2/numpy) is imported by StartupLoader in the background
 
 def resource_path(relative_path):
     """Get absolute path to resource, works for dev and for PyInstaller
@@ -20,11 +22,97 @@ def resource_path(relative_path):
     
     return os.path.join(base_path, relative_path)
 
+class StartupLoader:
+    """Imports the heavy modules and opens the cameras while the resolution dialog is shown"""
+    def __init__(self, startup_timer):
+        self.startup_timer = startup_timer
+        self.sources = []
+        self.error = None
+        self.thread = threading.Thread(target=self._run, name="StartupLoader", daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    def _run(self):
+        try:
+            with self.startup_timer.phase("heavy imports (background)"):
+                import camera_widgets
+            with self.startup_timer.phase("camera discovery and opening (background)"):
+                from camera_source import open_available_cameras
+                self.sources = open_available_cameras()
+        except Exception as e:
+            self.error = e
+
+    def wait(self):
+        """Returns the opened camera sources once the background work is done"""
+        self.thread.join()
+        if self.error is not None:
+            raise self.error
+        return self.sources
+
+    def release(self):
+        self.thread.join()
+        for source in self.sources:
+            source.release()
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="ManyCamFlux - multiple webcam viewer")
+    parser.add_argument("--listen", metavar="[HOST:]PORT",
+                        help="accept feeds from capture nodes on this port (loopback unless HOST is given)")
+    parser.add_argument("--token", help="shared secret sent by the nodes, required when listening beyond loopback")
+    parser.add_argument("--node", metavar="HOST:PORT",
+                        help="run headless, capturing the local cameras and sending them to a viewer")
+    parser.add_argument("--node-name", help="name of this node shown on the viewer (default: hostname)")
+    parser.add_argument("--resolution", default="640x480", help="node capture resolution, e.g. 1280x720")
+    parser.add_argument("--quality", type=int, default=80, help="node JPEG quality")
+    parser.add_argument("--fps", type=int, default=15, help="node maximum frames per second per camera")
+    parser.add_argument("--profile", type=float, metavar="SECONDS",
+                        help="profile all threads for this long after startup (also Ctrl+Shift+P)")
+    parser.add_argument("--frame-bus", nargs="?", const="manycamflux", metavar="NAME",
+                        help="publish the processed frames to shared memory for local readers (see frame_bus.py)")
+    parser.add_argument("--frame-bus-composite", action="store_true",
+                        help="also publish the composite of each interval capture to the frame bus")
+    # Unknown arguments are left to Qt
+    args, qt_args = parser.parse_known_args()
+    return args, [sys.argv[0]] + qt_args
+
+def parse_listen(listen):
+    """Returns (host, port) of the --listen argument, loopback when no host is given"""
+    host, _, port = listen.rpartition(":")
+    return host or "127.0.0.1", int(port)
+
+def run_node(args):
+    """Headless capture node, no Qt involved"""
+    from remote_feeds import CaptureNode
+    host, port = args.node.rsplit(":", 1)
+    resolution = tuple(map(int, args.resolution.split("x")))
+    node = CaptureNode(host, int(port), args.node_name, resolution, args.quality, args.fps, args.token)
+    try:
+        node.run()
+    except KeyboardInterrupt:
+        node.stop()
+
 if __name__ == "__main__":
-    from utils import print_info, print_debug, print_success, print_warning
+    from utils import print_info, print_debug, print_error, print_success, print_warning, StartupTimer
+    
+    args, qt_args = parse_arguments()
+    if args.node:
+        print_info(f"Starting ManyCamFlux capture node, sending to {args.node}")
+        run_node(args)
+        sys.exit()
+    
+    listen_host, listen_port = parse_listen(args.listen) if args.listen else ("127.0.0.1", None)
+    if listen_host not in ("127.0.0.1", "localhost", "::1") and not args.token:
+        print_error("Listening beyond loopback requires --token, nodes would be accepted from anyone")
+        sys.exit(1)
     
+    startup_timer = StartupTimer()
     print_info("Starting ManyCamFlux application")
-    app = QApplication(sys.argv)
+    app = QApplication(qt_args)
+    
+    # Heavy imports and camera opening overlap with the user choosing a resolution
+    startup_loader = StartupLoader(startup_timer)
+    startup_loader.start()
     
     # Set application icon
     icon_path = resource_path(os.path.join("icon.ico"))
@@ -72,7 +160,9 @@ if __name__ == "__main__":
     layout.addWidget(buttons)
     resolution_dialog.setLayout(layout)
 
+    startup_timer.mark("resolution dialog shown")
     if resolution_dialog.exec_() == QDialog.Accepted:
+        startup_timer.mark("resolution accepted")
         resolution_text = resolution_combo.currentText()
         # Extract resolution from option
         resolution_numbers = resolution_text.split(' ')[0]  
@@ -121,7 +211,14 @@ if __name__ == "__main__":
         print_debug("Initializing main application")
         adaptive_resolution = adaptive_resolution_cb.isChecked()
         print_debug(f"Adaptive resolution: {adaptive_resolution}")
-        widget = CamFluxWidget(resolution, keep_aspect_ratio, adaptive_resolution)
+        with startup_timer.phase("waiting for background loading"):
+            sources = startup_loader.wait()
+        from camera_widgets import CamFluxWidget
+        with startup_timer.phase("main window creation"):
+            widget = CamFluxWidget(resolution, keep_aspect_ratio, adaptive_resolution,
+                                   sources=sources, startup_timer=startup_timer,
+                                   remote_port=listen_port, remote_host=listen_host,
+                                   remote_token=args.token)
         
         # Set the application icon for the main window too
         if os.path.exists(icon_path):
@@ -131,8 +228,15 @@ if __name__ == "__main__":
         splash.finish(widget)
         widget.show()
         print_success("Application started successfully")
+        
+        if args.frame_bus:
+            widget.start_frame_bus(args.frame_bus, args.frame_bus_composite)
+        
+        if args.profile:
+            widget.start_profile(args.profile)
     else:
         print_debug("User cancelled resolution selection, exiting")
+        startup_loader.release()
         sys.exit()
 
     sys.exit(app.exec_())
\ No newline at end of file
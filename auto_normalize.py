@@ -0,0 +1,76 @@
+import numpy as np
+
+# Statistics are taken on one frame in NORMALIZE_INTERVAL, subsampled to about SAMPLE_PIXELS
+NORMALIZE_INTERVAL = 15
+SAMPLE_PIXELS = 4096
+# Weight of a new measurement in the smoothed levels (lower is slower but steadier)
+SMOOTHING = 0.2
+# Share of the darkest and brightest pixels clipped by the levels stretch
+CLIP_SHARE = 0.01
+# Limits keeping flat or single-colored scenes from being over-corrected
+MIN_RANGE = 64
+MAX_BLACK_LEVEL = 64
+MAX_WB_GAIN = 2.0
+
+
+class AutoNormalizer:
+    """
+    Auto-exposure (levels stretch) and gray-world white balance of one camera, as a lookup table
+    with one column per channel.
+
+    observe() is called by the capture thread with every frame. Every NORMALIZE_INTERVAL frames
+    it measures a subsampled copy, moves the smoothed levels towards the measurement and publishes
+    a new table. Processing only applies the latest table, so the per-frame cost is the lookup.
+    """
+    def __init__(self, interval=NORMALIZE_INTERVAL, smoothing=SMOOTHING):
+        self.interval = interval
+        self.smoothing = smoothing
+        self.frames = 0
+        self.gains = None
+        self.low = 0.0
+        self.high = 255.0
+        # (version, table), replaced as a whole so readers never see a half-updated pair
+        self.table = (0, None)
+
+    def observe(self, frame):
+        self.frames += 1
+        if (self.frames - 1) % self.interval == 0:
+            self.update(frame)
+
+    def measure(self, frame):
+        """White balance gains and luma levels of a subsampled frame"""
+        h, w = frame.shape[:2]
+        step = max(1, int(np.sqrt(h * w / SAMPLE_PIXELS)))
+        channels = frame.shape[2] if frame.ndim == 3 else 1
+        sample = frame[::step, ::step].reshape(-1, channels).astype(np.float32)
+        means = sample.mean(axis=0)
+        if channels > 1:
+            gains = np.clip(means.mean() / np.maximum(means, 1.0), 1 / MAX_WB_GAIN, MAX_WB_GAIN)
+        else:
+            gains = np.ones(1, dtype=np.float32)
+
+        luma = np.clip((sample * gains).mean(axis=1), 0, 255).astype(np.uint8)
+        cdf = np.cumsum(np.bincount(luma, minlength=256))
+        low = np.searchsorted(cdf, CLIP_SHARE * cdf[-1])
+        high = np.searchsorted(cdf, (1 - CLIP_SHARE) * cdf[-1])
+        return gains, float(low), float(high)
+
+    def update(self, frame):
+        gains, low, high = self.measure(frame)
+        if self.gains is None or len(self.gains) != len(gains):
+            # First measurement (or the camera switched to/from grayscale)
+            self.gains, self.low, self.high = gains, low, high
+        else:
+            self.gains = self.gains + self.smoothing * (gains - self.gains)
+            self.low += self.smoothing * (low - self.low)
+            self.high += self.smoothing * (high - self.high)
+
+        # Mostly bright scenes keep their midtones instead of having them pulled to black
+        low, high = min(self.low, MAX_BLACK_LEVEL), self.high
+        if high - low < MIN_RANGE:
+            low = max(0.0, (low + high - MIN_RANGE) / 2)
+            high = low + MIN_RANGE
+        values = np.arange(256, dtype=np.float32).reshape(256, 1)
+        lut = np.clip((values * self.gains - low) * 255 / (high - low) + 0.5, 0, 255).astype(np.uint8)
+        lut.flags.writeable = False
+        self.table = (self.table[0] + 1, lut)
@@ -0,0 +1,421 @@
+import threading
+import time
+import zlib
+
+import cv2
+
+from utils import print_debug, print_error, print_success, print_warning
+from profiler import stage
+from memory_budget import array_bytes
+from auto_normalize import AutoNormalizer
+
+STATE_OK = "ok"
+STATE_DEGRADED = "degraded"
+
+# imdecode flags of the reduced-scale JPEG decoding (the IDCT only computes the needed pixels)
+PREVIEW_DECODE_FLAGS = {
+    1: cv2.IMREAD_COLOR,
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    8: cv2.IMREAD_REDUCED_COLOR_8,
+}
+# Same for grayscale cameras, only the luma plane is decoded
+PREVIEW_DECODE_GRAY_FLAGS = {
+    1: cv2.IMREAD_GRAYSCALE,
+    2: cv2.IMREAD_REDUCED_GRAYSCALE_2,
+    4: cv2.IMREAD_REDUCED_GRAYSCALE_4,
+    8: cv2.IMREAD_REDUCED_GRAYSCALE_8,
+}
+
+
+class CameraSource:
+    """
+    Reads a camera on its own thread and keeps the latest frame.
+
+    Exposes the subset of the cv2.VideoCapture API used by the widgets (read, get, set,
+    isOpened, release), so it can stand in for a capture. read() never blocks: it returns
+    the latest frame, which callers must treat as read-only.
+    """
+    def __init__(self, index, cap=None):
+        self.index = index
+        self.cap = cap if cap is not None else cv2.VideoCapture(index)
+        # Properties set before/after opening, re-applied when the device is reopened
+        self.properties = {}
+
+        self.lock = threading.Lock()
+        self.frame = None
+        self.seq = 0
+        self.frame_time = 0.0
+
+        # Raw MJPEG mode: the reader keeps the compressed payload and decodes a reduced preview,
+        # full frames are only decoded when read() asks for them (snapshots, recording)
+        self.raw_requested = False
+        self.raw_active = False
+        # Pixel format of the device before raw mode switched it to MJPG, restored when turned off
+        self.native_fourcc = 0
+        self.preview_scale = 1
+        self.payload = None
+        self.payload_scale = 1
+        self.full_frame = None
+        self.full_seq = 0
+        # Full frames are decoded again for every read when memory is short
+        self.cache_full_frames = True
+        # Full resolution of the last frame, to choose the preview scale
+        self.full_size = None
+
+        # Monochrome/IR cameras: frames are kept single-channel from the reader on
+        self.grayscale = False
+        # Auto-exposure/white balance, measured by the reader every few frames
+        self.normalizer = None
+
+        # Frames decoded per second when throttled (cameras off the current wall page), 0 for all
+        self.max_fps = 0
+        self.retrieve_time = 0.0
+
+        self.running = False
+        self.generation = 0
+        self.reader_thread = None
+        self.reopen_thread = None
+
+        # Health tracking, updated by the reader and checked by the watchdog
+        self.state = STATE_OK
+        self.consecutive_failures = 0
+        self.identical_frames = 0
+        self.last_fingerprint = None
+        # Frame that was frozen before the last reopen: if it comes back the scene is just static
+        self.frozen_fingerprint = None
+        self.faults = {"read_failure": 0, "frozen": 0, "stall": 0}
+        self.recoveries = 0
+        self.degraded_since = None
+        self.last_recovery_time = None
+        self.total_recovery_time = 0.0
+
+    # cv2.VideoCapture compatible API
+
+    def read(self):
+        with self.lock:
+            if self.payload is None or self.payload_scale == 1:
+                return self.frame is not None, self.frame
+            seq, payload = self.seq, self.payload
+            if self.full_seq == seq:
+                return True, self.full_frame
+        # Only the preview was decoded, decode the full frame once for this sequence
+        frame = cv2.imdecode(payload, cv2.IMREAD_GRAYSCALE if self.grayscale else cv2.IMREAD_COLOR)
+        if frame is None:
+            return False, None
+        with self.lock:
+            if self.seq == seq and self.cache_full_frames:
+                self.full_frame = frame
+                self.full_seq = seq
+        return True, frame
+
+    def latest(self):
+        """Returns (seq, frame) of the newest frame, seq 0 if none yet"""
+        with self.lock:
+            return self.seq, self.frame
+
+    def get(self, prop):
+        return self.cap.get(prop)
+
+    def set(self, prop, value):
+        self.properties[prop] = value
+        return self.cap.set(prop, value)
+
+    def set_raw_mode(self, enabled):
+        """Grab MJPEG payloads and decode them at preview size (applied by the reader between reads)"""
+        self.raw_requested = enabled
+
+    def set_preview_size(self, width, height):
+        """
+        Chooses the largest reduced decoding scale that still gives at least width x height
+        (in full-frame pixels) to the preview
+        """
+        scale = 1
+        if self.full_size is not None and width > 0 and height > 0:
+            full_w, full_h = self.full_size
+            for candidate in (2, 4, 8):
+                if full_w / candidate >= width and full_h / candidate >= height:
+                    scale = candidate
+        if scale != self.preview_scale:
+            print_debug(f"Camera {self.index} preview decoded at 1/{scale} scale")
+            self.preview_scale = scale
+
+    def set_max_fps(self, fps):
+        """Limits decoding to fps frames per second, the other frames are grabbed and dropped"""
+        self.max_fps = fps
+
+    def set_grayscale(self, enabled):
+        """Single-channel frames (applied from the next frame on)"""
+        self.grayscale = enabled
+        with self.lock:
+            self.full_frame = None
+            self.full_seq = 0
+
+    def set_auto_normalize(self, enabled):
+        if not enabled:
+            self.normalizer = None
+        elif self.normalizer is None:
+            self.normalizer = AutoNormalizer()
+
+    def set_cache_full_frames(self, enabled):
+        self.cache_full_frames = enabled
+        if not enabled:
+            with self.lock:
+                self.full_frame = None
+                self.full_seq = 0
+
+    def memory_usage(self):
+        """Bytes held by the latest frame, its MJPEG payload and the cached full decode"""
+        with self.lock:
+            return array_bytes(self.frame, self.payload, self.full_frame)
+
+    def isOpened(self):
+        return self.running or self.cap.isOpened()
+
+    def release(self):
+        self.stop()
+
+    # Reader thread
+
+    def start(self):
+        self.running = True
+        self.frame_time = time.monotonic()
+        self._start_reader()
+
+    def stop(self):
+        # Under the lock, a reopen in progress sees the stop before starting a new reader
+        with self.lock:
+            self.running = False
+            self.generation += 1
+        if self.reader_thread is None:
+            self._release(self.cap)
+            return
+        # The reader releases its capture on exit. A wedged read cannot be interrupted,
+        # do not wait on it forever: the capture is released once the read returns.
+        self.reader_thread.join(timeout=1.0)
+
+    def _release(self, cap):
+        try:
+            cap.release()
+        except Exception as e:
+            print_error(f"Failed to release camera {self.index}: {str(e)}")
+
+    def _start_reader(self):
+        self.generation += 1
+        self.reader_thread = threading.Thread(
+            target=self._reader_loop, args=(self.generation, self.cap),
+            name=f"CameraReader-{self.index}", daemon=True)
+        self.reader_thread.start()
+
+    def _apply_raw_mode(self, cap, enabled):
+        if enabled:
+            self.native_fourcc = cap.get(cv2.CAP_PROP_FOURCC)
+            cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*"MJPG"))
+        elif self.native_fourcc:
+            # Back to the format the camera was opened with (e.g. YUYV)
+            cap.set(cv2.CAP_PROP_FOURCC, self.native_fourcc)
+        cap.set(cv2.CAP_PROP_CONVERT_RGB, 0 if enabled else 1)
+        self.raw_active = enabled
+        with self.lock:
+            self.payload = None
+
+    def _reader_loop(self, generation, cap):
+        try:
+            self._read_frames(generation, cap)
+        finally:
+            # Releasing while another thread is inside read() crashes some backends,
+            # so the capture is only released here, once the last read has returned
+            self._release(cap)
+
+    def _read_frames(self, generation, cap):
+        self.raw_active = False
+        while self.running and generation == self.generation:
+            if self.raw_requested != self.raw_active:
+                self._apply_raw_mode(cap, self.raw_requested)
+            if self.max_fps and time.monotonic() - self.retrieve_time < 1.0 / self.max_fps:
+                # Throttled: dequeue the frame so the next decoded one is recent, but skip decoding it
+                with stage("camera grab"):
+                    grabbed = cap.grab()
+                if grabbed:
+                    self.consecutive_failures = 0
+                    self.frame_time = time.monotonic()
+                else:
+                    self.consecutive_failures += 1
+                    time.sleep(0.05)
+                continue
+            self.retrieve_time = time.monotonic()
+            with stage("camera read"):
+                ret, frame = cap.read()
+            if generation != self.generation:
+                # The device was reopened while this read was stuck
+                break
+            payload = None
+            scale = 1
+            if ret and frame is not None and self.raw_active and (frame.ndim == 1 or frame.shape[0] == 1):
+                # Compressed MJPEG payload (backends ignoring CONVERT_RGB return decoded frames as usual)
+                payload = frame.reshape(-1)
+                scale = self.preview_scale
+                flags = PREVIEW_DECODE_GRAY_FLAGS if self.grayscale else PREVIEW_DECODE_FLAGS
+                with stage("preview decode"):
+                    frame = cv2.imdecode(payload, flags[scale])
+            elif ret and frame is not None and self.grayscale and frame.ndim == 3:
+                # Converted once here, every later stage handles a third of the data
+                with stage("grayscale convert"):
+                    frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+            if not ret or frame is None:
+                self.consecutive_failures += 1
+                time.sleep(0.05)
+                continue
+
+            # Sparse checksum, enough to spot a driver returning the same buffer forever
+            with stage("frozen check"):
+                fingerprint = zlib.crc32(frame[::16, ::16].tobytes())
+            if fingerprint == self.last_fingerprint:
+                self.identical_frames += 1
+            else:
+                self.identical_frames = 0
+            self.last_fingerprint = fingerprint
+            self.consecutive_failures = 0
+
+            normalizer = self.normalizer
+            if normalizer is not None:
+                with stage("auto normalize"):
+                    normalizer.observe(frame)
+
+            self.full_size = (frame.shape[1] * scale, frame.shape[0] * scale)
+            with self.lock:
+                self.frame = frame
+                self.payload = payload
+                self.payload_scale = scale
+                self.seq += 1
+                self.frame_time = time.monotonic()
+
+    # Health
+
+    def check_health(self, now, failure_threshold=10, frozen_threshold=150, stall_timeout=3.0):
+        """Called by the watchdog. Returns the detected fault or None."""
+        if self.state != STATE_OK or not self.running:
+            return None
+
+        fault = None
+        if self.consecutive_failures >= failure_threshold:
+            fault = "read_failure"
+        elif self.identical_frames >= frozen_threshold and self.last_fingerprint != self.frozen_fingerprint:
+            # The same image after a reopen is a static scene (or a covered lens), not a fault
+            fault = "frozen"
+        elif now - self.frame_time > stall_timeout:
+            fault = "stall"
+
+        if fault is not None:
+            self.faults[fault] += 1
+            if fault == "frozen":
+                self.frozen_fingerprint = self.last_fingerprint
+            self.state = STATE_DEGRADED
+            self.degraded_since = now
+            print_warning(f"Camera {self.index} degraded ({fault}), reopening in background")
+            self.reopen_thread = threading.Thread(
+                target=self._reopen_loop, name=f"CameraReopen-{self.index}", daemon=True)
+            self.reopen_thread.start()
+        return fault
+
+    def _reopen_loop(self, initial_delay=0.5, max_delay=30.0):
+        delay = initial_delay
+        # Orphan the current reader, it exits and releases its capture as soon as its read returns
+        with self.lock:
+            self.generation += 1
+            generation = self.generation
+        while self.running:
+            time.sleep(delay)
+            if not self.running:
+                return
+
+            cap = cv2.VideoCapture(self.index)
+            if cap.isOpened():
+                for prop, value in self.properties.items():
+                    cap.set(prop, value)
+                with self.lock:
+                    # Stopped (or released) while the device was opening: the new capture is not used
+                    stopped = not self.running or generation != self.generation
+                    if not stopped:
+                        self.cap = cap
+                        self.consecutive_failures = 0
+                        self.identical_frames = 0
+                        self.last_fingerprint = None
+                        now = time.monotonic()
+                        self.frame_time = now
+                        self._start_reader()
+                if stopped:
+                    self._release(cap)
+                    return
+
+                self.last_recovery_time = now - self.degraded_since
+                self.total_recovery_time += self.last_recovery_time
+                self.recoveries += 1
+                self.state = STATE_OK
+                print_success(f"Camera {self.index} recovered in {self.last_recovery_time:.1f}s")
+                return
+
+            cap.release()
+            print_debug(f"Camera {self.index} still unavailable, next attempt in {delay * 2:.1f}s")
+            delay = min(delay * 2, max_delay)
+
+    def health_report(self):
+        return {
+            "state": self.state,
+            "faults": dict(self.faults),
+            "recoveries": self.recoveries,
+            "last_recovery_time": self.last_recovery_time,
+            "average_recovery_time": self.total_recovery_time / self.recoveries if self.recoveries else None,
+            "frames": self.seq,
+        }
+
+
+def open_available_cameras(max_cameras=10):
+    """
+    Probes camera indices and keeps the devices that open as (not yet started) sources,
+    so each camera is opened only once
+    """
+    sources = []
+    for i in range(max_cameras):
+        cap = cv2.VideoCapture(i)
+        if cap.isOpened():
+            sources.append(CameraSource(i, cap))
+        else:
+            cap.release()
+    return sources
+
+
+class CameraWatchdog:
+    """Periodically checks the health of camera sources on a background thread"""
+    def __init__(self, sources, interval=0.5):
+        self.sources = list(sources)
+        self.interval = interval
+        self.running = False
+        self.thread = None
+
+    def add_source(self, source):
+        self.sources.append(source)
+
+    def remove_source(self, source):
+        if source in self.sources:
+            self.sources.remove(source)
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self._loop, name="CameraWatchdog", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+        if self.thread is not None:
+            self.thread.join(timeout=2)
+
+    def _loop(self):
+        while self.running:
+            now = time.monotonic()
+            for source in list(self.sources):
+                try:
+                    source.check_health(now)
+                except Exception as e:
+                    print_error(f"Watchdog check failed for camera {source.index}: {str(e)}")
+            time.sleep(self.interval)
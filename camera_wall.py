@@ -0,0 +1,20 @@
+# 0 page size shows every camera on one page, 0 cycle seconds means manual paging
+DEFAULT_WALL_SETTINGS = {
+    "page_size": 0,
+    "cycle_seconds": 0,
+    "offpage_fps": 2,
+}
+
+
+def paginate(widgets, page_size):
+    """
+    Splits the cameras of the wall in pages. Pinned cameras are shown first on every page
+    and take their share of the page size.
+    """
+    if page_size <= 0 or len(widgets) <= page_size:
+        return [list(widgets)]
+    pinned = [w for w in widgets if w.pinned]
+    others = [w for w in widgets if not w.pinned]
+    per_page = max(1, page_size - len(pinned))
+    pages = [pinned + others[i:i + per_page] for i in range(0, len(others), per_page)]
+    return pages or [pinned]
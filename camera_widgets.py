@@ -3,24 +3,65 @@ import numpy as np
 import os
 import json
 import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
 from PyQt5.QtWidgets import (QLabel, QWidget, QGridLayout, QVBoxLayout, 
                             QHBoxLayout, QPushButton, QMessageBox, QFileDialog,
-                            QMenu, QAction, QSizePolicy)
-from PyQt5.QtCore import Qt, QTimer, QDateTime
+                            QMenu, QAction, QSizePolicy, QRubberBand)
+from PyQt5.QtCore import Qt, QTimer, QDateTime, QRect, pyqtSignal
 from PyQt5.QtGui import QImage, QPixmap, QPainter, QColor, QFont, QCursor
 
-from utils import get_available_cameras, print_info, print_debug, print_error, print_success, print_warning
+from utils import print_info, print_debug, print_error, print_success, print_warning
 from dialogs import GlobalControlDialog, ScreenshotDialog
+from stream_server import MJPEGStreamServer
+from frame_bus import FrameBus, DEFAULT_BUS_SLOTS
+from capture_export import CaptureExporter, DEFAULT_EXPORT_SETTINGS, safe_filename
+from scheduler import CaptureScheduler, DEFAULT_SCHEDULE_SETTINGS, COMPOSITE_KEY, parse_window
+from timelapse import DEFAULT_TIMELAPSE_SETTINGS
+from retention import DEFAULT_RETENTION_SETTINGS
+from camera_wall import DEFAULT_WALL_SETTINGS, paginate
+from memory_budget import (DEFAULT_MEMORY_SETTINGS, LEVEL_DROP_PREVIEWS, LEVEL_SHRINK_BUFFERS,
+                           MemoryAccountant)
+from camera_source import CameraWatchdog, STATE_OK, open_available_cameras
+from remote_feeds import RemoteFeedServer
+from device_monitor import DeviceMonitor, device_identity
+from frame_batch import brightness_contrast_lut, saturation_lut, process_frames
+from profiler import SamplingProfiler, stage
+from overlay import (DEFAULT_OVERLAY_SETTINGS, content_offset, draw_overlay, format_timestamp,
+                     label_image, overlay_enabled, reserved_height)
+
+def fit_tile_size(widget, frame, width, height):
+    """Size of a tile in a screenshot cell; cropped cameras keep the aspect ratio of their region"""
+    if not widget.has_crop():
+        return width, height
+    h, w = frame.shape[:2]
+    scale = min(width / w, height / h)
+    return max(1, int(w * scale)), max(1, int(h * scale))
 
 class CamFeedWidget(QLabel):
-    def __init__(self, cap, parent=None, name=""):
+    def __init__(self, cap, parent=None, name="", camera_id=None):
         super().__init__(parent)
         self.cap = cap
+        self.camera_id = camera_id
+        # Stable device name used to match saved settings (see device_identity)
+        self.identity = device_identity(camera_id) if camera_id is not None else None
         self.rotation_angle = 0
         self.brightness = 0
         self.contrast = 0
         self.saturation = 0
+        # Region of interest as (x, y, w, h) fractions of the sensor, None for the full frame
+        self.roi = None
+        self.zoom = 1.0
         self.name = name
+        # Pinned cameras are shown on every page of the camera wall
+        self.pinned = False
+        self.on_page = True
+        # Monochrome/IR cameras are processed, displayed and saved single-channel
+        self.grayscale = False
+        # Auto-exposure/white balance measured by the source, folded into the adjustment table
+        self.auto_normalize = False
+        self.combined_lut_key = None
+        self.combined_lut = None
         
         self.original_width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
         self.original_height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
@@ -45,6 +86,17 @@ class CamFeedWidget(QLabel):
         
         self.original_pixmap = None
         self.scaled_pixmap = None
+        self.name_bar = None
+        
+        # Sequence number of the camera frame on screen, frames are only processed once
+        self.displayed_seq = -1
+        self.settings_dirty = True
+        self.shown_degraded = False
+        
+        # Dragging a rectangle on the tile selects the region of interest
+        self.roi_select_mode = False
+        self.roi_rubber_band = None
+        self.roi_drag_origin = None
 
 
     def show_context_menu(self, position):
@@ -63,15 +115,86 @@ class CamFeedWidget(QLabel):
         fullscreen_action = QAction("Full Screen", self)
         fullscreen_action.triggered.connect(lambda: self.parent_widget.show_fullscreen(self))
         
+        select_roi_action = QAction("Select Region (drag)", self)
+        select_roi_action.triggered.connect(self.start_roi_selection)
+        
+        reset_roi_action = QAction("Reset Region", self)
+        reset_roi_action.triggered.connect(lambda: self.parent_widget.set_roi(
+            self.parent_widget.cam_widgets.index(self), None, 1.0))
+        reset_roi_action.setEnabled(self.has_crop())
+        
+        zoom_menu = QMenu("Digital Zoom", self)
+        for zoom in (1.0, 1.5, 2.0, 3.0, 4.0):
+            zoom_action = QAction(f"{zoom:g}x", self)
+            zoom_action.setCheckable(True)
+            zoom_action.setChecked(self.zoom == zoom)
+            zoom_action.triggered.connect(lambda _, z=zoom: self.parent_widget.set_roi(
+                self.parent_widget.cam_widgets.index(self), self.roi, z))
+            zoom_menu.addAction(zoom_action)
+        
+        health_action = QAction("Camera Health", self)
+        health_action.triggered.connect(self.show_health)
+        
+        pin_action = QAction("Pin to Every Page", self)
+        pin_action.setCheckable(True)
+        pin_action.setChecked(self.pinned)
+        pin_action.triggered.connect(lambda checked: self.parent_widget.set_pinned(
+            self.parent_widget.cam_widgets.index(self), checked))
+        
+        grayscale_action = QAction("Grayscale", self)
+        grayscale_action.setCheckable(True)
+        grayscale_action.setChecked(self.grayscale)
+        grayscale_action.triggered.connect(lambda checked: self.parent_widget.set_grayscale(
+            self.parent_widget.cam_widgets.index(self), checked))
+        
+        auto_action = QAction("Auto Exposure/White Balance", self)
+        auto_action.setCheckable(True)
+        auto_action.setChecked(self.auto_normalize)
+        auto_action.triggered.connect(lambda checked: self.parent_widget.set_auto_normalize(
+            self.parent_widget.cam_widgets.index(self), checked))
+        
         menu.addAction(snapshot_action)
         menu.addSeparator()
         menu.addAction(rotate_left)
         menu.addAction(rotate_right)
         menu.addSeparator()
+        menu.addAction(select_roi_action)
+        menu.addAction(reset_roi_action)
+        menu.addMenu(zoom_menu)
+        menu.addAction(grayscale_action)
+        menu.addAction(auto_action)
+        menu.addSeparator()
         menu.addAction(fullscreen_action)
+        menu.addAction(pin_action)
+        menu.addAction(health_action)
         
         menu.exec_(QCursor.pos())
 
+    def is_degraded(self):
+        return getattr(self.cap, "state", STATE_OK) != STATE_OK
+
+    def show_health(self):
+        if not hasattr(self.cap, "health_report"):
+            return
+        report = self.cap.health_report()
+        faults = ", ".join(f"{name}: {count}" for name, count in report["faults"].items())
+        lines = [
+            f"State: {report['state']}",
+            f"Frames received: {report['frames']}",
+            f"Faults: {faults}",
+            f"Recoveries: {report['recoveries']}",
+        ]
+        if "link" in report:
+            lines.append(f"Link: {report['link']}")
+            lines.append(f"Bandwidth: {report['bandwidth_kbps']} kbit/s")
+            if report["latency_ms"] is not None:
+                lines.append(f"Latency: {report['latency_ms']} ms")
+        if report["last_recovery_time"] is not None:
+            lines.append(f"Last recovery time: {report['last_recovery_time']:.1f}s")
+            lines.append(f"Average recovery time: {report['average_recovery_time']:.1f}s")
+        print_info(f"Health of {self.name}: {report}")
+        QMessageBox.information(self, "Camera Health", f"{self.name}\n\n" + "\n".join(lines))
+
     def take_snapshot(self):
         # Créer un dossier de snapshots s'il n'existe pas
         snapshot_folder = os.path.join(os.path.expanduser("~"), "Pictures", "ManyCamFlux_snapshots")
@@ -86,25 +209,17 @@ class CamFeedWidget(QLabel):
         ret, frame = self.cap.read()
         if ret:
             # Appliquer les ajustements
+            frame = self.apply_roi(frame)
             frame = self.apply_rotation(frame)
             frame = self.apply_brightness_contrast(frame)
             frame = self.apply_saturation(frame)
             
-            # Ajouter le nom de la caméra si l'option est activée
-            if hasattr(self.parent_widget, 'show_labels_in_screenshots') and self.parent_widget.show_labels_in_screenshots:
-                # Ajouter une barre de texte en bas
-                text_bar = np.zeros((30, frame.shape[1], 3), dtype=np.uint8)
-                frame = np.vstack([frame, text_bar])
-                
-                cv2.putText(
-                    frame,
-                    self.name,
-                    (10, frame.shape[0] - 10),
-                    cv2.FONT_HERSHEY_SIMPLEX,
-                    0.7,
-                    (255, 255, 255),
-                    2
-                )
+            # Ajouter le nom de la caméra (et l'horodatage) si l'option est activée
+            show_name = self.parent_widget.show_labels_in_screenshots
+            settings = self.parent_widget.overlay_settings
+            if overlay_enabled(show_name, settings):
+                timestamp = format_timestamp(settings) if settings["timestamp"] else None
+                frame = label_image(frame, self.name if show_name else None, settings, timestamp)
             
             # Sauvegarder l'image
             cv2.imwrite(filename, frame)
@@ -112,20 +227,69 @@ class CamFeedWidget(QLabel):
             # Notifier l'utilisateur
             QMessageBox.information(self, "Snapshot", f"Snapshot sauvegardé:\n{filename}")
 
+    def invalidate(self):
+        """Forces the next tick to reprocess the current frame (a setting changed)"""
+        self.settings_dirty = True
+
+    def poll_frame(self):
+        """
+        Returns the new frame cropped to the ROI, or None when there is nothing to redraw
+        """
+        # Only repaint the status overlay when the degraded state flips
+        degraded = self.is_degraded()
+        if degraded != self.shown_degraded:
+            self.shown_degraded = degraded
+            self.update()
+        
+        seq, frame = self.cap.latest()
+        if frame is None:
+            # No frame yet or camera lost: keep the last image
+            return None
+        if seq == self.displayed_seq and not self.settings_dirty:
+            # Nothing new from the camera and no setting changed, skip all the work
+            return None
+        self.displayed_seq = seq
+        if self.settings_dirty:
+            # ROI, zoom or rotation may have changed how many camera pixels the tile shows
+            self.update_preview_size()
+        self.settings_dirty = False
+        return self.apply_roi(frame)
+
     def update_frame(self):
-        ret, frame = self.cap.read()
-        if not ret:
-            frame = np.zeros((self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT), self.cap.get(cv2.CAP_PROP_FRAME_WIDTH), 3), dtype=np.uint8)
+        frame = self.poll_frame()
+        if frame is None:
+            return
+        
         frame = self.apply_rotation(frame)
         frame = self.apply_brightness_contrast(frame)
         frame = self.apply_saturation(frame)
-        frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        h, w, ch = frame.shape
-        bytes_per_line = ch * w
-        qimg = QImage(frame.data, w, h, bytes_per_line, QImage.Format_RGB888)
+        self.show_frame(frame)
+
+    def show_frame(self, frame, is_rgb=False):
+        """Displays a processed frame (and shares it with the restreaming server and frame bus)"""
+        if not is_rgb:
+            # Share the processed frame with the restreaming server (encoded there on demand)
+            if self.parent_widget.stream_server is not None:
+                self.parent_widget.stream_server.publish(self.camera_id, self.name, frame)
+            if self.parent_widget.frame_bus is not None:
+                self.parent_widget.frame_bus.publish(self.camera_id, self.name, frame)
+            if frame.ndim == 3:
+                frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        
+        if frame.ndim == 2:
+            # Grayscale cameras are displayed without expanding to RGB
+            h, w = frame.shape
+            qimg = QImage(frame.data, w, h, w, QImage.Format_Grayscale8)
+        else:
+            h, w, ch = frame.shape
+            bytes_per_line = ch * w
+            qimg = QImage(frame.data, w, h, bytes_per_line, QImage.Format_RGB888)
         
         self.original_pixmap = QPixmap.fromImage(qimg)
         self.updateScaledPixmap()
+        if self.parent_widget.memory.level >= LEVEL_DROP_PREVIEWS and self.scaled_pixmap is not None:
+            # Short on memory: only the tile-sized pixmap is kept
+            self.original_pixmap = self.scaled_pixmap
         
     def updateScaledPixmap(self):
         if self.original_pixmap is None:
@@ -163,9 +327,61 @@ class CamFeedWidget(QLabel):
         
     def resizeEvent(self, event):
         super().resizeEvent(event)
+        if self.original_pixmap is not None and self.original_pixmap is self.scaled_pixmap:
+            # The full-size pixmap was dropped (memory budget), redraw from the camera frame
+            self.invalidate()
         self.updateScaledPixmap()
+        self.update_preview_size()
+
+    def preview_memory_usage(self):
+        pixmaps = {id(pixmap): pixmap for pixmap in (self.original_pixmap, self.scaled_pixmap) if pixmap is not None}
+        return sum(pixmap.width() * pixmap.height() * pixmap.depth() // 8 for pixmap in pixmaps.values())
+
+    def release_preview(self):
+        """Frees the pixmaps of a tile that is not shown, it is redrawn from the next frame"""
+        self.original_pixmap = None
+        self.scaled_pixmap = None
+        self.clear()
+        self.invalidate()
+
+    def update_preview_size(self):
+        """Tells the source how many camera pixels the tile needs, MJPEG previews are decoded no larger"""
+        if not hasattr(self.cap, "set_preview_size"):
+            return
+        ratio = self.devicePixelRatioF()
+        w, h = self.width() * ratio, self.height() * ratio
+        if self.rotation_angle in [90, 270]:
+            w, h = h, w
+        _, _, crop_w, crop_h = self.effective_crop()
+        self.cap.set_preview_size(w / crop_w, h / crop_h)
 
         
+    def has_crop(self):
+        return self.roi is not None or self.zoom != 1.0
+
+    def effective_crop(self):
+        """ROI with the digital zoom applied, as (x, y, w, h) fractions of the sensor"""
+        x, y, w, h = self.roi if self.roi is not None else (0.0, 0.0, 1.0, 1.0)
+        if self.zoom != 1.0:
+            # Zoom into the centre of the region
+            zoomed_w, zoomed_h = w / self.zoom, h / self.zoom
+            x += (w - zoomed_w) / 2
+            y += (h - zoomed_h) / 2
+            w, h = zoomed_w, zoomed_h
+        return x, y, w, h
+
+    def apply_roi(self, frame):
+        # Slicing returns a view, the crop costs no copy and later stages only see the region
+        if not self.has_crop():
+            return frame
+        frame_h, frame_w = frame.shape[:2]
+        x, y, w, h = self.effective_crop()
+        x0 = int(x * frame_w)
+        y0 = int(y * frame_h)
+        x1 = max(x0 + 1, int((x + w) * frame_w))
+        y1 = max(y0 + 1, int((y + h) * frame_h))
+        return frame[y0:y1, x0:x1]
+
     def apply_rotation(self, frame):
         if self.rotation_angle == 90:
             frame = cv2.rotate(frame, cv2.ROTATE_90_CLOCKWISE)
@@ -175,23 +391,46 @@ class CamFeedWidget(QLabel):
             frame = cv2.rotate(frame, cv2.ROTATE_90_COUNTERCLOCKWISE)
         return frame
 
+    def adjustment_lut(self, channels):
+        """
+        Brightness/contrast table with the auto-normalization of the source folded in when enabled
+        (one column per channel). None when the table would leave the frame unchanged.
+        """
+        normalizer = getattr(self.cap, "normalizer", None) if self.auto_normalize else None
+        version, auto_lut = normalizer.table if normalizer is not None else (0, None)
+        if auto_lut is None or auto_lut.shape[1] != channels:
+            # Not measured yet, or measured before a grayscale mode change
+            if self.brightness == 0 and self.contrast == 0:
+                return None
+            return brightness_contrast_lut(self.brightness, self.contrast)
+        key = (id(normalizer), version, self.brightness, self.contrast)
+        if key != self.combined_lut_key:
+            # Rebuilt once per measurement, not per frame
+            lut = brightness_contrast_lut(self.brightness, self.contrast)[auto_lut]
+            self.combined_lut = lut.reshape(256) if channels == 1 else lut
+            self.combined_lut_key = key
+        return self.combined_lut
+
     def apply_brightness_contrast(self, frame):
-        frame = cv2.convertScaleAbs(frame, alpha=1 + self.contrast / 100, beta=self.brightness)
-        return frame
+        # Cached lookup table, same result as convertScaleAbs (auto-normalization folded in)
+        lut = self.adjustment_lut(frame.shape[2] if frame.ndim == 3 else 1)
+        if lut is None:
+            # Identity table, no lookup pass
+            return frame
+        return cv2.LUT(frame, lut.reshape(1, 256, -1) if lut.ndim == 2 else lut)
     
     def apply_saturation(self, frame):
-        # Convertir en HSV pour modifier la saturation
-        if self.saturation != 0:
-            hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV).astype("float32")
+        # Convertir en HSV pour modifier la saturation (sans effet en niveaux de gris)
+        if self.saturation != 0 and frame.ndim == 3:
+            hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
             (h, s, v) = cv2.split(hsv)
             
             # Ajuster la saturation
-            s = s * (1 + self.saturation / 100)
-            s = np.clip(s, 0, 255)
+            s = cv2.LUT(s, saturation_lut(self.saturation))
             
             # Fusionner les canaux et reconvertir en BGR
             hsv = cv2.merge([h, s, v])
-            frame = cv2.cvtColor(hsv.astype("uint8"), cv2.COLOR_HSV2BGR)
+            frame = cv2.cvtColor(hsv, cv2.COLOR_HSV2BGR)
         return frame
 
     def paintEvent(self, event):
@@ -206,14 +445,112 @@ class CamFeedWidget(QLabel):
             else:
                 painter.drawPixmap(0, 0, self.width(), self.height(), self.scaled_pixmap)
             
+            painter.drawPixmap(0, self.height() - 30, self.name_bar_pixmap())
+            painter.end()
+        else:
+            super().paintEvent(event)
+        
+        if self.is_degraded():
+            # Camera lost or frozen, the watchdog is reopening it
+            painter = QPainter(self)
+            painter.setPen(QColor(255, 80, 80))
+            painter.setBrush(QColor(0, 0, 0, 180))
+            painter.drawRect(0, 0, self.width(), 30)
+            painter.drawText(10, 20, "Camera degraded, reconnecting...")
+            painter.end()
+
+    def name_bar_pixmap(self):
+        """Name bar drawn over the tile, rendered again only when the name or width changes"""
+        key = (self.name, self.width(), self.devicePixelRatioF())
+        if self.name_bar is None or self.name_bar[0] != key:
+            ratio = key[2]
+            pixmap = QPixmap(int(self.width() * ratio), int(30 * ratio))
+            pixmap.setDevicePixelRatio(ratio)
+            pixmap.fill(Qt.transparent)
+            painter = QPainter(pixmap)
+            painter.setFont(self.font())
             painter.setPen(QColor(255, 255, 255))
             painter.setBrush(QColor(0, 0, 0, 180))  # Fond semi-transparent
-            painter.drawRect(0, self.height() - 30, self.width(), 30)
-            painter.drawText(10, self.height() - 10, self.name)
-            
+            painter.drawRect(0, 0, self.width(), 30)
+            painter.drawText(10, 20, self.name)
             painter.end()
+            self.name_bar = (key, pixmap)
+        return self.name_bar[1]
+
+    def start_roi_selection(self):
+        self.roi_select_mode = True
+        self.setCursor(Qt.CrossCursor)
+        print_debug(f"Drag a rectangle on {self.name} to select its region")
+
+    def pixmap_rect(self):
+        """Area of the widget covered by the displayed frame"""
+        if self.scaled_pixmap is not None and self.parent_widget.keep_aspect_ratio:
+            x = (self.width() - self.scaled_pixmap.width()) // 2
+            y = (self.height() - self.scaled_pixmap.height()) // 2
+            return QRect(x, y, self.scaled_pixmap.width(), self.scaled_pixmap.height())
+        return self.rect()
+
+    def selection_to_roi(self, selection):
+        """Converts a rectangle drawn on the tile to a sensor ROI (fractions)"""
+        display = self.pixmap_rect()
+        if display.width() <= 0 or display.height() <= 0:
+            return None
+        u0 = min(max((selection.left() - display.left()) / display.width(), 0.0), 1.0)
+        u1 = min(max((selection.right() - display.left()) / display.width(), 0.0), 1.0)
+        v0 = min(max((selection.top() - display.top()) / display.height(), 0.0), 1.0)
+        v1 = min(max((selection.bottom() - display.top()) / display.height(), 0.0), 1.0)
+
+        # Undo the display rotation (selection is drawn on the rotated image)
+        def unrotate(u, v):
+            if self.rotation_angle == 90:
+                return v, 1 - u
+            if self.rotation_angle == 180:
+                return 1 - u, 1 - v
+            if self.rotation_angle == 270:
+                return 1 - v, u
+            return u, v
+        corners = [unrotate(u0, v0), unrotate(u1, v1)]
+        x0, x1 = sorted(c[0] for c in corners)
+        y0, y1 = sorted(c[1] for c in corners)
+
+        # The selection is relative to the region currently shown
+        crop_x, crop_y, crop_w, crop_h = self.effective_crop()
+        roi = (crop_x + x0 * crop_w, crop_y + y0 * crop_h, (x1 - x0) * crop_w, (y1 - y0) * crop_h)
+        if roi[2] < 0.02 or roi[3] < 0.02:
+            return None
+        return roi
+
+    def mousePressEvent(self, event):
+        if self.roi_select_mode and event.button() == Qt.LeftButton:
+            self.roi_drag_origin = event.pos()
+            if self.roi_rubber_band is None:
+                self.roi_rubber_band = QRubberBand(QRubberBand.Rectangle, self)
+            self.roi_rubber_band.setGeometry(QRect(self.roi_drag_origin, event.pos()))
+            self.roi_rubber_band.show()
         else:
-            super().paintEvent(event)
+            super().mousePressEvent(event)
+
+    def mouseMoveEvent(self, event):
+        if self.roi_drag_origin is not None:
+            self.roi_rubber_band.setGeometry(QRect(self.roi_drag_origin, event.pos()).normalized())
+        else:
+            super().mouseMoveEvent(event)
+
+    def mouseReleaseEvent(self, event):
+        if self.roi_drag_origin is None:
+            super().mouseReleaseEvent(event)
+            return
+        selection = QRect(self.roi_drag_origin, event.pos()).normalized()
+        self.roi_rubber_band.hide()
+        self.roi_drag_origin = None
+        self.roi_select_mode = False
+        self.unsetCursor()
+
+        roi = self.selection_to_roi(selection)
+        if roi is None:
+            print_warning("Selected region is too small, ignored")
+            return
+        self.parent_widget.set_roi(self.parent_widget.cam_widgets.index(self), roi, 1.0)
 
     def mouseDoubleClickEvent(self, event):
         # On double-click, toggle fullscreen mode
@@ -224,7 +561,12 @@ class CamFeedWidget(QLabel):
                 self.parent_widget.exit_fullscreen()
 
 class CamFluxWidget(QWidget):
-    def __init__(self, resolution=(640, 480), keep_aspect_ratio=False, adaptive_resolution=True):
+    # Emitted after a camera tile was added or removed, dialogs refresh their camera lists
+    cameras_changed = pyqtSignal()
+
+    def __init__(self, resolution=(640, 480), keep_aspect_ratio=False, adaptive_resolution=True,
+                 sources=None, startup_timer=None, remote_port=None, remote_host="127.0.0.1",
+                 remote_token=None, watch_devices=True):
         super().__init__()
         self.setWindowTitle("ManyCamFlux")
         
@@ -234,6 +576,66 @@ class CamFluxWidget(QWidget):
         
         self.show_labels_in_screenshots = True
         
+        # Camera name and timestamp burned into screenshots and snapshots
+        self.overlay_settings = dict(DEFAULT_OVERLAY_SETTINGS)
+        
+        # Interval capture output (composite and/or one file per camera)
+        self.export_settings = dict(DEFAULT_EXPORT_SETTINGS)
+        self.capture_exporter = None
+        
+        # Per-camera interval capture schedules, staggered across the interval
+        self.schedule_settings = dict(DEFAULT_SCHEDULE_SETTINGS)
+        self.schedule_settings["cameras"] = {}
+        
+        # Size/age quotas and free space threshold of the capture folders
+        self.retention_settings = dict(DEFAULT_RETENTION_SETTINGS)
+        
+        # Time-lapse fed by the interval capture while it runs
+        self.timelapse_settings = dict(DEFAULT_TIMELAPSE_SETTINGS)
+        self.live_timelapse = None
+        
+        # MJPEG restreaming server, created when streaming is enabled
+        self.stream_server = None
+        self.stream_port = 8080
+        # Loopback only unless the configuration opts in to other interfaces (e.g. "0.0.0.0")
+        self.stream_host = "127.0.0.1"
+        
+        # Hot-plug detection preference, replaced by the configuration's value when it has one
+        self.watch_devices = watch_devices
+        
+        # Shared-memory frame bus for local analytics processes, started with --frame-bus
+        self.frame_bus = None
+        self.frame_bus_composite = False
+        
+        # Process the frames of same-sized cameras together instead of one camera at a time
+        self.batch_processing = True
+        
+        # Grab MJPEG payloads and decode previews at the tile size (full decode for captures)
+        self.reduced_decoding = False
+        
+        # Paged camera wall for large camera counts, off-page cameras are decoded at a reduced rate
+        self.wall_settings = dict(DEFAULT_WALL_SETTINGS)
+        self.wall_page = 0
+        self.page_count = 1
+        self.page_timer = QTimer()
+        self.page_timer.timeout.connect(self.next_page)
+        
+        # Draws the tiles of composite screenshots in parallel, created on first use
+        self.compose_executor = None
+        
+        # RAM ceiling of the frame buffers, enforced by dropping previews, shrinking buffers
+        # and then throttling capture
+        self.memory_settings = dict(DEFAULT_MEMORY_SETTINGS)
+        self.memory = MemoryAccountant(self.memory_settings)
+        self.memory_timer = QTimer()
+        self.memory_timer.timeout.connect(self.memory.check)
+        
+        # Sampling profiler started from Ctrl+Shift+P or --profile
+        self.profiler = None
+        
+        # Settings of cameras by identity, applied when a camera (re)appears
+        self.saved_camera_configs = {}
+        
         self.resize_timer = QTimer()
         self.resize_timer.setSingleShot(True)
         self.resize_timer.timeout.connect(self.update_grid_layout)
@@ -245,18 +647,23 @@ class CamFluxWidget(QWidget):
         
         print_info(f"Initializing ManyCamFlux with resolution {resolution}")
 
-        # Detect available cameras
-        print_debug("Scanning for available cameras...")
-        self.cam_indices = get_available_cameras()
-        if not self.cam_indices:
+        # Used to log the time until the first frame is displayed
+        self.startup_timer = startup_timer
+
+        # Detect available cameras (unless they were already opened during startup)
+        if sources is None:
+            print_debug("Scanning for available cameras...")
+            sources = open_available_cameras()
+        self.cam_indices = [source.index for source in sources]
+        if not self.cam_indices and remote_port is None:
             print_error("No cameras detected. Application will exit.")
-            import sys
             sys.exit()
         else:
             print_success(f"Found {len(self.cam_indices)} camera(s): {self.cam_indices}")
 
         self.num_cam = len(self.cam_indices)
-        self.caps = [cv2.VideoCapture(idx) for idx in self.cam_indices]
+        # Each camera is read on its own thread, a stuck device cannot block the GUI
+        self.caps = sources
         print_debug("Camera capture devices initialized")
 
         # Set camera resolution for capture (not display)
@@ -264,9 +671,15 @@ class CamFluxWidget(QWidget):
             cap.set(cv2.CAP_PROP_FRAME_WIDTH, resolution[0])
             cap.set(cv2.CAP_PROP_FRAME_HEIGHT, resolution[1])
             print_debug(f"Camera {idx} resolution set to {resolution[0]}x{resolution[1]}")
+        
+        for cap in self.caps:
+            cap.start()
+        self.watchdog = CameraWatchdog(self.caps)
+        self.watchdog.start()
 
         # Create a widget for each camera
-        self.cam_widgets = [CamFeedWidget(cap, self, f"Camera {idx}") for idx, cap in enumerate(self.caps)]
+        self.cam_widgets = [CamFeedWidget(cap, self, f"Camera {idx}", cam_idx) 
+                            for idx, (cap, cam_idx) in enumerate(zip(self.caps, self.cam_indices))]
         self.visible_flags = [True] * self.num_cam
 
         # Layout for feeds with stretch factors to permettre le redimensionnement
@@ -292,6 +705,21 @@ class CamFluxWidget(QWidget):
         self.snapshot_button = QPushButton("Snapshot")
         self.snapshot_button.clicked.connect(self.take_snapshot_all)
         button_layout.addWidget(self.snapshot_button)
+        
+        self.stream_button = QPushButton("Stream")
+        self.stream_button.setCheckable(True)
+        self.stream_button.toggled.connect(self.toggle_streaming)
+        button_layout.addWidget(self.stream_button)
+        
+        # Page controls, only shown when the wall has several pages
+        self.previous_page_button = QPushButton("◀")
+        self.previous_page_button.clicked.connect(self.previous_page)
+        self.page_label = QLabel()
+        self.next_page_button = QPushButton("▶")
+        self.next_page_button.clicked.connect(self.show_next_page)
+        for page_widget in (self.previous_page_button, self.page_label, self.next_page_button):
+            page_widget.setVisible(False)
+            button_layout.addWidget(page_widget)
 
         main_layout.addLayout(button_layout)
 
@@ -312,9 +740,30 @@ class CamFluxWidget(QWidget):
         self.timer = QTimer()
         self.timer.timeout.connect(self.update_frames)
         self.timer.start(30)
+        
+        self.register_memory_components()
+        self.memory_timer.start(1000)
 
         # Load configuration at startup if it exists
         self.load_config_at_startup()
+        self.set_reduced_decoding(self.reduced_decoding)
+        self.restart_page_timer()
+        
+        # Feeds pushed by capture nodes become tiles as they connect
+        self.remote_server = None
+        if remote_port is not None:
+            self.remote_server = RemoteFeedServer(remote_host, remote_port, remote_token)
+            self.remote_server.start()
+        
+        # Cameras plugged in or out while running (V4L2 device nodes). self.watch_devices is the
+        # saved preference (the config may have replaced the constructor value), the argument is
+        # the caller's choice for this run only, so either can turn watching off without the
+        # caller's choice being written back to the configuration
+        self.device_monitor = None
+        monitor_devices = self.watch_devices and watch_devices
+        if monitor_devices and sys.platform.startswith("linux") and os.path.isdir("/dev"):
+            self.device_monitor = DeviceMonitor("/dev")
+            self.device_monitor.start()
     
     def take_snapshot_all(self):
         
@@ -337,6 +786,86 @@ class CamFluxWidget(QWidget):
                 print_debug(f"Opening folder in explorer: {snapshot_folder}")
                 subprocess.Popen(['explorer', snapshot_folder])
 
+    def toggle_streaming(self, enabled):
+        if enabled:
+            server = MJPEGStreamServer(host=self.stream_host, port=self.stream_port)
+            try:
+                server.start()
+            except OSError as e:
+                print_error(f"Failed to start stream server on port {self.stream_port}: {str(e)}")
+                QMessageBox.warning(self, "Error", f"Failed to start stream server on port {self.stream_port}: {str(e)}")
+                self.stream_button.blockSignals(True)
+                self.stream_button.setChecked(False)
+                self.stream_button.blockSignals(False)
+                return
+            self.stream_server = server
+            self.stream_button.setToolTip(server.url)
+            QMessageBox.information(self, "Stream", f"Streaming cameras at:\n{server.url}")
+        elif self.stream_server is not None:
+            server = self.stream_server
+            self.stream_server = None
+            server.stop()
+            self.stream_button.setToolTip("")
+
+    def set_reduced_decoding(self, enabled):
+        self.reduced_decoding = enabled
+        for cap in self.caps:
+            if hasattr(cap, "set_raw_mode"):
+                cap.set_raw_mode(enabled)
+        print_debug(f"Reduced-scale MJPEG preview decoding: {enabled}")
+
+    def start_frame_bus(self, bus_name, composite=False):
+        """Publishes the processed camera frames (and the capture composite) to shared memory"""
+        try:
+            self.frame_bus = FrameBus(bus_name)
+        except OSError as e:
+            print_error(f"Failed to start frame bus '{bus_name}': {str(e)}")
+            return
+        self.frame_bus_composite = composite
+        self.degrade_frame_bus(self.memory.level)
+
+    def register_memory_components(self):
+        """Accounts the buffer-holding components against the memory budget"""
+        self.memory.register(
+            "cameras", lambda: sum(cap.memory_usage() for cap in self.caps if hasattr(cap, "memory_usage")),
+            self.degrade_cameras)
+        self.memory.register(
+            "previews", lambda: sum(widget.preview_memory_usage() for widget in self.cam_widgets),
+            self.degrade_previews)
+        self.memory.register(
+            "capture export", lambda: self.capture_exporter.memory_usage() if self.capture_exporter is not None else 0)
+        self.memory.register(
+            "live time-lapse", lambda: self.live_timelapse.memory_usage() if self.live_timelapse is not None else 0)
+        self.memory.register(
+            "stream server", lambda: self.stream_server.memory_usage() if self.stream_server is not None else 0)
+        self.memory.register(
+            "frame bus", lambda: self.frame_bus.memory_usage() if self.frame_bus is not None else 0,
+            self.degrade_frame_bus)
+
+    def degrade_cameras(self, level):
+        for cap in self.caps:
+            if hasattr(cap, "set_cache_full_frames"):
+                cap.set_cache_full_frames(level < LEVEL_DROP_PREVIEWS)
+        # Capture throttling reuses the off-page decoding rate
+        self.update_wall_page()
+
+    def degrade_previews(self, level):
+        if level < LEVEL_DROP_PREVIEWS:
+            return
+        for idx, widget in enumerate(self.cam_widgets):
+            if not (self.visible_flags[idx] and widget.on_page):
+                widget.release_preview()
+            elif widget.scaled_pixmap is not None:
+                widget.original_pixmap = widget.scaled_pixmap
+
+    def degrade_frame_bus(self, level):
+        if self.frame_bus is not None:
+            self.frame_bus.set_slots(1 if level >= LEVEL_SHRINK_BUFFERS else DEFAULT_BUS_SLOTS)
+
+    def set_memory_limit(self, limit_mb):
+        self.memory_settings["limit_mb"] = limit_mb
+        print_debug(f"Memory budget set to {limit_mb} MB")
+
     def show_global_params(self):
         dialog = self.GlobalControlDialog(self)
         dialog.exec_()
@@ -348,30 +877,229 @@ class CamFluxWidget(QWidget):
     def set_camera_name(self, idx, name):
         old_name = self.cam_widgets[idx].name
         self.cam_widgets[idx].name = name
+        # The name is only drawn in paintEvent, no need to reprocess the frame
+        self.cam_widgets[idx].update()
         print_debug(f"Camera {idx} renamed: '{old_name}' -> '{name}'")
         self.update_grid_layout()
 
-    def set_brightness(self, idx, value):
-        self.cam_widgets[idx].brightness = value
-        print_debug(f"Camera {idx} brightness set to {value}")
+    def apply_adjustments(self, adjustments):
+        """
+        Applies {camera index: {"brightness"/"contrast"/"saturation": value}} in one batch,
+        each camera is reprocessed once whatever the number of changed settings
+        """
+        for idx, values in adjustments.items():
+            widget = self.cam_widgets[idx]
+            for key, value in values.items():
+                setattr(widget, key, value)
+            widget.invalidate()
+        print_debug(f"Adjusted {len(adjustments)} camera(s)")
+
+    def set_roi(self, idx, roi, zoom=1.0):
+        widget = self.cam_widgets[idx]
+        widget.roi = tuple(roi) if roi is not None else None
+        widget.zoom = zoom
+        widget.invalidate()
+        print_debug(f"Camera {idx} region set to {widget.roi}, zoom {zoom}x")
 
-    def set_contrast(self, idx, value):
-        self.cam_widgets[idx].contrast = value
-        print_debug(f"Camera {idx} contrast set to {value}")
+    def set_pinned(self, idx, pinned):
+        self.cam_widgets[idx].pinned = pinned
+        print_debug(f"Camera {idx} pinned: {pinned}")
+        self.update_grid_layout()
+
+    def set_grayscale(self, idx, enabled):
+        widget = self.cam_widgets[idx]
+        widget.grayscale = enabled
+        if hasattr(widget.cap, "set_grayscale"):
+            widget.cap.set_grayscale(enabled)
+        widget.invalidate()
+        print_debug(f"Camera {idx} grayscale: {enabled}")
+
+    def set_auto_normalize(self, idx, enabled):
+        widget = self.cam_widgets[idx]
+        widget.auto_normalize = enabled
+        if hasattr(widget.cap, "set_auto_normalize"):
+            widget.cap.set_auto_normalize(enabled)
+        widget.invalidate()
+        print_debug(f"Camera {idx} auto exposure/white balance: {enabled}")
+
+    def set_wall_setting(self, key, value):
+        self.wall_settings[key] = value
+        print_debug(f"Camera wall {key} set to {value}")
+        if key == "cycle_seconds":
+            self.restart_page_timer()
+        else:
+            self.update_grid_layout()
+
+    def restart_page_timer(self):
+        if self.wall_settings["cycle_seconds"] > 0:
+            self.page_timer.start(int(self.wall_settings["cycle_seconds"] * 1000))
+        else:
+            self.page_timer.stop()
+
+    def next_page(self):
+        if self.page_count > 1:
+            self.wall_page = (self.wall_page + 1) % self.page_count
+            self.update_grid_layout()
+
+    def show_next_page(self):
+        self.next_page()
+        # Manual paging restarts the cycle, so the chosen page stays up for a full period
+        self.restart_page_timer()
+
+    def previous_page(self):
+        if self.page_count > 1:
+            self.wall_page = (self.wall_page - 1) % self.page_count
+            self.update_grid_layout()
+        self.restart_page_timer()
+
+    def update_wall_page(self):
+        """Shows the cameras of the current page and throttles the others. Returns the page."""
+        visible_widgets = [w for idx, w in enumerate(self.cam_widgets) if self.visible_flags[idx]]
+        pages = paginate(visible_widgets, self.wall_settings["page_size"])
+        self.page_count = len(pages)
+        self.wall_page = min(self.wall_page, self.page_count - 1)
+        page = pages[self.wall_page]
+        on_page = {id(w) for w in page}
+        fullscreen = any(w.fullscreen_mode for w in self.cam_widgets)
+        
+        for idx, widget in enumerate(self.cam_widgets):
+            was_on_page = widget.on_page
+            widget.on_page = id(widget) in on_page
+            if not fullscreen:
+                widget.setVisible(self.visible_flags[idx] and widget.on_page)
+            if hasattr(widget.cap, "set_max_fps"):
+                # Off-page cameras keep capturing (recording, motion detection) at a reduced rate,
+                # and so does every camera when the memory budget throttles capture
+                paged_out = self.page_count > 1 and not widget.on_page
+                throttled = paged_out or self.memory.throttling()
+                widget.cap.set_max_fps(self.wall_settings["offpage_fps"] if throttled else 0)
+            if widget.on_page and not was_on_page:
+                widget.invalidate()
+            elif was_on_page and not widget.on_page and self.memory.level >= LEVEL_DROP_PREVIEWS:
+                widget.release_preview()
         
-    def set_saturation(self, idx, value):
-        self.cam_widgets[idx].saturation = value
-        print_debug(f"Camera {idx} saturation set to {value}")
+        paged = self.page_count > 1
+        for page_widget in (self.previous_page_button, self.page_label, self.next_page_button):
+            page_widget.setVisible(paged)
+        self.page_label.setText(f"Page {self.wall_page + 1}/{self.page_count}")
+        return page
 
     def rotate_camera(self, idx, angle):
         old_angle = self.cam_widgets[idx].rotation_angle
         self.cam_widgets[idx].rotation_angle = (old_angle + angle) % 360
+        self.cam_widgets[idx].invalidate()
         print_debug(f"Camera {idx} rotated: {old_angle}° -> {self.cam_widgets[idx].rotation_angle}°")
         
+    def add_camera_source(self, source, name):
+        """Adds a tile for a source that appeared after startup"""
+        widget = CamFeedWidget(source, self, name, source.index)
+        self.caps.append(source)
+        self.cam_indices.append(source.index)
+        self.cam_widgets.append(widget)
+        self.visible_flags.append(True)
+        self.num_cam = len(self.cam_widgets)
+        
+        # Seen before: restore its settings
+        cam_config = self.saved_camera_configs.get(widget.identity)
+        if cam_config is not None:
+            self.apply_camera_config(len(self.cam_widgets) - 1, cam_config)
+            widget.setVisible(self.visible_flags[-1])
+        self.update_grid_layout()
+        print_success(f"Added camera '{widget.name}'")
+        self.cameras_changed.emit()
+        return widget
+
+    def add_local_camera(self, source):
+        """Starts a hot-plugged camera and adds its tile"""
+        source.set(cv2.CAP_PROP_FRAME_WIDTH, self.selected_resolution[0])
+        source.set(cv2.CAP_PROP_FRAME_HEIGHT, self.selected_resolution[1])
+        source.set_raw_mode(self.reduced_decoding)
+        source.start()
+        self.watchdog.add_source(source)
+        return self.add_camera_source(source, f"Camera {source.index}")
+
+    def remove_camera_source(self, idx):
+        """Removes the tile of a camera that was unplugged, keeping its settings for when it comes back"""
+        widget = self.cam_widgets[idx]
+        if widget.identity:
+            self.saved_camera_configs[widget.identity] = self.camera_config(idx)
+        
+        source = self.caps.pop(idx)
+        self.cam_widgets.pop(idx)
+        self.cam_indices.pop(idx)
+        self.visible_flags.pop(idx)
+        self.num_cam = len(self.cam_widgets)
+        
+        self.watchdog.remove_source(source)
+        source.release()
+        if self.stream_server is not None:
+            self.stream_server.remove_channel(widget.camera_id)
+        if self.frame_bus is not None:
+            self.frame_bus.remove_channel(widget.camera_id)
+        widget.setParent(None)
+        widget.deleteLater()
+        self.update_grid_layout()
+        print_warning(f"Camera '{widget.name}' disconnected, tile removed")
+        self.cameras_changed.emit()
+
+    def camera_index(self, widget):
+        """Current index of a camera tile, None once it was removed (indices shift on removal)"""
+        for idx, cam_widget in enumerate(self.cam_widgets):
+            if cam_widget is widget:
+                return idx
+        return None
+
+    def apply_device_events(self):
+        while not self.device_monitor.events.empty():
+            kind, index, source = self.device_monitor.events.get()
+            local = [idx for idx, cam_idx in enumerate(self.cam_indices) if cam_idx == index]
+            if kind == "added":
+                if local:
+                    # Already shown (opened at startup while the monitor started)
+                    source.release()
+                else:
+                    self.add_local_camera(source)
+            else:
+                for idx in reversed(local):
+                    self.remove_camera_source(idx)
+
     def update_frames(self):
-        for idx, widget in enumerate(self.cam_widgets):
-            if self.visible_flags[idx]:
-                widget.update_frame()
+        if self.device_monitor is not None:
+            self.apply_device_events()
+        
+        if self.remote_server is not None:
+            while not self.remote_server.new_sources.empty():
+                source = self.remote_server.new_sources.get()
+                self.add_camera_source(source, f"{source.node} - Camera {source.camera_id}")
+        
+        if self.batch_processing:
+            # Cameras with new frames are processed together, grouped by size and rotation
+            widgets = []
+            frames = []
+            with stage("display poll"):
+                for idx, widget in enumerate(self.cam_widgets):
+                    if self.visible_flags[idx] and widget.on_page:
+                        frame = widget.poll_frame()
+                        if frame is not None:
+                            widgets.append(widget)
+                            frames.append(frame)
+            if frames:
+                # Restreaming and the frame bus need the BGR frames, otherwise convert for display in the batch
+                to_rgb = self.stream_server is None and self.frame_bus is None
+                with stage("display process"):
+                    processed = process_frames(widgets, frames, to_rgb)
+                with stage("display show"):
+                    for widget, frame in zip(widgets, processed):
+                        widget.show_frame(frame, is_rgb=to_rgb)
+        else:
+            with stage("display"):
+                for idx, widget in enumerate(self.cam_widgets):
+                    if self.visible_flags[idx] and widget.on_page:
+                        widget.update_frame()
+        
+        if self.startup_timer is not None and any(w.original_pixmap is not None for w in self.cam_widgets):
+            self.startup_timer.mark("first frame displayed")
+            self.startup_timer = None
 
     def toggle_camera(self, idx, state):
         self.visible_flags[idx] = (state == Qt.Checked)
@@ -386,8 +1114,8 @@ class CamFluxWidget(QWidget):
             if item.widget():
                 self.flux_layout.removeWidget(item.widget())
         
-        # Get visible widgets
-        visible_widgets = [w for idx, w in enumerate(self.cam_widgets) if self.visible_flags[idx]]
+        # Get visible widgets of the current wall page
+        visible_widgets = self.update_wall_page()
         n = len(visible_widgets)
         if n == 0:
             return
@@ -478,9 +1206,59 @@ class CamFluxWidget(QWidget):
     def keyPressEvent(self, event):
         if event.key() == Qt.Key_Escape:
             self.exit_fullscreen()
+        elif event.key() == Qt.Key_PageDown:
+            self.show_next_page()
+        elif event.key() == Qt.Key_PageUp:
+            self.previous_page()
+        elif event.key() == Qt.Key_P and event.modifiers() == (Qt.ControlModifier | Qt.ShiftModifier):
+            # Hidden shortcut for field diagnostics
+            self.start_profile()
+
+    def start_profile(self, duration=10.0):
+        """Samples all threads for a while and writes the profile next to the configuration file"""
+        if self.profiler is not None and self.profiler.is_running():
+            print_warning("A profile is already running")
+            return
+        self.profiler = SamplingProfiler(os.path.dirname(self.get_config_path()), duration)
+        self.profiler.start()
 
     def closeEvent(self, event):
         self.timer.stop()
+        self.page_timer.stop()
+        self.memory_timer.stop()
+        self.watchdog.stop()
+        
+        if self.profiler is not None and self.profiler.is_running():
+            # Write what was sampled so far
+            self.profiler.stop()
+            self.profiler.thread.join(timeout=5)
+        
+        if self.device_monitor is not None:
+            self.device_monitor.stop()
+        
+        if self.remote_server is not None:
+            self.remote_server.stop()
+        
+        if self.stream_server is not None:
+            self.stream_server.stop()
+            self.stream_server = None
+        
+        if self.frame_bus is not None:
+            self.frame_bus.close()
+            self.frame_bus = None
+        
+        if self.capture_exporter is not None:
+            # Let pending capture files finish writing
+            self.capture_exporter.shutdown(wait=True)
+            self.capture_exporter = None
+        
+        if self.live_timelapse is not None:
+            self.live_timelapse.stop_live()
+            self.live_timelapse = None
+        
+        if self.compose_executor is not None:
+            self.compose_executor.shutdown(wait=True)
+            self.compose_executor = None
         
         import time
         time.sleep(0.1)
@@ -495,12 +1273,155 @@ class CamFluxWidget(QWidget):
         
         event.accept()
 
+    def get_visible_widgets(self):
+        return [w for idx, w in enumerate(self.cam_widgets) if self.visible_flags[idx]]
+
+    def capture_tiles(self, widgets):
+        """Reads one frame per camera with adjustments and rotation applied (None if the read failed)"""
+        tiles = []
+        for widget in widgets:
+            ret, frame = widget.cap.read()
+            tiles.append(widget.apply_roi(frame) if ret else None)
+        
+        read = [i for i, tile in enumerate(tiles) if tile is not None]
+        if self.batch_processing:
+            processed = process_frames([widgets[i] for i in read], [tiles[i] for i in read])
+        else:
+            processed = []
+            for i in read:
+                frame = widgets[i].apply_brightness_contrast(tiles[i])
+                frame = widgets[i].apply_saturation(frame)
+                processed.append(widgets[i].apply_rotation(frame))
+        for i, frame in zip(read, processed):
+            tiles[i] = frame
+        return tiles
+
     def take_screenshot(self, filename):
         # Get visible widgets
-        visible_widgets = [w for idx, w in enumerate(self.cam_widgets) if self.visible_flags[idx]]
-        n = len(visible_widgets)
-        if n == 0:
+        visible_widgets = self.get_visible_widgets()
+        if not visible_widgets:
             return
+        
+        tiles = self.capture_tiles(visible_widgets)
+        screenshot = self.compose_screenshot(visible_widgets, tiles)
+        cv2.imwrite(filename, screenshot)
+        print_success(f"Screenshot saved to {filename}")
+
+    def get_capture_exporter(self):
+        if self.capture_exporter is None:
+            self.capture_exporter = CaptureExporter(retention_settings=self.retention_settings)
+        return self.capture_exporter
+
+    def export_capture(self, save_folder, prefix, timestamp, widgets=None, include_composite=True,
+                       include_individual=True, manifest_name=None):
+        """
+        Captures the visible cameras (or the given ones) once and hands composite and per-camera
+        files to the exporter. Scheduled captures take the composite and the cameras separately.
+        """
+        visible_widgets = self.get_visible_widgets() if widgets is None else widgets
+        if not visible_widgets:
+            return []
+        settings = dict(self.export_settings)
+        settings["save_composite"] = settings["save_composite"] and include_composite
+        settings["save_individual"] = settings["save_individual"] and include_individual
+        with stage("capture tiles"):
+            tiles = self.capture_tiles(visible_widgets)
+        
+        composite = None
+        publish_composite = self.frame_bus is not None and self.frame_bus_composite
+        if include_composite and (settings["save_composite"] or self.live_timelapse is not None or publish_composite):
+            # The composite is built from the same processed tiles as the individual files
+            with stage("capture composite"):
+                composite = self.compose_screenshot(visible_widgets, tiles)
+            if self.live_timelapse is not None:
+                self.live_timelapse.submit(composite)
+            if publish_composite:
+                self.frame_bus.publish("composite", "Composite", composite)
+            if not settings["save_composite"]:
+                composite = None
+        
+        camera_tiles = []
+        for widget, frame in zip(visible_widgets, tiles):
+            if frame is None:
+                print_warning(f"No frame from {widget.name}, skipped in capture")
+                continue
+            info = {
+                "name": widget.name,
+                "camera_id": widget.camera_id,
+                "brightness": widget.brightness,
+                "contrast": widget.contrast,
+                "saturation": widget.saturation,
+                "rotation_angle": widget.rotation_angle,
+                "roi": list(widget.roi) if widget.roi is not None else None,
+                "zoom": widget.zoom,
+            }
+            camera_tiles.append((info, frame))
+        
+        return self.get_capture_exporter().export(save_folder, prefix, timestamp, camera_tiles, settings, composite,
+                                                  manifest_name)
+
+    def capture_throttled(self):
+        """
+        True when an interval capture has to be skipped: over the memory budget, no new capture
+        until the frames of the previous ones are written (files and live time-lapse)
+        """
+        if not self.memory.throttling():
+            return False
+        backlog = self.capture_exporter.memory_usage() if self.capture_exporter is not None else 0
+        if self.live_timelapse is not None:
+            backlog += self.live_timelapse.live_pending_bytes
+        if not backlog:
+            return False
+        self.memory.skipped_captures += 1
+        print_warning(f"Capture skipped, over the memory budget with {backlog / 1024 / 1024:.0f} MB still being written")
+        return True
+
+    def schedule_key(self, widget):
+        return widget.identity or widget.name
+
+    def build_capture_scheduler(self, interval):
+        """Schedule of the composite and of each visible camera, from the capture interval and schedule settings"""
+        settings = self.schedule_settings
+        scheduler = CaptureScheduler(settings["stagger"])
+        default_window = parse_window(settings["window"])
+        publish_composite = self.frame_bus is not None and self.frame_bus_composite
+        if self.export_settings["save_composite"] or self.live_timelapse is not None or publish_composite:
+            scheduler.add(COMPOSITE_KEY, "Composite", interval, default_window)
+        if self.export_settings["save_individual"]:
+            for widget in self.get_visible_widgets():
+                camera_schedule = settings["cameras"].get(self.schedule_key(widget), {})
+                window = parse_window(camera_schedule.get("window")) or default_window
+                scheduler.add(self.schedule_key(widget), widget.name,
+                              camera_schedule.get("interval") or interval, window)
+        scheduler.start()
+        return scheduler
+
+    def export_scheduled(self, save_folder, prefix, timestamp, keys, scheduler):
+        """Captures the schedule entries that are due, each camera on its own"""
+        widgets = {self.schedule_key(widget): widget for widget in self.get_visible_widgets()}
+        for key in keys:
+            if key == COMPOSITE_KEY:
+                self.export_capture(save_folder, prefix, timestamp, include_individual=False)
+            elif key in widgets:
+                widget = widgets[key]
+                # Cameras can be due in the same second, each gets its own manifest
+                manifest_name = f"{prefix}_{timestamp}_{safe_filename(widget.name)}.json"
+                self.export_capture(save_folder, prefix, timestamp, widgets=[widget],
+                                    include_composite=False, manifest_name=manifest_name)
+            else:
+                # Hidden or unplugged since the schedule started
+                continue
+            scheduler.record(key)
+
+    def get_compose_executor(self):
+        if self.compose_executor is None:
+            self.compose_executor = ThreadPoolExecutor(max_workers=min(8, os.cpu_count() or 1),
+                                                       thread_name_prefix="Composite")
+        return self.compose_executor
+
+    def compose_screenshot(self, visible_widgets, tiles):
+        """Assembles processed tiles (already rotated) into the screenshot grid"""
+        n = len(visible_widgets)
     
         # Calculate grid size
         grid_size = int(np.ceil(np.sqrt(n)))
@@ -510,6 +1431,8 @@ class CamFluxWidget(QWidget):
         # Base dimensions
         base_h, base_w = self.selected_resolution[1], self.selected_resolution[0]
         
+        # Cell of each tile as (x, y, cell width, cell height, resize width, resize height)
+        cells = []
         if self.adaptive_resolution == True:  # Condition inverted as requested
             # Adaptive cells for rotated cameras
             cell_dimensions = []
@@ -538,176 +1461,75 @@ class CamFluxWidget(QWidget):
             total_width = sum(col_widths)
             total_height = sum(row_heights)
             
-            # Create capture image with calculated dimensions
-            screenshot = np.zeros((total_height, total_width, 3), dtype=np.uint8)
-            
-            # Initial position
-            y_offset = 0
-            
-            # For each row
-            for row in range(rows):
-                x_offset = 0
-                
-                # For each column in this row
-                for col in range(cols):
-                    idx = row * cols + col
-                    if idx >= len(visible_widgets):
-                        break
-                        
-                    widget = visible_widgets[idx]
-                    
-                    # Calculate cell dimensions
-                    cell_width = col_widths[col]
-                    cell_height = row_heights[row]
-                    
-                    # Capture and process image
-                    ret, frame = widget.cap.read()
-                    if ret:
-                        # Apply adjustments
-                        frame = widget.apply_brightness_contrast(frame)
-                        frame = widget.apply_saturation(frame)
-                        
-                        # Check if camera is rotated 90° or 270°
-                        rotated_90_or_270 = widget.rotation_angle in [90, 270]
-                        
-                        if rotated_90_or_270:
-                            # For rotated images, invert dimensions for resizing
-                            frame = cv2.resize(frame, (cell_height, cell_width))
-                        else:
-                            frame = cv2.resize(frame, (cell_width, cell_height))
-                        
-                        # Apply rotation
-                        frame = widget.apply_rotation(frame)
-                        
-                        # Add camera name if enabled
-                        if self.show_labels_in_screenshots:
-                            h, w = frame.shape[:2]
-                            text_bar = np.zeros((30, w, 3), dtype=np.uint8)
-                            frame = np.vstack([frame, text_bar])
-                            
-                            cv2.putText(
-                                frame, 
-                                widget.name, 
-                                (10, frame.shape[0] - 10), 
-                                cv2.FONT_HERSHEY_SIMPLEX, 
-                                0.7, 
-                                (255, 255, 255), 
-                                2
-                            )
-                        
-                        # Place image in cell (centered)
-                        h, w = frame.shape[:2]
-                        
-                        # Create temporary cell
-                        temp_cell = np.zeros((cell_height, cell_width, 3), dtype=np.uint8)
-                        
-                        # Calculate centering offsets
-                        offset_x = (cell_width - w) // 2
-                        offset_y = (cell_height - h) // 2
-                        
-                        # Check dimensions
-                        if offset_x >= 0 and offset_y >= 0:
-                            # Place centered image
-                            temp_cell[offset_y:offset_y+h, offset_x:offset_x+w] = frame
-                        else:
-                            # Resize if too large
-                            scale_h = cell_height / h
-                            scale_w = cell_width / w
-                            scale = min(scale_h, scale_w)
-                            
-                            new_h = int(h * scale)
-                            new_w = int(w * scale)
-                            
-                            resized_frame = cv2.resize(frame, (new_w, new_h))
-                            
-                            # Center resized image
-                            new_offset_x = (cell_width - new_w) // 2
-                            new_offset_y = (cell_height - new_h) // 2
-                            
-                            temp_cell[new_offset_y:new_offset_y+new_h, new_offset_x:new_offset_x+new_w] = resized_frame
-                        
-                        # Add cell to final image
-                        screenshot[y_offset:y_offset+cell_height, x_offset:x_offset+cell_width] = temp_cell
-                    
-                    # Next column position
-                    x_offset += cell_width
-                
-                # Next row position
-                y_offset += row_heights[row]
+            for idx in range(n):
+                row = idx // cols
+                col = idx % cols
+                x_offset = sum(col_widths[:col])
+                y_offset = sum(row_heights[:row])
+                # Tiles are already rotated, so the cell size applies directly
+                cells.append((x_offset, y_offset, col_widths[col], row_heights[row],
+                              col_widths[col], row_heights[row]))
         else:
             # Fixed cell size (non-adaptive)
-            screenshot = np.zeros((rows * base_h, cols * base_w, 3), dtype=np.uint8)
+            total_width, total_height = cols * base_w, rows * base_h
             
             for idx, widget in enumerate(visible_widgets):
-                ret, frame = widget.cap.read()
-                if ret:
-                    # Apply basic adjustments
-                    frame = widget.apply_brightness_contrast(frame)
-                    frame = widget.apply_saturation(frame)
-                    
-                    # Check rotation
-                    rotated_90_or_270 = widget.rotation_angle in [90, 270]
-                    
-                    if rotated_90_or_270:
-                        # Invert dimensions for rotated cameras
-                        target_w, target_h = base_h, base_w
-                        frame = cv2.resize(frame, (target_h, target_w))
-                    else:
-                        # Standard resize
-                        frame = cv2.resize(frame, (base_w, base_h))
-                    
-                    # Apply rotation
-                    frame = widget.apply_rotation(frame)
-                    
-                    # Add camera name if enabled
-                    if self.show_labels_in_screenshots:
-                        h, w = frame.shape[:2]
-                        text_bar = np.zeros((30, w, 3), dtype=np.uint8)
-                        frame = np.vstack([frame, text_bar])
-                        
-                        cv2.putText(
-                            frame, 
-                            widget.name, 
-                            (10, frame.shape[0] - 10), 
-                            cv2.FONT_HERSHEY_SIMPLEX, 
-                            0.7, 
-                            (255, 255, 255), 
-                            2
-                        )
-                    
-                    # Fit to cell if needed
-                    h, w = frame.shape[:2]
-                    if h > base_h or w > base_w:
-                        scale_h = base_h / h
-                        scale_w = base_w / w
-                        scale = min(scale_h, scale_w)
-                        
-                        new_h = int(h * scale)
-                        new_w = int(w * scale)
-                        frame = cv2.resize(frame, (new_w, new_h))
-                    
-                    # Create temporary cell
-                    temp_frame = np.zeros((base_h, base_w, 3), dtype=np.uint8)
-                    
-                    # Center image in cell
-                    offset_x = max(0, (base_w - frame.shape[1]) // 2)
-                    offset_y = max(0, (base_h - frame.shape[0]) // 2)
-                    
-                    # Check bounds
-                    frame_h, frame_w = frame.shape[:2]
-                    place_h = min(frame_h, base_h - offset_y)
-                    place_w = min(frame_w, base_w - offset_x)
-                    
-                    # Place in cell
-                    temp_frame[offset_y:offset_y+place_h, offset_x:offset_x+place_w] = frame[:place_h, :place_w]
-                    
-                    # Add to final image
-                    row = idx // cols
-                    col = idx % cols
-                    screenshot[row*base_h:(row+1)*base_h, col*base_w:(col+1)*base_w] = temp_frame
+                row = idx // cols
+                col = idx % cols
+                if widget.rotation_angle in [90, 270]:
+                    # Invert dimensions for rotated cameras
+                    cells.append((col * base_w, row * base_h, base_w, base_h, base_h, base_w))
+                else:
+                    cells.append((col * base_w, row * base_h, base_w, base_h, base_w, base_h))
+        
+        # Create capture image with calculated dimensions, single-channel when every camera is grayscale
+        read = [frame for frame in tiles if frame is not None]
+        grayscale = bool(read) and all(frame.ndim == 2 for frame in read)
+        channels = () if grayscale else (3,)
+        screenshot = np.zeros((total_height, total_width) + channels, dtype=np.uint8)
+        
+        # Each tile is resized, labelled and copied into its own slice of the canvas. The slices
+        # do not overlap and OpenCV releases the GIL, so tiles are drawn in parallel.
+        timestamp = format_timestamp(self.overlay_settings) if self.overlay_settings["timestamp"] else None
+        jobs = [(widget, frame, cell, timestamp) for widget, frame, cell in zip(visible_widgets, tiles, cells)
+                if frame is not None]
+        if len(jobs) > 1:
+            executor = self.get_compose_executor()
+            futures = [executor.submit(self.draw_tile, screenshot, *job) for job in jobs]
+            for future in futures:
+                future.result()
+        else:
+            for job in jobs:
+                self.draw_tile(screenshot, *job)
     
-        cv2.imwrite(filename, screenshot)
-        print_success(f"Screenshot saved to {filename}")
+        return screenshot
+
+    def draw_tile(self, screenshot, widget, frame, cell, timestamp=None):
+        """Writes one tile, centered and labelled, into its cell of the screenshot"""
+        x, y, cell_width, cell_height, width, height = cell
+        show_name = self.show_labels_in_screenshots
+        settings = self.overlay_settings
+        reserved = reserved_height(show_name, settings)
+        with stage("composite tile"):
+            w, h = fit_tile_size(widget, frame, width, height)
+            # The label band is reserved in the cell, the image shrinks to leave room for it
+            if h + reserved > cell_height or w > cell_width:
+                scale = min((cell_height - reserved) / h, cell_width / w)
+                w, h = max(1, int(w * scale)), max(1, int(h * scale))
+            
+            # Place image in cell (centered)
+            offset_x = x + (cell_width - w) // 2
+            offset_y = y + (cell_height - h - reserved) // 2
+            top = offset_y + content_offset(show_name, settings)
+            resized = cv2.resize(frame, (w, h))
+            if resized.ndim < screenshot.ndim:
+                # Grayscale tile in a color composite, broadcast to the three channels
+                resized = resized[:, :, None]
+            screenshot[top:top+h, offset_x:offset_x+w] = resized
+            
+            if overlay_enabled(show_name, settings):
+                draw_overlay(screenshot, offset_x, offset_y, w, h + reserved,
+                             widget.name if show_name else None, settings, timestamp)
 
     def get_config_path(self):
         """Send the path to the configuration file."""
@@ -717,24 +1539,86 @@ class CamFluxWidget(QWidget):
             print_debug(f"Created configuration directory: {config_dir}")
         return os.path.join(config_dir, "ManyCamFlux_config.json")
 
+    def camera_config(self, idx):
+        widget = self.cam_widgets[idx]
+        return {
+            "name": widget.name,
+            "identity": widget.identity,
+            "brightness": widget.brightness,
+            "contrast": widget.contrast,
+            "saturation": widget.saturation,
+            "rotation_angle": widget.rotation_angle,
+            "roi": list(widget.roi) if widget.roi is not None else None,
+            "zoom": widget.zoom,
+            "pinned": widget.pinned,
+            "grayscale": widget.grayscale,
+            "auto_normalize": widget.auto_normalize,
+            "visible": self.visible_flags[idx]
+        }
+
+    def apply_camera_config(self, idx, cam_config):
+        self.cam_widgets[idx].name = cam_config["name"]
+        self.cam_widgets[idx].brightness = cam_config["brightness"]
+        self.cam_widgets[idx].contrast = cam_config["contrast"]
+        if "saturation" in cam_config:
+            self.cam_widgets[idx].saturation = cam_config["saturation"]
+        if "roi" in cam_config:
+            self.set_roi(idx, cam_config["roi"], cam_config.get("zoom", 1.0))
+        self.cam_widgets[idx].rotation_angle = cam_config["rotation_angle"]
+        self.cam_widgets[idx].pinned = cam_config.get("pinned", False)
+        self.set_grayscale(idx, cam_config.get("grayscale", False))
+        self.set_auto_normalize(idx, cam_config.get("auto_normalize", False))
+        self.visible_flags[idx] = cam_config["visible"]
+
+    def match_camera_configs(self, cameras):
+        """
+        Pairs saved camera entries with the current tiles: by device identity, so settings follow
+        a camera whatever its index, then by position for entries saved without identity.
+        Entries of cameras that are not connected are kept for when they are plugged in.
+        """
+        pairs = []
+        by_identity = {cam_config["identity"]: cam_config for cam_config in cameras if cam_config.get("identity")}
+        for idx, widget in enumerate(self.cam_widgets):
+            if widget.identity in by_identity:
+                pairs.append((idx, by_identity.pop(widget.identity)))
+        self.saved_camera_configs.update(by_identity)
+        
+        matched = {idx for idx, _ in pairs}
+        free = [idx for idx in range(len(self.cam_widgets)) if idx not in matched]
+        positional = [cam_config for cam_config in cameras if not cam_config.get("identity")]
+        if len(positional) > len(free):
+            print_warning(f"Config has more cameras ({len(positional)}) than available ({len(free)})")
+        pairs.extend(zip(free, positional))
+        return pairs
+
     def save_config(self):
         config = {
             "global_settings": {
                 "show_labels_in_screenshots": self.show_labels_in_screenshots,
                 "keep_aspect_ratio": self.keep_aspect_ratio,
                 "adaptive_resolution": self.adaptive_resolution,
+                "stream_port": self.stream_port,
+                "stream_host": self.stream_host,
+                "watch_devices": self.watch_devices,
+                "batch_processing": self.batch_processing,
+                "reduced_decoding": self.reduced_decoding,
+                "export_settings": self.export_settings,
+                "timelapse_settings": self.timelapse_settings,
+                "retention_settings": self.retention_settings,
+                "overlay_settings": self.overlay_settings,
+                "schedule_settings": self.schedule_settings,
+                "wall_settings": self.wall_settings,
+                "memory_settings": self.memory_settings,
             },
             "cameras": []
         }
-        for idx, widget in enumerate(self.cam_widgets):
-            config["cameras"].append({
-                "name": widget.name,
-                "brightness": widget.brightness,
-                "contrast": widget.contrast,
-                "saturation": widget.saturation,
-                "rotation_angle": widget.rotation_angle,
-                "visible": self.visible_flags[idx]
-            })
+        for idx in range(len(self.cam_widgets)):
+            config["cameras"].append(self.camera_config(idx))
+        # Cameras unplugged right now keep their settings
+        present = {widget.identity for widget in self.cam_widgets}
+        for identity, cam_config in self.saved_camera_configs.items():
+            if identity not in present:
+                config["cameras"].append(cam_config)
         
         config_path = self.get_config_path()
         print_info(f"Saving configuration to {config_path}")
@@ -760,20 +1644,12 @@ class CamFluxWidget(QWidget):
         try:
             with open(config_path, 'r') as config_file:
                 config = json.load(config_file)
-                for idx, cam_config in enumerate(config["cameras"]):
-                    if idx >= len(self.cam_widgets):
-                        print_warning(f"Config has more cameras ({len(config['cameras'])}) than available ({len(self.cam_widgets)})")
-                        break
-                        
+                for idx, cam_config in self.match_camera_configs(config["cameras"]):
                     print_debug(f"Applying config to camera {idx}")
-                    self.cam_widgets[idx].name = cam_config["name"]
-                    self.cam_widgets[idx].brightness = cam_config["brightness"]
-                    self.cam_widgets[idx].contrast = cam_config["contrast"]
-                    if "saturation" in cam_config:
-                        self.cam_widgets[idx].saturation = cam_config["saturation"]
-                    self.cam_widgets[idx].rotation_angle = cam_config["rotation_angle"]
-                    self.visible_flags[idx] = cam_config["visible"]
+                    self.apply_camera_config(idx, cam_config)
                 
+                for widget in self.cam_widgets:
+                    widget.invalidate()
                 self.update_grid_layout()
                 print_success("Configuration loaded successfully")
                 QMessageBox.information(self, "Configuration", "Configuration loaded")
@@ -795,16 +1671,46 @@ class CamFluxWidget(QWidget):
                         if "adaptive_resolution" in config["global_settings"]:
                             self.adaptive_resolution = config["global_settings"]["adaptive_resolution"]
                             print_debug(f"Loaded adaptive_resolution: {self.adaptive_resolution}")
+                        if "stream_port" in config["global_settings"]:
+                            self.stream_port = config["global_settings"]["stream_port"]
+                            print_debug(f"Loaded stream_port: {self.stream_port}")
+                        if "stream_host" in config["global_settings"]:
+                            self.stream_host = config["global_settings"]["stream_host"]
+                            print_debug(f"Loaded stream_host: {self.stream_host}")
+                        if "watch_devices" in config["global_settings"]:
+                            self.watch_devices = config["global_settings"]["watch_devices"]
+                        if "batch_processing" in config["global_settings"]:
+                            self.batch_processing = config["global_settings"]["batch_processing"]
+                        if "reduced_decoding" in config["global_settings"]:
+                            self.reduced_decoding = config["global_settings"]["reduced_decoding"]
+                        
+                        if "export_settings" in config["global_settings"]:
+                            self.export_settings.update(config["global_settings"]["export_settings"])
+                            print_debug(f"Loaded export_settings: {self.export_settings}")
+                        if "timelapse_settings" in config["global_settings"]:
+                            self.timelapse_settings.update(config["global_settings"]["timelapse_settings"])
+                            print_debug(f"Loaded timelapse_settings: {self.timelapse_settings}")
+                        
+                        if "retention_settings" in config["global_settings"]:
+                            self.retention_settings.update(config["global_settings"]["retention_settings"])
+                            print_debug(f"Loaded retention_settings: {self.retention_settings}")
+                        if "overlay_settings" in config["global_settings"]:
+                            self.overlay_settings.update(config["global_settings"]["overlay_settings"])
+                            print_debug(f"Loaded overlay_settings: {self.overlay_settings}")
+                        if "schedule_settings" in config["global_settings"]:
+                            self.schedule_settings.update(config["global_settings"]["schedule_settings"])
+                            print_debug(f"Loaded schedule_settings: {self.schedule_settings}")
+                        if "wall_settings" in config["global_settings"]:
+                            self.wall_settings.update(config["global_settings"]["wall_settings"])
+                            print_debug(f"Loaded wall_settings: {self.wall_settings}")
+                        if "memory_settings" in config["global_settings"]:
+                            self.memory_settings.update(config["global_settings"]["memory_settings"])
+                            print_debug(f"Loaded memory_settings: {self.memory_settings}")
                     
-                    for idx, cam_config in enumerate(config["cameras"]):
-                        if idx < len(self.cam_widgets):
-                            self.cam_widgets[idx].name = cam_config["name"]
-                            self.cam_widgets[idx].brightness = cam_config["brightness"]
-                            self.cam_widgets[idx].contrast = cam_config["contrast"]
-                            if "saturation" in cam_config:
-                                self.cam_widgets[idx].saturation = cam_config["saturation"]
-                            self.cam_widgets[idx].rotation_angle = cam_config["rotation_angle"]
-                            self.visible_flags[idx] = cam_config["visible"]
+                    for idx, cam_config in self.match_camera_configs(config["cameras"]):
+                        self.apply_camera_config(idx, cam_config)
+                    for widget in self.cam_widgets:
+                        widget.invalidate()
                     self.update_grid_layout()
                     print_success("Configuration loaded successfully")
             except Exception as e:
@@ -0,0 +1,209 @@
+import os
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+import cv2
+import numpy as np
+
+from utils import print_debug, print_error, print_info
+
+CATALOG_NAME = "ManyCamFlux_catalog.db"
+THUMBNAIL_DIR = ".thumbnails"
+# Matches "<prefix>_yyyyMMdd_hhmmss[_<camera>].<ext>" written by the capture pipeline
+CAPTURE_NAME_PATTERN = re.compile(r"^(?P<prefix>[a-z]+)_(?P<stamp>\d{8}_\d{6})(?:_(?P<camera>.+))?\.(?:jpg|png|webp)$")
+
+
+class CaptureCatalog:
+    """SQLite index of the captures of one folder, with a cache of small thumbnails"""
+    def __init__(self, folder, thumbnail_width=160):
+        self.folder = folder
+        self.thumbnail_width = thumbnail_width
+        self.thumbnail_folder = os.path.join(folder, THUMBNAIL_DIR)
+        if not os.path.exists(self.thumbnail_folder):
+            os.makedirs(self.thumbnail_folder)
+
+        self.lock = threading.Lock()
+        # Written from the exporter workers, read from the GUI thread
+        self.db = sqlite3.connect(os.path.join(folder, CATALOG_NAME), check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS captures ("
+            " path TEXT PRIMARY KEY,"
+            " camera TEXT NOT NULL,"
+            " timestamp REAL NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " motion_score REAL,"
+            " thumbnail TEXT)"
+        )
+        self.db.execute("CREATE INDEX IF NOT EXISTS captures_time ON captures (timestamp)")
+        self.db.execute("CREATE INDEX IF NOT EXISTS captures_camera_time ON captures (camera, timestamp)")
+        self.db.commit()
+
+        # Last thumbnail per camera (grayscale) for the motion score
+        self.previous_thumbnails = {}
+        print_debug(f"Capture catalog opened for {folder}")
+
+    def add(self, path, camera, timestamp, frame=None):
+        """
+        Records a written capture file
+
+        Args:
+            path (str): Path of the written file
+            camera (str): Camera name ("Composite" for the grid image)
+            timestamp (float): Capture time (seconds since epoch)
+            frame (ndarray): Image that was written, used for the thumbnail and motion score
+        """
+        size = os.path.getsize(path)
+        name = os.path.basename(path)
+        thumbnail_name = None
+        motion_score = None
+
+        if frame is not None:
+            thumbnail = self.make_thumbnail(frame)
+            thumbnail_name = os.path.splitext(name)[0] + ".jpg"
+            cv2.imwrite(os.path.join(self.thumbnail_folder, thumbnail_name), thumbnail,
+                        [cv2.IMWRITE_JPEG_QUALITY, 70])
+            motion_score = self.motion_score(camera, thumbnail)
+
+        with self.lock:
+            self.db.execute(
+                "INSERT OR REPLACE INTO captures VALUES (?, ?, ?, ?, ?, ?)",
+                (name, camera, timestamp, size, motion_score, thumbnail_name)
+            )
+            self.db.commit()
+
+    def make_thumbnail(self, frame):
+        h, w = frame.shape[:2]
+        height = max(1, int(h * self.thumbnail_width / w))
+        return cv2.resize(frame, (self.thumbnail_width, height), interpolation=cv2.INTER_AREA)
+
+    def motion_score(self, camera, thumbnail):
+        """Mean absolute difference (0-1) with the previous thumbnail of the same camera"""
+        gray = thumbnail if thumbnail.ndim == 2 else cv2.cvtColor(thumbnail, cv2.COLOR_BGR2GRAY)
+        with self.lock:
+            previous = self.previous_thumbnails.get(camera)
+            self.previous_thumbnails[camera] = gray
+        if previous is None or previous.shape != gray.shape:
+            return None
+        return float(np.mean(cv2.absdiff(gray, previous))) / 255.0
+
+    def query(self, start=None, end=None, camera=None, limit=1000):
+        """
+        Returns captures in a time range, oldest first
+
+        Returns:
+            list: dicts with path, camera, timestamp, size, motion_score and thumbnail (absolute paths)
+        """
+        sql = "SELECT path, camera, timestamp, size, motion_score, thumbnail FROM captures WHERE 1=1"
+        args = []
+        if start is not None:
+            sql += " AND timestamp >= ?"
+            args.append(start)
+        if end is not None:
+            sql += " AND timestamp <= ?"
+            args.append(end)
+        if camera is not None:
+            sql += " AND camera = ?"
+            args.append(camera)
+        sql += " ORDER BY timestamp LIMIT ?"
+        args.append(limit)
+
+        with self.lock:
+            rows = self.db.execute(sql, args).fetchall()
+        return [
+            {
+                "path": os.path.join(self.folder, path),
+                "camera": camera_name,
+                "timestamp": timestamp,
+                "size": size,
+                "motion_score": motion_score,
+                "thumbnail": os.path.join(self.thumbnail_folder, thumbnail) if thumbnail else None,
+            }
+            for path, camera_name, timestamp, size, motion_score, thumbnail in rows
+        ]
+
+    def cameras(self):
+        with self.lock:
+            return [row[0] for row in self.db.execute("SELECT DISTINCT camera FROM captures ORDER BY camera")]
+
+    def time_range(self):
+        with self.lock:
+            return self.db.execute("SELECT MIN(timestamp), MAX(timestamp) FROM captures").fetchone()
+
+    def count(self):
+        with self.lock:
+            return self.db.execute("SELECT COUNT(*) FROM captures").fetchone()[0]
+
+    def ensure_thumbnail(self, entry):
+        """Creates the thumbnail of an imported entry the first time it is browsed"""
+        if entry["thumbnail"] and os.path.exists(entry["thumbnail"]):
+            return entry["thumbnail"]
+        frame = cv2.imread(entry["path"], cv2.IMREAD_REDUCED_COLOR_4)
+        if frame is None:
+            return None
+        name = os.path.basename(entry["path"])
+        thumbnail_name = os.path.splitext(name)[0] + ".jpg"
+        thumbnail_path = os.path.join(self.thumbnail_folder, thumbnail_name)
+        cv2.imwrite(thumbnail_path, self.make_thumbnail(frame), [cv2.IMWRITE_JPEG_QUALITY, 70])
+        with self.lock:
+            self.db.execute("UPDATE captures SET thumbnail = ? WHERE path = ?", (thumbnail_name, name))
+            self.db.commit()
+        entry["thumbnail"] = thumbnail_path
+        return thumbnail_path
+
+    def remove(self, paths):
+        """Drops deleted files (and their thumbnails) from the catalog"""
+        names = [os.path.basename(path) for path in paths]
+        with self.lock:
+            rows = self.db.execute(
+                f"SELECT thumbnail FROM captures WHERE path IN ({','.join('?' * len(names))})", names
+            ).fetchall() if names else []
+            self.db.executemany("DELETE FROM captures WHERE path = ?", [(name,) for name in names])
+            self.db.commit()
+        for (thumbnail,) in rows:
+            if thumbnail:
+                try:
+                    os.remove(os.path.join(self.thumbnail_folder, thumbnail))
+                except OSError:
+                    pass
+
+    def import_existing(self):
+        """
+        One-off scan adding files captured before the catalog existed.
+        Thumbnails of imported files are created lazily when browsed.
+
+        Returns:
+            int: Number of files added
+        """
+        started = time.time()
+        with self.lock:
+            known = {row[0] for row in self.db.execute("SELECT path FROM captures")}
+
+        rows = []
+        with os.scandir(self.folder) as entries:
+            for entry in entries:
+                if entry.name in known or not entry.is_file():
+                    continue
+                match = CAPTURE_NAME_PATTERN.match(entry.name)
+                if match is None:
+                    continue
+                timestamp = datetime.strptime(match.group("stamp"), "%Y%m%d_%H%M%S").timestamp()
+                camera = match.group("camera") or "Composite"
+                rows.append((entry.name, camera, timestamp, entry.stat().st_size, None, None))
+
+        with self.lock:
+            self.db.executemany("INSERT OR IGNORE INTO captures VALUES (?, ?, ?, ?, ?, ?)", rows)
+            self.db.commit()
+        print_info(f"Imported {len(rows)} existing capture(s) into catalog in {time.time() - started:.2f}s")
+        return len(rows)
+
+    def close(self):
+        with self.lock:
+            try:
+                self.db.close()
+            except sqlite3.Error as e:
+                print_error(f"Failed to close capture catalog: {str(e)}")
@@ -0,0 +1,283 @@
+import os
+import re
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+
+from utils import print_debug, print_error, print_success
+from capture_catalog import CaptureCatalog
+from retention import RetentionManager
+from dedup import CaptureDeduplicator, link_capture
+from profiler import stage
+
+# Format name -> file extension
+EXPORT_FORMATS = {
+    "JPEG": ".jpg",
+    "PNG": ".png",
+    "WebP": ".webp",
+}
+
+DEFAULT_EXPORT_SETTINGS = {
+    "format": "JPEG",
+    "quality": 95,
+    "png_compression": 3,
+    "save_composite": True,
+    "save_individual": False,
+    "catalog": True,
+    # Near-identical tiles (perceptual hash distance <= threshold bits) are skipped or hard-linked
+    "dedup": False,
+    "dedup_threshold": 4,
+    "dedup_mode": "Skip",
+}
+
+
+def get_encode_params(settings):
+    """Returns the cv2.imwrite parameters matching the export settings"""
+    fmt = settings.get("format", "JPEG")
+    if fmt == "PNG":
+        return [cv2.IMWRITE_PNG_COMPRESSION, int(settings.get("png_compression", 3))]
+    if fmt == "WebP":
+        return [cv2.IMWRITE_WEBP_QUALITY, int(settings.get("quality", 95))]
+    return [cv2.IMWRITE_JPEG_QUALITY, int(settings.get("quality", 95))]
+
+
+def get_extension(settings):
+    return EXPORT_FORMATS.get(settings.get("format", "JPEG"), ".jpg")
+
+
+def safe_filename(name):
+    """Turns a camera name into something usable in a file name"""
+    return re.sub(r"[^\w\-]+", "_", name).strip("_") or "camera"
+
+
+class _CaptureJob:
+    """Tracks the files of one capture until its manifest can be written"""
+    def __init__(self, name, manifest_path, manifest, pending, capture_time, catalog=None, retention=None):
+        self.name = name
+        self.capture_time = capture_time
+        self.catalog = catalog
+        self.retention = retention
+        self.manifest_path = manifest_path
+        self.manifest = manifest
+        self.file_count = pending
+        self.pending = pending
+        self.lock = threading.Lock()
+
+    def file_done(self):
+        with self.lock:
+            self.pending -= 1
+            return self.pending == 0
+
+
+class CaptureExporter:
+    """Encodes and writes capture files on a worker pool, off the GUI thread"""
+    def __init__(self, max_workers=None, retention_settings=None):
+        if max_workers is None:
+            max_workers = min(8, os.cpu_count() or 1)
+        self.max_workers = max_workers
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="CaptureExport")
+        self.catalogs = {}
+        self.catalogs_lock = threading.Lock()
+        # Shared with the settings dialog, quota changes apply to running managers
+        self.retention_settings = retention_settings
+        self.retentions = {}
+        self.deduplicator = CaptureDeduplicator()
+        # Bytes of the frames submitted and not written yet, held by the queued jobs
+        self.pending_bytes = 0
+        self.pending_lock = threading.Lock()
+        print_debug(f"Capture exporter started with {max_workers} worker(s)")
+
+    def get_catalog(self, folder):
+        """Returns the capture catalog of a folder, opening it on first use"""
+        folder = os.path.abspath(folder)
+        with self.catalogs_lock:
+            catalog = self.catalogs.get(folder)
+            if catalog is None:
+                catalog = CaptureCatalog(folder)
+                self.catalogs[folder] = catalog
+            return catalog
+
+    def get_retention(self, folder):
+        """Returns the retention manager of a folder, starting it on first use"""
+        folder = os.path.abspath(folder)
+        with self.catalogs_lock:
+            retention = self.retentions.get(folder)
+            if retention is None:
+                retention = RetentionManager(folder, self.retention_settings,
+                                             on_delete=lambda paths: self._files_deleted(folder, paths))
+                retention.start()
+                self.retentions[folder] = retention
+            return retention
+
+    def _files_deleted(self, folder, paths):
+        # Deleted files cannot be hard-linked to anymore
+        self.deduplicator.forget(paths)
+        # Only catalogs that are open, deleted files are skipped by a later import anyway
+        with self.catalogs_lock:
+            catalog = self.catalogs.get(folder)
+        if catalog is not None:
+            catalog.remove(paths)
+
+    def export(self, save_folder, prefix, timestamp, tiles, settings, composite=None, manifest_name=None):
+        """
+        Writes one capture: each camera tile as its own file and optionally the composite
+
+        Args:
+            save_folder (str): Destination folder
+            prefix (str): File name prefix (e.g. "screenshot")
+            timestamp (str): Capture timestamp used in file names and manifest
+            tiles (list): (camera info dict, processed frame) for each camera
+            settings (dict): Export settings (see DEFAULT_EXPORT_SETTINGS)
+            composite (ndarray): Composite image, or None to skip it
+            manifest_name (str): Manifest file name, "<prefix>_<timestamp>.json" by default
+
+        Returns:
+            list: Futures of the submitted writes
+        """
+        extension = get_extension(settings)
+        params = get_encode_params(settings)
+        base_name = f"{prefix}_{timestamp}"
+        capture_time = time.time()
+        catalog = self.get_catalog(save_folder) if settings.get("catalog", True) else None
+
+        manifest = {
+            "timestamp": timestamp,
+            "settings": {
+                "format": settings.get("format", "JPEG"),
+                "quality": settings.get("quality"),
+                "png_compression": settings.get("png_compression"),
+            },
+            "composite": None,
+            "cameras": [],
+        }
+
+        candidates = []
+        if composite is not None:
+            composite_name = base_name + extension
+            manifest["composite"] = composite_name
+            candidates.append((os.path.join(save_folder, composite_name), "Composite", composite, manifest))
+
+        if settings.get("save_individual", False):
+            used_names = set()
+            for info, frame in tiles:
+                file_stem = f"{base_name}_{safe_filename(info['name'])}"
+                # Two cameras can share a name, keep their files apart
+                if file_stem in used_names:
+                    file_stem = f"{file_stem}_{len(used_names)}"
+                used_names.add(file_stem)
+                file_name = file_stem + extension
+
+                entry = dict(info)
+                entry["file"] = file_name
+                entry["width"] = frame.shape[1]
+                entry["height"] = frame.shape[0]
+                manifest["cameras"].append(entry)
+                candidates.append((os.path.join(save_folder, file_name), info["name"], frame, entry))
+
+        # (path, camera, frame, reference to hard-link instead of encoding or None)
+        writes = []
+        for path, camera, frame, entry in candidates:
+            reference = None
+            if settings.get("dedup", False):
+                with stage("dedup hash"):
+                    reference = self.deduplicator.check(os.path.dirname(path), camera, frame, path,
+                                                        settings.get("dedup_threshold", 4))
+            if reference is None:
+                writes.append((path, camera, frame, None))
+                continue
+            # Same picture as the last saved one of this camera
+            linked = settings.get("dedup_mode") == "Hard link"
+            self.deduplicator.count_duplicate(os.path.dirname(path), camera, linked)
+            if linked:
+                writes.append((path, camera, frame, reference))
+            elif entry is manifest:
+                manifest["composite"] = None
+                manifest["composite_duplicate_of"] = os.path.basename(reference)
+            else:
+                entry["file"] = None
+                entry["duplicate_of"] = os.path.basename(reference)
+
+        if not writes:
+            print_debug(f"Capture {base_name} identical to the previous one, nothing written")
+            return []
+
+        manifest_path = None
+        if manifest["cameras"]:
+            manifest_path = os.path.join(save_folder, manifest_name or base_name + ".json")
+        job = _CaptureJob(base_name, manifest_path, manifest, len(writes), capture_time, catalog,
+                          self.get_retention(save_folder))
+
+        with self.pending_lock:
+            self.pending_bytes += sum(frame.nbytes for _, _, frame, _ in writes)
+        futures = []
+        for path, camera, frame, reference in writes:
+            futures.append(self.executor.submit(self._write_file, job, path, camera, frame, params, reference))
+        return futures
+
+    def _write_file(self, job, path, camera, frame, params, reference=None):
+        folder = os.path.dirname(path)
+        written = False
+        try:
+            # A duplicate is hard-linked to its reference, unless the file system refuses
+            linked = written = reference is not None and link_capture(reference, path)
+            if reference is not None and not written:
+                # Gone or on a file system without links, later duplicates are written again
+                self.deduplicator.forget([reference])
+            if not written:
+                # cv2.imwrite releases the GIL, so workers encode in parallel
+                with stage("export encode"):
+                    written = cv2.imwrite(path, frame, params)
+                if written and reference is None:
+                    self.deduplicator.file_written(folder, camera, path, os.path.getsize(path))
+            if not written:
+                print_error(f"Failed to write capture file: {path}")
+            else:
+                if job.catalog is not None:
+                    with stage("catalog"):
+                        job.catalog.add(path, camera, job.capture_time, frame)
+                # Recorded last, the file can be deleted as soon as the index knows it. A link
+                # takes no extra disk space, its data is already counted with the reference.
+                if job.retention is not None:
+                    job.retention.record(path, 0 if linked else os.path.getsize(path), job.capture_time)
+        except Exception as e:
+            print_error(f"Failed to write capture file {path}: {str(e)}")
+        finally:
+            if not written and reference is None:
+                self.deduplicator.write_failed(folder, camera, path)
+            with self.pending_lock:
+                self.pending_bytes -= frame.nbytes
+
+        if job.file_done():
+            if job.manifest_path:
+                self._write_manifest(job)
+            print_success(f"Saved capture {job.name} ({job.file_count} file(s))")
+        return path
+
+    def _write_manifest(self, job):
+        try:
+            with open(job.manifest_path, 'w') as manifest_file:
+                json.dump(job.manifest, manifest_file, indent=4)
+            if job.retention is not None:
+                job.retention.record(job.manifest_path, os.path.getsize(job.manifest_path), job.capture_time)
+            print_debug(f"Wrote capture manifest: {job.manifest_path}")
+        except Exception as e:
+            print_error(f"Failed to write capture manifest {job.manifest_path}: {str(e)}")
+
+    def memory_usage(self):
+        return self.pending_bytes
+
+    def shutdown(self, wait=True):
+        self.executor.shutdown(wait=wait)
+        # Stopped outside the lock, a deletion batch may be removing catalog entries
+        with self.catalogs_lock:
+            retentions = list(self.retentions.values())
+            self.retentions.clear()
+        for retention in retentions:
+            retention.stop()
+        with self.catalogs_lock:
+            for catalog in self.catalogs.values():
+                catalog.close()
+            self.catalogs.clear()
@@ -0,0 +1,121 @@
+import os
+import threading
+
+import cv2
+import numpy as np
+
+from utils import print_info
+
+DEDUP_MODES = ["Skip", "Hard link"]
+
+
+def difference_hash(frame, size=8):
+    """64-bit perceptual hash: sign of the horizontal gradients of a size x size thumbnail"""
+    gray = frame if frame.ndim == 2 else cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    small = cv2.resize(gray, (size + 1, size), interpolation=cv2.INTER_AREA)
+    bits = (small[:, 1:] > small[:, :-1]).ravel()
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def hash_distance(a, b):
+    """Number of differing bits between two hashes"""
+    return bin(a ^ b).count("1")
+
+
+class CaptureDeduplicator:
+    """
+    Compares each capture tile with the last one saved for the same camera and folder,
+    and tells the exporter whether it is worth writing
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        # (folder, camera) -> (hash, path, size) of the last capture written to disk
+        self.references = {}
+        # (folder, camera) -> (hash, path) of the capture being written, promoted once on disk
+        self.candidates = {}
+        self.reset_stats()
+
+    def reset_stats(self):
+        with self.lock:
+            self.checked = 0
+            self.skipped = 0
+            self.linked = 0
+            self.bytes_saved = 0
+
+    def check(self, folder, camera, frame, path, threshold):
+        """
+        Returns the path of the saved capture this frame duplicates, or None if it must be
+        written (it becomes the new reference once file_written() confirms it)
+        """
+        frame_hash = difference_hash(frame)
+        key = (folder, camera)
+        with self.lock:
+            self.checked += 1
+            reference = self.references.get(key)
+            # Compared with the last saved frame, so a slow drift still ends up saved
+            if reference is not None and hash_distance(frame_hash, reference[0]) <= threshold:
+                return reference[1]
+            self.candidates[key] = (frame_hash, path)
+            return None
+
+    def file_written(self, folder, camera, path, size):
+        """Called by the writer once a checked file is on disk"""
+        key = (folder, camera)
+        with self.lock:
+            candidate = self.candidates.get(key)
+            # A newer capture checked meanwhile takes over when its own write succeeds
+            if candidate is not None and candidate[1] == path:
+                del self.candidates[key]
+                self.references[key] = (candidate[0], path, size)
+
+    def write_failed(self, folder, camera, path):
+        """Called by the writer when a checked file could not be written"""
+        key = (folder, camera)
+        with self.lock:
+            candidate = self.candidates.get(key)
+            if candidate is not None and candidate[1] == path:
+                del self.candidates[key]
+
+    def forget(self, paths):
+        """Drops the references to files that are gone (deleted, or refusing hard links)"""
+        paths = set(paths)
+        with self.lock:
+            for key, reference in list(self.references.items()):
+                if reference[1] in paths:
+                    del self.references[key]
+
+    def count_duplicate(self, folder, camera, linked):
+        with self.lock:
+            reference = self.references.get((folder, camera))
+            if reference is not None:
+                self.bytes_saved += reference[2]
+            if linked:
+                self.linked += 1
+            else:
+                self.skipped += 1
+
+    def stats(self):
+        with self.lock:
+            return {
+                "checked": self.checked,
+                "skipped": self.skipped,
+                "linked": self.linked,
+                "bytes_saved": self.bytes_saved,
+            }
+
+    def report(self):
+        """One line summary of the session, also printed to the console"""
+        stats = self.stats()
+        message = (f"{stats['skipped']} duplicate(s) skipped, {stats['linked']} hard-linked "
+                   f"out of {stats['checked']} file(s), {stats['bytes_saved'] / (1024 * 1024):.1f} MB saved")
+        print_info(f"Capture deduplication: {message}")
+        return message
+
+
+def link_capture(reference, path):
+    """Hard-links a duplicate to its reference file. Returns False if links are not possible."""
+    try:
+        os.link(reference, path)
+        return True
+    except (OSError, AttributeError):
+        return False
@@ -0,0 +1,202 @@
+import os
+import re
+import sys
+import queue
+import select
+import struct
+import threading
+import time
+import ctypes
+import ctypes.util
+
+from utils import print_debug, print_error, print_info, print_warning
+
+SYSFS_VIDEO = "/sys/class/video4linux"
+DEVICE_NAME_PATTERN = re.compile(r"^video(\d+)$")
+
+# inotify(7) constants
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = getattr(os, "O_CLOEXEC", 0o2000000)
+INOTIFY_EVENT = struct.Struct("iIII")
+
+
+class PollingWatcher:
+    """Detects created/deleted entries of a directory by listing it periodically"""
+    def __init__(self, directory, interval=1.0):
+        self.directory = directory
+        self.interval = interval
+        self.names = self._list()
+
+    def _list(self):
+        try:
+            return set(os.listdir(self.directory))
+        except OSError:
+            return set()
+
+    def wait(self, timeout):
+        """Returns the [(kind, name)] changes seen within timeout, kind being "added" or "removed" """
+        time.sleep(min(timeout, self.interval))
+        names = self._list()
+        changes = [("added", name) for name in sorted(names - self.names)]
+        changes += [("removed", name) for name in sorted(self.names - names)]
+        self.names = names
+        return changes
+
+    def close(self):
+        pass
+
+
+class InotifyWatcher:
+    """Same interface as PollingWatcher, woken by the kernel instead of listing the directory"""
+    def __init__(self, directory):
+        self.directory = directory
+        self.libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = self.libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        mask = IN_CREATE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO
+        if self.libc.inotify_add_watch(self.fd, os.fsencode(directory), mask) < 0:
+            errno = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(errno, f"inotify_add_watch failed for {directory}")
+
+    def wait(self, timeout):
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return []
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        changes = []
+        offset = 0
+        while offset + INOTIFY_EVENT.size <= len(data):
+            _, mask, _, length = INOTIFY_EVENT.unpack_from(data, offset)
+            offset += INOTIFY_EVENT.size
+            name = data[offset:offset + length].rstrip(b"\0").decode(errors="replace")
+            offset += length
+            if mask & (IN_CREATE | IN_MOVED_TO):
+                changes.append(("added", name))
+            elif mask & (IN_DELETE | IN_MOVED_FROM):
+                changes.append(("removed", name))
+        return changes
+
+    def close(self):
+        os.close(self.fd)
+
+
+def create_watcher(directory):
+    """inotify on Linux, directory polling elsewhere or when inotify is unavailable"""
+    if sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(directory)
+        except (OSError, AttributeError) as e:
+            print_warning(f"inotify unavailable ({str(e)}), polling {directory} instead")
+    return PollingWatcher(directory)
+
+
+def device_identity(index, sysfs_root=SYSFS_VIDEO):
+    """
+    Stable name of a camera, independent of its /dev/videoN number: the device name and the
+    physical port it is plugged into (e.g. "HD Webcam C270 @ 1-2:1.0")
+    """
+    if isinstance(index, str):
+        # Remote cameras are already named "<node>:<camera>"
+        return index
+    device_folder = os.path.join(sysfs_root, f"video{index}")
+    try:
+        with open(os.path.join(device_folder, "name"), 'r') as name_file:
+            name = name_file.read().strip()
+    except OSError:
+        return f"video{index}"
+    port = os.path.basename(os.path.realpath(os.path.join(device_folder, "device")))
+    return f"{name} @ {port}" if port and port != "device" else name
+
+
+def open_camera_device(index):
+    """Default probe: opens the device once and returns it as a (not started) CameraSource"""
+    import cv2
+    from camera_source import CameraSource
+    cap = cv2.VideoCapture(index)
+    if cap.isOpened():
+        return CameraSource(index, cap)
+    cap.release()
+    return None
+
+
+class DeviceMonitor:
+    """
+    Watches the video device nodes and probes only the ones that appear, on a background thread
+
+    Results are queued in events as ("added", index, source) or ("removed", index, None),
+    to be applied by the GUI thread.
+    """
+    def __init__(self, dev_dir="/dev", open_device=open_camera_device, watcher=None,
+                 probe_attempts=4, probe_delay=0.5):
+        self.dev_dir = dev_dir
+        self.open_device = open_device
+        self.watcher = watcher
+        self.probe_attempts = probe_attempts
+        self.probe_delay = probe_delay
+        self.events = queue.Queue()
+        self.running = False
+        self.thread = None
+
+    def start(self):
+        if self.watcher is None:
+            self.watcher = create_watcher(self.dev_dir)
+        self.running = True
+        self.thread = threading.Thread(target=self._loop, name="DeviceMonitor", daemon=True)
+        self.thread.start()
+        print_info(f"Watching {self.dev_dir} for cameras being plugged in or out "
+                   f"({type(self.watcher).__name__})")
+
+    def stop(self):
+        self.running = False
+        if self.thread is not None:
+            self.thread.join(timeout=2)
+        if self.watcher is not None:
+            self.watcher.close()
+
+    def _loop(self):
+        while self.running:
+            try:
+                changes = self.watcher.wait(0.5)
+            except Exception as e:
+                print_error(f"Device watcher failed: {str(e)}")
+                time.sleep(1.0)
+                continue
+            for kind, name in changes:
+                match = DEVICE_NAME_PATTERN.match(name)
+                if match is None:
+                    continue
+                index = int(match.group(1))
+                if kind == "added":
+                    self._probe(index)
+                else:
+                    print_debug(f"Video device {name} removed")
+                    self.events.put(("removed", index, None))
+
+    def _probe(self, index):
+        # udev sets the permissions just after creating the node, retry a few times
+        for attempt in range(self.probe_attempts):
+            if not self.running:
+                return
+            if not os.path.exists(os.path.join(self.dev_dir, f"video{index}")):
+                return
+            try:
+                source = self.open_device(index)
+            except Exception as e:
+                print_debug(f"Probe of video{index} failed: {str(e)}")
+                source = None
+            if source is not None:
+                print_debug(f"Video device video{index} opened")
+                self.events.put(("added", index, source))
+                return
+            time.sleep(self.probe_delay)
+        # Metadata nodes of UVC cameras never open, nothing to report
+        print_debug(f"Video device video{index} is not a capture device")
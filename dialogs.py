@@ -3,15 +3,21 @@ import subprocess
 from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, 
                             QLineEdit, QPushButton, QGroupBox, QCheckBox, 
                             QSlider, QDialogButtonBox, QFileDialog, QMessageBox,
-                            QComboBox, QSpinBox, QWidget, QTabWidget)
-from PyQt5.QtCore import Qt, QTimer, QDateTime
-from utils import print_debug, print_info, print_error, print_warning, print_success
+                            QComboBox, QSpinBox, QDoubleSpinBox, QWidget, QTabWidget,
+                            QDateTimeEdit, QListWidget, QListWidgetItem)
+from PyQt5.QtCore import Qt, QTimer, QDateTime, QSize, QUrl
+from PyQt5.QtGui import QIcon, QPixmap, QDesktopServices
+from utils import print_debug, print_info, print_error, print_warning
+from capture_export import EXPORT_FORMATS
+from dedup import DEDUP_MODES
+from scheduler import validate_schedule_settings
+from overlay import OVERLAY_POSITIONS
+from timelapse import TimelapseBuilder, TimelapseJob
 
 class SliderWithValue(QWidget):
     """Custom widget that combines a slider and a numeric value"""
     def __init__(self, orientation=Qt.Horizontal, parent=None):
         super().__init__(parent)
-        print_debug("Initializing SliderWithValue widget")
         self.layout = QHBoxLayout()
         self.layout.setContentsMargins(0, 0, 0, 0)
         
@@ -36,13 +42,18 @@ class SliderWithValue(QWidget):
         self.setLayout(self.layout)
 
     def setRange(self, min_val, max_val):
-        print_debug(f"Setting slider range: {min_val} to {max_val}")
         self.slider.setRange(min_val, max_val)
         self.value_display.setRange(min_val, max_val)
         
     def setValue(self, value):
-        print_debug(f"Setting slider value to: {value}")
         self.slider.setValue(value)
+    
+    def setValueSilently(self, value):
+        """Moves the slider without emitting valueChanged (value changed elsewhere)"""
+        self.slider.blockSignals(True)
+        self.value_display.setValue(value)
+        self.slider.setValue(value)
+        self.slider.blockSignals(False)
         
     def value(self):
         return self.slider.value()
@@ -51,6 +62,11 @@ class SliderWithValue(QWidget):
         return self.slider.valueChanged
 
 class GlobalControlDialog(QDialog):
+    # Slider moves are collected and applied at most this often, so dragging a slider
+    # reprocesses each camera once per period instead of once per tick
+    ADJUST_DELAY_MS = 50
+    ADJUSTMENTS = ["brightness", "contrast", "saturation"]
+
     def __init__(self, parent=None):
         super().__init__(parent)
         print_info("Opening Global Settings dialog")
@@ -58,76 +74,89 @@ class GlobalControlDialog(QDialog):
         self.layout = QVBoxLayout()
         self.parent_widget = parent
 
-        # Create tabs widget
+        # Camera tabs are empty until first shown, opening stays fast with many cameras.
+        # Tabs, sliders, group items and pending moves are keyed by camera tile rather than
+        # index, cameras can be plugged in or out while the dialog is open
         print_debug(f"Creating tab widget for {parent.num_cam} cameras")
         self.tab_widget = QTabWidget()
-        
-        # For each camera, create a tab
-        for idx in range(parent.num_cam):
-            print_debug(f"Configuring tab for camera {idx}")
-            # Create a widget to contain controls for this camera
-            camera_widget = QWidget()
-            group_layout = QVBoxLayout(camera_widget)
-
-            # Camera name
-            name_edit = QLineEdit(parent.cam_widgets[idx].name)
-            name_edit.textChanged.connect(lambda text, i=idx: parent.set_camera_name(i, text))
-            group_layout.addWidget(QLabel("Name"))
-            group_layout.addWidget(name_edit)
-
-            # Visibility checkbox
-            vis_cb = QCheckBox("Visible")
-            vis_cb.setChecked(parent.visible_flags[idx])
-            vis_cb.stateChanged.connect(lambda state, i=idx: parent.toggle_camera(i, state))
-            group_layout.addWidget(vis_cb)
-
-            # Brightness slider with value
-            print_debug(f"Setting up brightness slider for camera {idx}, current value: {parent.cam_widgets[idx].brightness}")
-            brightness_slider = SliderWithValue(Qt.Horizontal)
-            brightness_slider.setRange(-50, 50)  # Reduced scale
-            brightness_slider.setValue(parent.cam_widgets[idx].brightness)
-            brightness_slider.slider.valueChanged.connect(lambda value, i=idx: parent.set_brightness(i, value))
-            group_layout.addWidget(QLabel("Brightness"))
-            group_layout.addWidget(brightness_slider)
-
-            # Contrast slider with value
-            print_debug(f"Setting up contrast slider for camera {idx}, current value: {parent.cam_widgets[idx].contrast}")
-            contrast_slider = SliderWithValue(Qt.Horizontal)
-            contrast_slider.setRange(-50, 50)  # Reduced scale
-            contrast_slider.setValue(parent.cam_widgets[idx].contrast)
-            contrast_slider.slider.valueChanged.connect(lambda value, i=idx: parent.set_contrast(i, value))
-            group_layout.addWidget(QLabel("Contrast"))
-            group_layout.addWidget(contrast_slider)
-            
-            # Saturation slider with value
-            current_saturation = getattr(parent.cam_widgets[idx], 'saturation', 0)
-            print_debug(f"Setting up saturation slider for camera {idx}, current value: {current_saturation}")
-            saturation_slider = SliderWithValue(Qt.Horizontal)
-            saturation_slider.setRange(-50, 50)  # Reduced scale
-            saturation_slider.setValue(current_saturation)
-            saturation_slider.slider.valueChanged.connect(lambda value, i=idx: parent.set_saturation(i, value))
-            group_layout.addWidget(QLabel("Saturation"))
-            group_layout.addWidget(saturation_slider)
-
-            # Rotation buttons
-            rotate_layout = QHBoxLayout()
-            rotate_left = QPushButton("⟲")
-            rotate_left.clicked.connect(lambda _, i=idx: parent.rotate_camera(i, -90))
-            rotate_right = QPushButton("⟳")
-            rotate_right.clicked.connect(lambda _, i=idx: parent.rotate_camera(i, 90))
-            rotate_layout.addWidget(rotate_left)
-            rotate_layout.addWidget(rotate_right)
-            group_layout.addWidget(QLabel("Rotation"))
-            group_layout.addLayout(rotate_layout)
-
-            # Add stretch at the end to prevent widget stretching
-            group_layout.addStretch(1)
-            
-            # Add tab with camera name
-            self.tab_widget.addTab(camera_widget, f"Camera {idx}")
+        self.tab_pages = {}
+        self.tab_sliders = {}
+
+        self.pending_adjustments = {}
+        self.adjust_timer = QTimer(self)
+        self.adjust_timer.setSingleShot(True)
+        self.adjust_timer.timeout.connect(self.apply_pending_adjustments)
+
+        # Group mode: adjustments made in any tab go to every checked camera in one batch
+        self.group_cb = QCheckBox("Apply adjustments to a group of cameras")
+        self.group_list = QListWidget()
+        self.group_list.setMaximumHeight(120)
+        self.group_list.setVisible(False)
+        self.group_items = {}
+        self.group_cb.toggled.connect(self.group_list.setVisible)
 
-        # Add tabs widget to main layout
+        self.sync_cameras()
+        self.tab_widget.currentChanged.connect(self.build_tab)
+        parent.cameras_changed.connect(self.sync_cameras)
         self.layout.addWidget(self.tab_widget)
+        self.layout.addWidget(self.group_cb)
+        self.layout.addWidget(self.group_list)
+
+        self.build_tab(self.tab_widget.currentIndex())
+
+        # Cheaper previews for MJPEG cameras, captures keep the full resolution
+        reduced_decoding_cb = QCheckBox("Decode MJPEG previews at tile size")
+        reduced_decoding_cb.setChecked(parent.reduced_decoding)
+        reduced_decoding_cb.toggled.connect(parent.set_reduced_decoding)
+        self.layout.addWidget(reduced_decoding_cb)
+
+        # Camera wall paging for large camera counts
+        wall_group = QGroupBox("Camera Wall")
+        wall_layout = QHBoxLayout(wall_group)
+        page_size_spin = QSpinBox()
+        page_size_spin.setRange(0, 64)
+        page_size_spin.setSpecialValueText("All")
+        page_size_spin.setValue(parent.wall_settings["page_size"])
+        page_size_spin.valueChanged.connect(lambda value: parent.set_wall_setting("page_size", value))
+        cycle_spin = QSpinBox()
+        cycle_spin.setRange(0, 3600)
+        cycle_spin.setSpecialValueText("Manual")
+        cycle_spin.setSuffix(" s")
+        cycle_spin.setValue(parent.wall_settings["cycle_seconds"])
+        cycle_spin.valueChanged.connect(lambda value: parent.set_wall_setting("cycle_seconds", value))
+        offpage_fps_spin = QSpinBox()
+        offpage_fps_spin.setRange(1, 30)
+        offpage_fps_spin.setSuffix(" fps")
+        offpage_fps_spin.setValue(parent.wall_settings["offpage_fps"])
+        offpage_fps_spin.valueChanged.connect(lambda value: parent.set_wall_setting("offpage_fps", value))
+        wall_layout.addWidget(QLabel("Cameras per page"))
+        wall_layout.addWidget(page_size_spin)
+        wall_layout.addWidget(QLabel("Cycle"))
+        wall_layout.addWidget(cycle_spin)
+        wall_layout.addWidget(QLabel("Off-page rate"))
+        wall_layout.addWidget(offpage_fps_spin)
+        self.layout.addWidget(wall_group)
+
+        # RAM ceiling of the frame buffers, with the current usage of each component
+        memory_group = QGroupBox("Memory Budget")
+        memory_layout = QVBoxLayout(memory_group)
+        limit_layout = QHBoxLayout()
+        memory_limit_spin = QSpinBox()
+        memory_limit_spin.setRange(0, 1024 * 1024)
+        memory_limit_spin.setSingleStep(256)
+        memory_limit_spin.setSpecialValueText("No limit")
+        memory_limit_spin.setSuffix(" MB")
+        memory_limit_spin.setValue(parent.memory_settings["limit_mb"])
+        memory_limit_spin.valueChanged.connect(parent.set_memory_limit)
+        limit_layout.addWidget(QLabel("Limit"))
+        limit_layout.addWidget(memory_limit_spin)
+        memory_layout.addLayout(limit_layout)
+        self.memory_label = QLabel(parent.memory.report())
+        memory_layout.addWidget(self.memory_label)
+        self.layout.addWidget(memory_group)
+        # Refreshed while the dialog is shown
+        self.memory_timer = QTimer(self)
+        self.memory_timer.timeout.connect(self.update_memory_usage)
 
         # Buttons to save and load configurations
         button_layout = QHBoxLayout()
@@ -146,7 +175,156 @@ class GlobalControlDialog(QDialog):
         self.setLayout(self.layout)
         print_debug("Global Settings dialog ready")
 
+    def sync_cameras(self):
+        """Adds a tab and a group entry for each new camera, drops those of removed cameras"""
+        cameras = self.parent_widget.cam_widgets
+        for camera in [c for c in self.tab_pages if c not in cameras]:
+            page = self.tab_pages.pop(camera)
+            self.tab_widget.removeTab(self.tab_widget.indexOf(page))
+            page.deleteLater()
+            self.tab_sliders.pop(camera, None)
+            self.pending_adjustments.pop(camera, None)
+            item = self.group_items.pop(camera)
+            self.group_list.takeItem(self.group_list.row(item))
+        for camera in cameras:
+            if camera in self.tab_pages:
+                continue
+            page = QWidget()
+            self.tab_pages[camera] = page
+            self.tab_widget.addTab(page, camera.name)
+            item = QListWidgetItem(camera.name)
+            item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
+            item.setCheckState(Qt.Unchecked)
+            self.group_items[camera] = item
+            self.group_list.addItem(item)
+
+    def camera_action(self, camera, method, *args):
+        """Calls a per-camera method of the parent with the camera's current index, if it is still there"""
+        idx = self.parent_widget.camera_index(camera)
+        if idx is not None:
+            method(idx, *args)
+
+    def rename_camera(self, camera, name):
+        self.camera_action(camera, self.parent_widget.set_camera_name, name)
+        self.tab_widget.setTabText(self.tab_widget.indexOf(self.tab_pages[camera]), name)
+        self.group_items[camera].setText(name)
+
+    def build_tab(self, tab_idx):
+        """Creates the controls of a camera tab the first time it is shown"""
+        if tab_idx < 0:
+            return
+        page = self.tab_widget.widget(tab_idx)
+        camera = next(c for c, p in self.tab_pages.items() if p is page)
+        if camera in self.tab_sliders:
+            return
+        parent = self.parent_widget
+        group_layout = QVBoxLayout(page)
+
+        # Camera name
+        name_edit = QLineEdit(camera.name)
+        name_edit.textChanged.connect(lambda text, c=camera: self.rename_camera(c, text))
+        group_layout.addWidget(QLabel("Name"))
+        group_layout.addWidget(name_edit)
+
+        # Visibility checkbox
+        vis_cb = QCheckBox("Visible")
+        vis_cb.setChecked(parent.visible_flags[parent.camera_index(camera)])
+        vis_cb.stateChanged.connect(lambda state, c=camera: self.camera_action(c, parent.toggle_camera, state))
+        group_layout.addWidget(vis_cb)
+
+        # Monochrome/IR cameras: single-channel processing and saving
+        gray_cb = QCheckBox("Grayscale")
+        gray_cb.setChecked(camera.grayscale)
+        gray_cb.toggled.connect(lambda checked, c=camera: self.camera_action(c, parent.set_grayscale, checked))
+        group_layout.addWidget(gray_cb)
+
+        # Follows daylight changes instead of retuning the sliders, which apply on top of it
+        auto_cb = QCheckBox("Auto exposure and white balance")
+        auto_cb.setChecked(camera.auto_normalize)
+        auto_cb.toggled.connect(lambda checked, c=camera: self.camera_action(c, parent.set_auto_normalize, checked))
+        group_layout.addWidget(auto_cb)
+
+        # Brightness, contrast and saturation sliders with value
+        sliders = {}
+        for key in self.ADJUSTMENTS:
+            slider = SliderWithValue(Qt.Horizontal)
+            slider.setRange(-50, 50)  # Reduced scale
+            slider.setValue(getattr(camera, key))
+            slider.slider.valueChanged.connect(lambda value, c=camera, k=key: self.queue_adjustment(c, k, value))
+            group_layout.addWidget(QLabel(key.capitalize()))
+            group_layout.addWidget(slider)
+            sliders[key] = slider
+        self.tab_sliders[camera] = sliders
+
+        # Rotation buttons
+        rotate_layout = QHBoxLayout()
+        rotate_left = QPushButton("⟲")
+        rotate_left.clicked.connect(lambda _, c=camera: self.rotate_cameras(c, -90))
+        rotate_right = QPushButton("⟳")
+        rotate_right.clicked.connect(lambda _, c=camera: self.rotate_cameras(c, 90))
+        rotate_layout.addWidget(rotate_left)
+        rotate_layout.addWidget(rotate_right)
+        group_layout.addWidget(QLabel("Rotation"))
+        group_layout.addLayout(rotate_layout)
+
+        # Add stretch at the end to prevent widget stretching
+        group_layout.addStretch(1)
+
+    def group_targets(self, camera):
+        """Cameras affected by a change made in the tab of the given camera"""
+        if not self.group_cb.isChecked():
+            return [camera]
+        targets = [c for c, item in self.group_items.items() if item.checkState() == Qt.Checked]
+        if camera not in targets:
+            targets.append(camera)
+        return targets
+
+    def queue_adjustment(self, camera, key, value):
+        for target in self.group_targets(camera):
+            self.pending_adjustments.setdefault(target, {})[key] = value
+            if target is not camera and target in self.tab_sliders:
+                self.tab_sliders[target][key].setValueSilently(value)
+        if not self.adjust_timer.isActive():
+            self.adjust_timer.start(self.ADJUST_DELAY_MS)
+
+    def apply_pending_adjustments(self):
+        if self.pending_adjustments:
+            adjustments = {}
+            for camera, values in self.pending_adjustments.items():
+                idx = self.parent_widget.camera_index(camera)
+                if idx is not None:
+                    adjustments[idx] = values
+            self.pending_adjustments = {}
+            if adjustments:
+                self.parent_widget.apply_adjustments(adjustments)
+
+    def rotate_cameras(self, camera, angle):
+        for target in self.group_targets(camera):
+            self.camera_action(target, self.parent_widget.rotate_camera, angle)
+
+    def update_memory_usage(self):
+        self.memory_label.setText(self.parent_widget.memory.report())
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.memory_timer.start(1000)
+
+    def hideEvent(self, event):
+        self.memory_timer.stop()
+        super().hideEvent(event)
+
+    def done(self, result):
+        # Slider moves still waiting for the timer are not lost when the dialog closes
+        self.adjust_timer.stop()
+        self.memory_timer.stop()
+        self.apply_pending_adjustments()
+        self.parent_widget.cameras_changed.disconnect(self.sync_cameras)
+        super().done(result)
+
 class ScreenshotDialog(QDialog):
+    # Scheduled captures are checked this often, the schedules themselves are in seconds
+    SCHEDULE_TICK_MS = 100
+
     def __init__(self, parent=None):
         super().__init__(parent)
         print_info("Opening Screenshot Settings dialog")
@@ -159,9 +337,14 @@ class ScreenshotDialog(QDialog):
         self.save_folder_edit = QLineEdit()
         self.save_folder_button = QPushButton("Choose...")
         self.save_folder_button.clicked.connect(self.choose_save_folder)
+        self.browse_button = QPushButton("Browse captures...")
+        self.browse_button.clicked.connect(self.browse_captures)
         self.layout.addWidget(self.save_folder_label)
         self.layout.addWidget(self.save_folder_edit)
-        self.layout.addWidget(self.save_folder_button)
+        folder_buttons = QHBoxLayout()
+        folder_buttons.addWidget(self.save_folder_button)
+        folder_buttons.addWidget(self.browse_button)
+        self.layout.addLayout(folder_buttons)
 
         # Screenshot interval
         self.interval_label = QLabel("Screenshot Interval (seconds):")
@@ -170,11 +353,180 @@ class ScreenshotDialog(QDialog):
         self.layout.addWidget(self.interval_label)
         self.layout.addWidget(self.interval_edit)
         
+        # Per-camera schedules, staggered so the cameras are not all encoded and written at once
+        schedule = parent.schedule_settings
+        schedule_group = QGroupBox("Schedule")
+        schedule_layout = QVBoxLayout(schedule_group)
+        
+        schedule_options = QHBoxLayout()
+        self.schedule_cb = QCheckBox("Capture each camera on its own schedule")
+        self.schedule_cb.setChecked(schedule["enabled"])
+        self.schedule_cb.stateChanged.connect(lambda state: self.set_schedule_setting("enabled", state == Qt.Checked))
+        schedule_options.addWidget(self.schedule_cb)
+        self.stagger_cb = QCheckBox("Stagger captures")
+        self.stagger_cb.setChecked(schedule["stagger"])
+        self.stagger_cb.stateChanged.connect(lambda state: self.set_schedule_setting("stagger", state == Qt.Checked))
+        schedule_options.addWidget(self.stagger_cb)
+        schedule_options.addWidget(QLabel("Active hours:"))
+        self.window_edit = QLineEdit(schedule["window"])
+        self.window_edit.setPlaceholderText("HH:MM-HH:MM, empty for always")
+        self.window_edit.textChanged.connect(lambda text: self.set_schedule_setting("window", text))
+        schedule_options.addWidget(self.window_edit)
+        schedule_layout.addLayout(schedule_options)
+        
+        camera_schedule = QHBoxLayout()
+        self.schedule_camera_combo = QComboBox()
+        for widget in parent.cam_widgets:
+            self.schedule_camera_combo.addItem(widget.name, parent.schedule_key(widget))
+        camera_schedule.addWidget(self.schedule_camera_combo)
+        camera_schedule.addWidget(QLabel("Every:"))
+        self.camera_interval_spin = QSpinBox()
+        self.camera_interval_spin.setRange(0, 86400)
+        self.camera_interval_spin.setSuffix(" s")
+        self.camera_interval_spin.setSpecialValueText("Capture interval")
+        camera_schedule.addWidget(self.camera_interval_spin)
+        camera_schedule.addWidget(QLabel("Hours:"))
+        self.camera_window_edit = QLineEdit()
+        self.camera_window_edit.setPlaceholderText("Active hours")
+        camera_schedule.addWidget(self.camera_window_edit)
+        schedule_layout.addLayout(camera_schedule)
+        self.load_camera_schedule()
+        self.schedule_camera_combo.currentIndexChanged.connect(self.load_camera_schedule)
+        # Cameras can be plugged in or out while the dialog is open
+        parent.cameras_changed.connect(self.update_schedule_cameras)
+        self.camera_interval_spin.valueChanged.connect(self.save_camera_schedule)
+        self.camera_window_edit.textChanged.connect(self.save_camera_schedule)
+        
+        self.schedule_status = QLabel("")
+        schedule_layout.addWidget(self.schedule_status)
+        self.layout.addWidget(schedule_group)
+        self.scheduler = None
+        
         # Checkbox for showing labels in screenshots
         self.show_labels_cb = QCheckBox("Show camera labels in screenshots")
         self.show_labels_cb.setChecked(parent.show_labels_in_screenshots)
         self.show_labels_cb.stateChanged.connect(self.toggle_labels)
-        self.layout.addWidget(self.show_labels_cb)
+        overlay_layout = QHBoxLayout()
+        overlay_layout.addWidget(self.show_labels_cb)
+        self.timestamp_cb = QCheckBox("Burn in timestamp")
+        self.timestamp_cb.setChecked(parent.overlay_settings["timestamp"])
+        self.timestamp_cb.stateChanged.connect(
+            lambda state: self.set_overlay_setting("timestamp", state == Qt.Checked))
+        overlay_layout.addWidget(self.timestamp_cb)
+        self.overlay_position_combo = QComboBox()
+        self.overlay_position_combo.addItems(OVERLAY_POSITIONS)
+        self.overlay_position_combo.setCurrentText(parent.overlay_settings["position"])
+        self.overlay_position_combo.currentTextChanged.connect(
+            lambda position: self.set_overlay_setting("position", position))
+        overlay_layout.addWidget(self.overlay_position_combo)
+        self.layout.addLayout(overlay_layout)
+        
+        # Output files: composite and/or one file per camera
+        settings = parent.export_settings
+        output_group = QGroupBox("Output")
+        output_layout = QVBoxLayout(output_group)
+        
+        self.save_composite_cb = QCheckBox("Save composite image")
+        self.save_composite_cb.setChecked(settings["save_composite"])
+        self.save_composite_cb.stateChanged.connect(
+            lambda state: self.set_export_setting("save_composite", state == Qt.Checked))
+        output_layout.addWidget(self.save_composite_cb)
+        
+        self.save_individual_cb = QCheckBox("Save each camera as its own file (with JSON manifest)")
+        self.save_individual_cb.setChecked(settings["save_individual"])
+        self.save_individual_cb.stateChanged.connect(
+            lambda state: self.set_export_setting("save_individual", state == Qt.Checked))
+        output_layout.addWidget(self.save_individual_cb)
+        
+        format_layout = QHBoxLayout()
+        format_layout.addWidget(QLabel("Format:"))
+        self.format_combo = QComboBox()
+        self.format_combo.addItems(list(EXPORT_FORMATS.keys()))
+        self.format_combo.setCurrentText(settings["format"])
+        self.format_combo.currentTextChanged.connect(self.change_format)
+        format_layout.addWidget(self.format_combo)
+        
+        self.quality_label = QLabel("Quality:")
+        format_layout.addWidget(self.quality_label)
+        self.quality_spin = QSpinBox()
+        self.quality_spin.setRange(1, 100)
+        self.quality_spin.setValue(settings["quality"])
+        self.quality_spin.valueChanged.connect(lambda value: self.set_export_setting("quality", value))
+        format_layout.addWidget(self.quality_spin)
+        
+        self.png_compression_label = QLabel("Compression:")
+        format_layout.addWidget(self.png_compression_label)
+        self.png_compression_spin = QSpinBox()
+        self.png_compression_spin.setRange(0, 9)
+        self.png_compression_spin.setValue(settings["png_compression"])
+        self.png_compression_spin.valueChanged.connect(lambda value: self.set_export_setting("png_compression", value))
+        format_layout.addWidget(self.png_compression_spin)
+        output_layout.addLayout(format_layout)
+        
+        dedup_layout = QHBoxLayout()
+        self.dedup_cb = QCheckBox("Skip captures identical to the previous one")
+        self.dedup_cb.setChecked(settings["dedup"])
+        self.dedup_cb.stateChanged.connect(lambda state: self.set_export_setting("dedup", state == Qt.Checked))
+        dedup_layout.addWidget(self.dedup_cb)
+        dedup_layout.addWidget(QLabel("Tolerance:"))
+        self.dedup_threshold_spin = QSpinBox()
+        self.dedup_threshold_spin.setRange(0, 32)
+        self.dedup_threshold_spin.setValue(settings["dedup_threshold"])
+        self.dedup_threshold_spin.setToolTip("Number of differing hash bits (out of 64) still considered identical")
+        self.dedup_threshold_spin.valueChanged.connect(lambda value: self.set_export_setting("dedup_threshold", value))
+        dedup_layout.addWidget(self.dedup_threshold_spin)
+        self.dedup_mode_combo = QComboBox()
+        self.dedup_mode_combo.addItems(DEDUP_MODES)
+        self.dedup_mode_combo.setCurrentText(settings["dedup_mode"])
+        self.dedup_mode_combo.currentTextChanged.connect(lambda mode: self.set_export_setting("dedup_mode", mode))
+        dedup_layout.addWidget(self.dedup_mode_combo)
+        output_layout.addLayout(dedup_layout)
+        
+        self.layout.addWidget(output_group)
+        self.update_format_controls()
+        
+        # Retention: oldest captures are deleted past the quotas, capture pauses on a full disk
+        retention = parent.retention_settings
+        retention_group = QGroupBox("Retention (0 = no limit)")
+        retention_layout = QHBoxLayout(retention_group)
+        
+        retention_layout.addWidget(QLabel("Max size (GB):"))
+        self.max_size_spin = QDoubleSpinBox()
+        self.max_size_spin.setRange(0, 100000)
+        self.max_size_spin.setDecimals(1)
+        self.max_size_spin.setValue(retention["max_size_gb"])
+        self.max_size_spin.setToolTip("Capture images and manifests, hard-linked duplicates counted once.\n"
+                                      "The thumbnail cache and the catalog database are not counted.")
+        self.max_size_spin.valueChanged.connect(lambda value: self.set_retention_setting("max_size_gb", value))
+        retention_layout.addWidget(self.max_size_spin)
+        
+        retention_layout.addWidget(QLabel("Max age (days):"))
+        self.max_age_spin = QSpinBox()
+        self.max_age_spin.setRange(0, 3650)
+        self.max_age_spin.setValue(retention["max_age_days"])
+        self.max_age_spin.valueChanged.connect(lambda value: self.set_retention_setting("max_age_days", value))
+        retention_layout.addWidget(self.max_age_spin)
+        
+        retention_layout.addWidget(QLabel("Pause below (GB free):"))
+        self.min_free_spin = QDoubleSpinBox()
+        self.min_free_spin.setRange(0, 10000)
+        self.min_free_spin.setDecimals(1)
+        self.min_free_spin.setValue(retention["min_free_gb"])
+        self.min_free_spin.valueChanged.connect(lambda value: self.set_retention_setting("min_free_gb", value))
+        retention_layout.addWidget(self.min_free_spin)
+        
+        self.layout.addWidget(retention_group)
+        self.capture_paused = False
+        
+        # Time-lapse, built live from the captures or afterwards from the folder
+        timelapse_layout = QHBoxLayout()
+        self.live_timelapse_cb = QCheckBox("Build time-lapse while capturing")
+        self.live_timelapse_cb.setChecked(parent.live_timelapse is not None)
+        timelapse_layout.addWidget(self.live_timelapse_cb)
+        self.timelapse_button = QPushButton("Time-lapse...")
+        self.timelapse_button.clicked.connect(self.show_timelapse_dialog)
+        timelapse_layout.addWidget(self.timelapse_button)
+        self.layout.addLayout(timelapse_layout)
 
         # Start/Stop buttons
         button_layout = QHBoxLayout()
@@ -199,6 +551,68 @@ class ScreenshotDialog(QDialog):
         self.parent_widget.show_labels_in_screenshots = (state == Qt.Checked)
         print_debug(f"Show labels in screenshots: {self.parent_widget.show_labels_in_screenshots}")
 
+    def set_export_setting(self, key, value):
+        self.parent_widget.export_settings[key] = value
+        print_debug(f"Export setting {key}: {value}")
+
+    def set_overlay_setting(self, key, value):
+        self.parent_widget.overlay_settings[key] = value
+        print_debug(f"Overlay setting {key}: {value}")
+
+    def set_schedule_setting(self, key, value):
+        self.parent_widget.schedule_settings[key] = value
+        print_debug(f"Schedule setting {key}: {value}")
+
+    def update_schedule_cameras(self):
+        """Lists the current cameras, schedules are keyed by camera so the selection is kept"""
+        key = self.schedule_camera_combo.currentData()
+        self.schedule_camera_combo.blockSignals(True)
+        self.schedule_camera_combo.clear()
+        for widget in self.parent_widget.cam_widgets:
+            self.schedule_camera_combo.addItem(widget.name, self.parent_widget.schedule_key(widget))
+        selected = self.schedule_camera_combo.findData(key)
+        self.schedule_camera_combo.setCurrentIndex(max(selected, 0))
+        self.schedule_camera_combo.blockSignals(False)
+        self.load_camera_schedule()
+
+    def load_camera_schedule(self):
+        key = self.schedule_camera_combo.currentData()
+        camera_schedule = self.parent_widget.schedule_settings["cameras"].get(key, {})
+        for control in (self.camera_interval_spin, self.camera_window_edit):
+            control.blockSignals(True)
+        self.camera_interval_spin.setValue(camera_schedule.get("interval", 0))
+        self.camera_window_edit.setText(camera_schedule.get("window", ""))
+        for control in (self.camera_interval_spin, self.camera_window_edit):
+            control.blockSignals(False)
+
+    def save_camera_schedule(self):
+        key = self.schedule_camera_combo.currentData()
+        if key is None:
+            return
+        cameras = self.parent_widget.schedule_settings["cameras"]
+        interval = self.camera_interval_spin.value()
+        window = self.camera_window_edit.text().strip()
+        if interval or window:
+            cameras[key] = {"interval": interval, "window": window}
+        else:
+            cameras.pop(key, None)
+
+    def set_retention_setting(self, key, value):
+        self.parent_widget.retention_settings[key] = value
+        print_debug(f"Retention setting {key}: {value}")
+
+    def change_format(self, fmt):
+        self.set_export_setting("format", fmt)
+        self.update_format_controls()
+
+    def update_format_controls(self):
+        # PNG is lossless and only has a compression level, JPEG/WebP only a quality
+        is_png = self.format_combo.currentText() == "PNG"
+        self.quality_label.setVisible(not is_png)
+        self.quality_spin.setVisible(not is_png)
+        self.png_compression_label.setVisible(is_png)
+        self.png_compression_spin.setVisible(is_png)
+
     def choose_save_folder(self):
         print_debug("User is selecting a save folder")
         folder = QFileDialog.getExistingDirectory(self, "Choose Save Folder")
@@ -208,6 +622,19 @@ class ScreenshotDialog(QDialog):
         else:
             print_debug("Folder selection cancelled")
 
+    def browse_captures(self):
+        save_folder = self.save_folder_edit.text()
+        if not os.path.exists(save_folder):
+            QMessageBox.information(self, "Captures", "No captures in this folder yet")
+            return
+        catalog = self.parent_widget.get_capture_exporter().get_catalog(save_folder)
+        dialog = CaptureBrowserDialog(catalog, self)
+        dialog.exec_()
+
+    def show_timelapse_dialog(self):
+        dialog = TimelapseDialog(self.parent_widget, self.save_folder_edit.text(), self)
+        dialog.exec_()
+
     def start_screenshot(self):
         interval_text = self.interval_edit.text()
         if not interval_text.isdigit() or int(interval_text) < 1:
@@ -215,9 +642,17 @@ class ScreenshotDialog(QDialog):
             interval_text = "1"
             self.interval_edit.setText(interval_text)
         
+        if self.parent_widget.schedule_settings["enabled"]:
+            try:
+                validate_schedule_settings(self.parent_widget.schedule_settings)
+            except ValueError as e:
+                print_error(str(e))
+                QMessageBox.warning(self, "Schedule", str(e))
+                return
+        
         interval = int(interval_text) * 1000
         print_info(f"Starting screenshot recording with interval: {interval_text} seconds")
-        self.screenshot_timer.start(interval)
+        self.parent_widget.get_capture_exporter().deduplicator.reset_stats()
         
         save_folder = self.save_folder_edit.text()
         if not os.path.exists(save_folder):
@@ -234,23 +669,304 @@ class ScreenshotDialog(QDialog):
             except Exception as e:
                 print_error(f"Failed to open folder: {str(e)}")
                 
+        if self.live_timelapse_cb.isChecked() and self.parent_widget.live_timelapse is None:
+            timestamp = QDateTime.currentDateTime().toString("yyyyMMdd_hhmmss")
+            settings = self.parent_widget.timelapse_settings
+            builder = TimelapseBuilder(os.path.join(save_folder, f"timelapse_{timestamp}.mp4"),
+                                       settings["fps"], settings["skip"], settings["average"])
+            builder.start_live()
+            self.parent_widget.live_timelapse = builder
+        
+        self.scheduler = None
+        if self.parent_widget.schedule_settings["enabled"]:
+            self.scheduler = self.parent_widget.build_capture_scheduler(int(interval_text))
+            self.schedule_status.setText(self.scheduler.summary())
+            self.screenshot_timer.start(self.SCHEDULE_TICK_MS)
+        else:
+            self.screenshot_timer.start(interval)
+                
         print_info("Screenshot recording started")
         QMessageBox.information(self, "Screenshot", "Recording started")
 
     def stop_screenshot(self):
         print_info("Stopping screenshot recording")
         self.screenshot_timer.stop()
+        if self.parent_widget.live_timelapse is not None:
+            # Flushes the pending frames and finalizes the video
+            self.parent_widget.live_timelapse.stop_live()
+            self.parent_widget.live_timelapse = None
         print_info("Screenshot recording stopped")
-        QMessageBox.information(self, "Screenshot", "Recording stopped")
+        message = "Recording stopped"
+        if self.scheduler is not None:
+            message += "\n" + self.scheduler.report()
+            self.scheduler = None
+        if self.parent_widget.export_settings["dedup"]:
+            message += "\n" + self.parent_widget.get_capture_exporter().deduplicator.report()
+        QMessageBox.information(self, "Screenshot", message)
 
     def take_screenshot(self):
+        due = None
+        if self.scheduler is not None:
+            due = self.scheduler.due()
+            if not due:
+                return
+        
         save_folder = self.save_folder_edit.text()
         if not os.path.exists(save_folder):
             print_debug(f"Creating screenshots directory: {save_folder}")
             os.makedirs(save_folder)
             
+        retention = self.parent_widget.get_capture_exporter().get_retention(save_folder)
+        retention.check_free_space()
+        if not retention.can_capture():
+            # Disk almost full: skip this capture, the timer keeps running and resumes when space is back
+            if not self.capture_paused:
+                self.capture_paused = True
+                self.setWindowTitle("Screenshot Settings - paused, disk full")
+            return
+        if self.capture_paused:
+            self.capture_paused = False
+            self.setWindowTitle("Screenshot Settings")
+        if self.parent_widget.capture_throttled():
+            return
+        
         timestamp = QDateTime.currentDateTime().toString("yyyyMMdd_hhmmss")
-        filename = os.path.join(save_folder, f"screenshot_{timestamp}.jpg")
-        print_success(f"Saved screenshot: {filename}")
+        print_info(f"Capturing screenshot_{timestamp} to {save_folder}")
         
-        self.parent_widget.take_screenshot(filename)
+        # Encoding and writing happen on the exporter's worker pool
+        if due is None:
+            self.parent_widget.export_capture(save_folder, "screenshot", timestamp)
+        else:
+            self.parent_widget.export_scheduled(save_folder, "screenshot", timestamp, due, self.scheduler)
+            self.schedule_status.setText(self.scheduler.summary())
+
+
+class TimelapseDialog(QDialog):
+    """Builds a time-lapse from a capture folder on a background thread"""
+    def __init__(self, cam_flux_widget, folder, parent=None):
+        super().__init__(parent)
+        print_info("Opening Time-lapse dialog")
+        self.setWindowTitle("Time-lapse")
+        self.cam_flux_widget = cam_flux_widget
+        self.job = None
+        self.layout = QVBoxLayout()
+        settings = cam_flux_widget.timelapse_settings
+
+        self.folder_edit = QLineEdit(folder)
+        self.layout.addWidget(QLabel("Capture folder:"))
+        self.layout.addWidget(self.folder_edit)
+
+        self.source_combo = QComboBox()
+        self.source_combo.addItem("Composite")
+        self.source_combo.addItems([widget.name for widget in cam_flux_widget.cam_widgets])
+        self.layout.addWidget(QLabel("Source:"))
+        self.layout.addWidget(self.source_combo)
+
+        output_layout = QHBoxLayout()
+        timestamp = QDateTime.currentDateTime().toString("yyyyMMdd_hhmmss")
+        self.output_edit = QLineEdit(os.path.join(folder, f"timelapse_{timestamp}.mp4"))
+        output_button = QPushButton("Choose...")
+        output_button.clicked.connect(self.choose_output)
+        output_layout.addWidget(self.output_edit)
+        output_layout.addWidget(output_button)
+        self.layout.addWidget(QLabel("Output video (an unfinished one is resumed):"))
+        self.layout.addLayout(output_layout)
+
+        options_layout = QHBoxLayout()
+        self.fps_spin = QSpinBox()
+        self.fps_spin.setRange(1, 120)
+        self.fps_spin.setValue(settings["fps"])
+        self.skip_spin = QSpinBox()
+        self.skip_spin.setRange(1, 1000)
+        self.skip_spin.setValue(settings["skip"])
+        self.average_spin = QSpinBox()
+        self.average_spin.setRange(1, 100)
+        self.average_spin.setValue(settings["average"])
+        options_layout.addWidget(QLabel("FPS:"))
+        options_layout.addWidget(self.fps_spin)
+        options_layout.addWidget(QLabel("Keep 1 frame in:"))
+        options_layout.addWidget(self.skip_spin)
+        options_layout.addWidget(QLabel("Average frames:"))
+        options_layout.addWidget(self.average_spin)
+        self.layout.addLayout(options_layout)
+
+        self.progress_label = QLabel("")
+        self.layout.addWidget(self.progress_label)
+
+        button_layout = QHBoxLayout()
+        self.start_button = QPushButton("Start")
+        self.start_button.clicked.connect(self.start_build)
+        self.cancel_button = QPushButton("Cancel")
+        self.cancel_button.clicked.connect(self.cancel_build)
+        self.cancel_button.setEnabled(False)
+        button_layout.addWidget(self.start_button)
+        button_layout.addWidget(self.cancel_button)
+        self.layout.addLayout(button_layout)
+        self.setLayout(self.layout)
+
+        self.progress_timer = QTimer()
+        self.progress_timer.timeout.connect(self.update_progress)
+
+    def choose_output(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Time-lapse Output", self.output_edit.text(), "Video (*.mp4 *.avi)")
+        if path:
+            self.output_edit.setText(path)
+
+    def start_build(self):
+        folder = self.folder_edit.text()
+        if not os.path.isdir(folder):
+            QMessageBox.warning(self, "Error", f"Folder not found: {folder}")
+            return
+
+        settings = self.cam_flux_widget.timelapse_settings
+        settings["fps"] = self.fps_spin.value()
+        settings["skip"] = self.skip_spin.value()
+        settings["average"] = self.average_spin.value()
+
+        camera = None
+        if self.source_combo.currentIndex() > 0:
+            camera = self.source_combo.currentText()
+        builder = TimelapseBuilder(self.output_edit.text(), settings["fps"], settings["skip"], settings["average"])
+        print_info(f"Building time-lapse from {folder} ({self.source_combo.currentText()})")
+        self.job = TimelapseJob(builder, folder, camera)
+        self.job.start()
+
+        self.start_button.setEnabled(False)
+        self.cancel_button.setEnabled(True)
+        self.progress_timer.start(200)
+
+    def cancel_build(self):
+        if self.job is not None:
+            self.job.cancel()
+
+    def update_progress(self):
+        job = self.job
+        self.progress_label.setText(f"{job.files_done} capture(s) read, {job.frames_written} frame(s) written")
+        if not job.finished:
+            return
+
+        self.progress_timer.stop()
+        self.start_button.setEnabled(True)
+        self.cancel_button.setEnabled(False)
+        self.job = None
+        if job.error:
+            QMessageBox.warning(self, "Error", f"Time-lapse failed: {job.error}")
+        elif job.completed:
+            QMessageBox.information(self, "Time-lapse", f"Time-lapse saved:\n{job.builder.output_path}")
+        else:
+            self.progress_label.setText("Cancelled, start again with the same output to resume")
+
+    def reject(self):
+        # Closing the dialog stops the build, it can be resumed later
+        if self.job is not None:
+            self.job.cancel()
+            self.job.thread.join()
+        super().reject()
+
+
+class CaptureBrowserDialog(QDialog):
+    """Browses a capture folder through its catalog, without scanning the folder"""
+    MAX_RESULTS = 500
+
+    def __init__(self, catalog, parent=None):
+        super().__init__(parent)
+        print_info(f"Opening capture browser for {catalog.folder}")
+        self.setWindowTitle("Captures")
+        self.catalog = catalog
+        self.resize(900, 600)
+        self.layout = QVBoxLayout()
+
+        # Filters
+        filter_layout = QHBoxLayout()
+        self.start_edit = QDateTimeEdit()
+        self.start_edit.setCalendarPopup(True)
+        self.start_edit.setDisplayFormat("yyyy-MM-dd hh:mm:ss")
+        self.end_edit = QDateTimeEdit()
+        self.end_edit.setCalendarPopup(True)
+        self.end_edit.setDisplayFormat("yyyy-MM-dd hh:mm:ss")
+        self.camera_combo = QComboBox()
+        search_button = QPushButton("Search")
+        search_button.clicked.connect(self.search)
+        import_button = QPushButton("Import existing files")
+        import_button.clicked.connect(self.import_existing)
+
+        filter_layout.addWidget(QLabel("From:"))
+        filter_layout.addWidget(self.start_edit)
+        filter_layout.addWidget(QLabel("To:"))
+        filter_layout.addWidget(self.end_edit)
+        filter_layout.addWidget(QLabel("Camera:"))
+        filter_layout.addWidget(self.camera_combo)
+        filter_layout.addWidget(search_button)
+        filter_layout.addWidget(import_button)
+        self.layout.addLayout(filter_layout)
+
+        # Results as a thumbnail grid
+        self.results_list = QListWidget()
+        self.results_list.setViewMode(QListWidget.IconMode)
+        self.results_list.setIconSize(QSize(catalog.thumbnail_width, catalog.thumbnail_width * 3 // 4))
+        self.results_list.setResizeMode(QListWidget.Adjust)
+        self.results_list.setUniformItemSizes(True)
+        self.results_list.itemDoubleClicked.connect(self.open_capture)
+        self.layout.addWidget(self.results_list)
+
+        self.status_label = QLabel()
+        self.layout.addWidget(self.status_label)
+
+        buttons = QDialogButtonBox(QDialogButtonBox.Ok)
+        buttons.accepted.connect(self.accept)
+        self.layout.addWidget(buttons)
+        self.setLayout(self.layout)
+
+        self.reset_filters()
+        self.search()
+
+    def reset_filters(self):
+        self.camera_combo.clear()
+        self.camera_combo.addItem("All cameras")
+        self.camera_combo.addItems(self.catalog.cameras())
+
+        # Default to the last 24 hours of captures
+        _, last = self.catalog.time_range()
+        end = QDateTime.fromSecsSinceEpoch(int(last) + 1) if last else QDateTime.currentDateTime()
+        self.end_edit.setDateTime(end)
+        self.start_edit.setDateTime(end.addDays(-1))
+
+    def search(self):
+        start = self.start_edit.dateTime().toSecsSinceEpoch()
+        end = self.end_edit.dateTime().toSecsSinceEpoch()
+        camera = None
+        if self.camera_combo.currentIndex() > 0:
+            camera = self.camera_combo.currentText()
+
+        entries = self.catalog.query(start, end, camera, limit=self.MAX_RESULTS)
+        print_debug(f"Capture browser query returned {len(entries)} result(s)")
+
+        self.results_list.clear()
+        for entry in entries:
+            timestamp = QDateTime.fromSecsSinceEpoch(int(entry["timestamp"])).toString("yyyy-MM-dd hh:mm:ss")
+            item = QListWidgetItem(f"{entry['camera']}\n{timestamp}")
+            thumbnail = self.catalog.ensure_thumbnail(entry)
+            if thumbnail:
+                item.setIcon(QIcon(QPixmap(thumbnail)))
+            tooltip = f"{entry['path']}\n{entry['size'] // 1024} KB"
+            if entry["motion_score"] is not None:
+                tooltip += f"\nMotion: {entry['motion_score']:.3f}"
+            item.setToolTip(tooltip)
+            item.setData(Qt.UserRole, entry["path"])
+            self.results_list.addItem(item)
+
+        status = f"{len(entries)} capture(s)"
+        if len(entries) >= self.MAX_RESULTS:
+            status += f" (limited to {self.MAX_RESULTS}, narrow the time range)"
+        self.status_label.setText(status)
+
+    def import_existing(self):
+        count = self.catalog.import_existing()
+        self.reset_filters()
+        self.search()
+        QMessageBox.information(self, "Captures", f"{count} existing file(s) added to the catalog")
+
+    def open_capture(self, item):
+        path = item.data(Qt.UserRole)
+        print_debug(f"Opening capture: {path}")
+        QDesktopServices.openUrl(QUrl.fromLocalFile(path))
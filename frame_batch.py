@@ -0,0 +1,124 @@
+from functools import lru_cache
+
+import cv2
+import numpy as np
+
+# np.rot90 turns counter-clockwise, these are the k values for the widget rotation angles
+ROTATION_STEPS = {0: 0, 90: 3, 180: 2, 270: 1}
+
+
+@lru_cache(maxsize=64)
+def brightness_contrast_lut(brightness, contrast):
+    """Same result as cv2.convertScaleAbs(frame, alpha=1 + contrast / 100, beta=brightness)"""
+    # Built by OpenCV itself so the rounding matches exactly
+    values = np.arange(256, dtype=np.uint8).reshape(1, 256)
+    lut = cv2.convertScaleAbs(values, alpha=1 + contrast / 100, beta=brightness).reshape(256)
+    lut.flags.writeable = False
+    return lut
+
+
+@lru_cache(maxsize=64)
+def saturation_lut(saturation):
+    """Scales the S channel of an HSV image by 1 + saturation / 100"""
+    values = np.arange(256, dtype=np.float32) * (1 + saturation / 100)
+    lut = np.clip(values, 0, 255).astype(np.uint8)
+    lut.flags.writeable = False
+    return lut
+
+
+def apply_luts(stack, luts):
+    """
+    Applies one lookup table per image of a stack, in place
+
+    Args:
+        stack (ndarray): uint8 array with the images along the first axis
+        luts (list): One 256 entry table per image (or 256 x channels for per-channel tables),
+            None to leave an image unchanged
+    """
+    distinct = {id(lut): lut for lut in luts if lut is not None}
+    if not distinct:
+        return stack
+    if any(lut is None for lut in luts) or any(lut.ndim == 2 for lut in distinct.values()):
+        # Per-channel tables (auto white balance), or images left unchanged that should not
+        # go through an identity pass: one lookup call per image that has a table
+        for image, lut in zip(stack, luts):
+            if lut is not None:
+                cv2.LUT(image, lut.reshape(1, 256, -1), dst=image)
+        return stack
+    if len(distinct) == 1:
+        # Common case, every camera has the same settings: a single LUT over the whole stack
+        flat = stack.reshape(stack.shape[0] * stack.shape[1], -1)
+        cv2.LUT(flat, next(iter(distinct.values())), dst=flat)
+        return stack
+
+    # Per-camera tables concatenated, each image indexes its own 256 entry slice in one pass
+    table = np.concatenate(luts)
+    offsets = (np.arange(len(luts), dtype=np.uint16) * 256).reshape((-1,) + (1,) * (stack.ndim - 1))
+    np.take(table, stack + offsets, out=stack)
+    return stack
+
+
+def _process_group(widgets, frames, rotation, to_rgb):
+    # np.stack copies into one contiguous block, the camera frames themselves are never modified
+    stack = np.stack(frames)
+
+    channels = stack.shape[3] if stack.ndim == 4 else 1
+    apply_luts(stack, [widget.adjustment_lut(channels) for widget in widgets])
+
+    # Grayscale stacks (count, h, w) have no saturation and need no RGB conversion
+    color = stack.ndim == 4
+    saturated = [i for i, widget in enumerate(widgets) if widget.saturation != 0]
+    if saturated and color:
+        count, h, w, ch = stack.shape
+        subset = stack if len(saturated) == count else stack[saturated]
+        # One color conversion for all the images, stacked vertically
+        hsv = cv2.cvtColor(subset.reshape(len(saturated) * h, w, ch), cv2.COLOR_BGR2HSV)
+        hsv = hsv.reshape(len(saturated), h, w, ch)
+        s = np.ascontiguousarray(hsv[..., 1])
+        apply_luts(s, [saturation_lut(widgets[i].saturation) for i in saturated])
+        hsv[..., 1] = s
+        bgr = cv2.cvtColor(hsv.reshape(len(saturated) * h, w, ch), cv2.COLOR_HSV2BGR)
+        stack[saturated] = bgr.reshape(len(saturated), h, w, ch)
+
+    k = ROTATION_STEPS.get(rotation, 0)
+    if k:
+        stack = np.ascontiguousarray(np.rot90(stack, k, axes=(1, 2)))
+
+    if to_rgb and color:
+        count, h, w, ch = stack.shape
+        flat = stack.reshape(count * h, w, ch)
+        cv2.cvtColor(flat, cv2.COLOR_BGR2RGB, dst=flat)
+    # Slices along the first axis are contiguous views, no copy when splitting
+    return list(stack)
+
+
+def process_frames(widgets, frames, to_rgb=False):
+    """
+    Applies the adjustments and rotation of each widget to its (ROI cropped) frame in batches
+
+    Frames sharing size and rotation are stacked and processed together, so the per-call
+    overhead is paid once per group rather than once per camera.
+
+    Args:
+        widgets (list): CamFeedWidget of each frame
+        frames (list): BGR or grayscale frames, already cropped to the widget ROI
+        to_rgb (bool): Also convert the BGR results to RGB for display (grayscale ones are left as is)
+
+    Returns:
+        list: Processed frames in the order of the input (views into the batch buffers)
+    """
+    results = [None] * len(frames)
+    groups = {}
+    for i, (widget, frame) in enumerate(zip(widgets, frames)):
+        if frame.ndim != 2 and (frame.ndim != 3 or frame.shape[2] != 3):
+            # Neither BGR nor grayscale, processed on its own
+            processed = widget.apply_saturation(widget.apply_brightness_contrast(widget.apply_rotation(frame)))
+            results[i] = cv2.cvtColor(processed, cv2.COLOR_BGR2RGB) if to_rgb and processed.ndim == 3 else processed
+            continue
+        groups.setdefault((frame.shape, widget.rotation_angle), []).append(i)
+
+    for (shape, rotation), indices in groups.items():
+        processed = _process_group([widgets[i] for i in indices], [frames[i] for i in indices], rotation, to_rgb)
+        for i, frame in zip(indices, processed):
+            results[i] = frame
+    return results
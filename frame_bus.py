@@ -0,0 +1,300 @@
+import json
+import re
+import struct
+import threading
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from utils import print_debug, print_error, print_info
+
+DEFAULT_BUS_NAME = "manycamflux"
+BUS_MAGIC = b"MCFB"
+BUS_VERSION = 1
+
+# Segment header: magic, version, state, slot count, slot size, latest sequence
+SEGMENT_HEADER = struct.Struct("<4sHHIQQ")
+STATE_OFFSET = 6
+LATEST_OFFSET = 20
+# Slot header: sequence at write start, sequence at write end, timestamp, height, width,
+# channels, dtype code, camera name
+SLOT_HEADER = struct.Struct("<QQdIIIB64s")
+SLOT_DATA_OFFSET = 128
+
+STATE_LIVE = 1
+# The writer replaced the segment (frame size grew), readers must attach again
+STATE_CLOSED = 2
+
+DTYPES = {0: np.uint8, 1: np.uint16, 2: np.float32}
+DTYPE_CODES = {np.dtype(dtype): code for code, dtype in DTYPES.items()}
+
+INDEX_SIZE = 64 * 1024
+
+DEFAULT_BUS_SLOTS = 3
+
+
+def channel_segment_name(bus_name, key):
+    return f"{bus_name}_{re.sub(r'[^A-Za-z0-9]+', '_', str(key))}"
+
+
+def _open_untracked(**kwargs):
+    """
+    Opens a segment outside of the resource tracker: the writer unlinks its segments itself
+    (and replaces those left by a crash), readers must never unlink them
+    """
+    try:
+        return shared_memory.SharedMemory(track=False, **kwargs)
+    except TypeError:
+        # Python < 3.13 always tracks segments
+        segment = shared_memory.SharedMemory(**kwargs)
+        try:
+            from multiprocessing import resource_tracker
+            resource_tracker.unregister(segment._name, "shared_memory")
+        except Exception:
+            pass
+        return segment
+
+
+def _unlink(name):
+    """Removes a segment by name, SharedMemory.unlink() would unregister it from the tracker again"""
+    try:
+        import _posixshmem
+    except ImportError:
+        # Windows segments disappear with their last handle
+        return
+    _posixshmem.shm_unlink("/" + name)
+
+
+def _attach(name):
+    return _open_untracked(name=name)
+
+
+def _create(name, size):
+    try:
+        return _open_untracked(name=name, create=True, size=size)
+    except FileExistsError:
+        # Left over by a crashed run, removed by name without attaching to it
+        _unlink(name)
+        print_debug(f"Removed stale frame bus segment {name}")
+        return _open_untracked(name=name, create=True, size=size)
+
+
+class _ChannelWriter:
+    """Ring buffer of the latest frames of one camera in a shared-memory segment"""
+    def __init__(self, segment_name, slots, slot_size, seq=0):
+        self.segment_name = segment_name
+        self.slots = slots
+        self.slot_size = slot_size
+        self.segment = _create(segment_name, SEGMENT_HEADER.size + slots * (SLOT_DATA_OFFSET + slot_size))
+        # Continues the sequence of a replaced segment, so readers waiting for new frames see them
+        self.seq = seq
+        SEGMENT_HEADER.pack_into(self.segment.buf, 0, BUS_MAGIC, BUS_VERSION, STATE_LIVE, slots, slot_size, 0)
+
+    def slot_offset(self, slot):
+        return SEGMENT_HEADER.size + slot * (SLOT_DATA_OFFSET + self.slot_size)
+
+    def write(self, name, frame, timestamp):
+        self.seq += 1
+        offset = self.slot_offset(self.seq % self.slots)
+        height, width = frame.shape[:2]
+        channels = frame.shape[2] if frame.ndim == 3 else 1
+        encoded_name = name.encode()[:64]
+        buf = self.segment.buf
+
+        # Seqlock: a reader seeing different start and end sequences knows the slot is being written
+        SLOT_HEADER.pack_into(buf, offset, self.seq, 0, timestamp, height, width, channels,
+                              DTYPE_CODES[frame.dtype], encoded_name)
+        data = np.ndarray(frame.shape, dtype=frame.dtype, buffer=buf, offset=offset + SLOT_DATA_OFFSET)
+        data[...] = frame
+        struct.pack_into("<Q", buf, offset + 8, self.seq)
+        # Published last, readers always find a complete slot
+        struct.pack_into("<Q", buf, LATEST_OFFSET, self.seq)
+
+    def close(self, unlink=True):
+        try:
+            struct.pack_into("<H", self.segment.buf, STATE_OFFSET, STATE_CLOSED)
+            self.segment.close()
+            if unlink:
+                _unlink(self.segment_name)
+        except Exception as e:
+            print_error(f"Failed to close frame bus segment {self.segment_name}: {str(e)}")
+
+
+class FrameBus:
+    """
+    Publishes the latest processed frame of each camera (and the composite) to shared memory,
+    for local processes reading them with FrameBusReader
+    """
+    def __init__(self, bus_name=DEFAULT_BUS_NAME, slots=DEFAULT_BUS_SLOTS):
+        self.bus_name = bus_name
+        self.slots = slots
+        self.lock = threading.Lock()
+        self.channels = {}
+        self.names = {}
+        # Channel list for readers, JSON in a small segment of its own
+        self.index = _create(f"{bus_name}_index", INDEX_SIZE)
+        self._write_index()
+        print_info(f"Frame bus '{bus_name}' started")
+
+    def publish(self, key, name, frame, timestamp=None):
+        """Copies a frame into the channel of a camera, creating or growing the channel as needed"""
+        if frame.dtype not in DTYPE_CODES:
+            return
+        key = str(key)
+        if timestamp is None:
+            timestamp = time.time()
+        with self.lock:
+            channel = self.channels.get(key)
+            if channel is None or frame.nbytes > channel.slot_size or channel.slots != self.slots:
+                seq = 0
+                if channel is not None:
+                    seq = channel.seq
+                    channel.close()
+                channel = _ChannelWriter(channel_segment_name(self.bus_name, key), self.slots, frame.nbytes, seq)
+                self.channels[key] = channel
+                self.names[key] = name
+                self._write_index()
+                print_debug(f"Frame bus channel {channel.segment_name}: {frame.shape}")
+            elif self.names.get(key) != name:
+                self.names[key] = name
+                self._write_index()
+            channel.write(name, frame, timestamp)
+
+    def set_slots(self, slots):
+        """Resizes the ring of every channel, applied as each channel publishes its next frame"""
+        if slots != self.slots:
+            print_debug(f"Frame bus '{self.bus_name}' rings resized to {slots} slot(s)")
+            self.slots = slots
+
+    def memory_usage(self):
+        with self.lock:
+            return sum(channel.segment.size for channel in self.channels.values()) + INDEX_SIZE
+
+    def remove_channel(self, key):
+        with self.lock:
+            channel = self.channels.pop(str(key), None)
+            self.names.pop(str(key), None)
+            if channel is not None:
+                channel.close()
+                self._write_index()
+
+    def _write_index(self):
+        index = {
+            key: {"name": self.names.get(key, key), "segment": channel.segment_name}
+            for key, channel in self.channels.items()
+        }
+        data = json.dumps(index).encode()[:INDEX_SIZE - 4]
+        buf = self.index.buf
+        buf[4:4 + len(data)] = data
+        struct.pack_into("<I", buf, 0, len(data))
+
+    def close(self):
+        with self.lock:
+            for channel in self.channels.values():
+                channel.close()
+            self.channels.clear()
+            self.names.clear()
+            self.index.close()
+            _unlink(f"{self.bus_name}_index")
+        print_info(f"Frame bus '{self.bus_name}' stopped")
+
+
+class FrameBusReader:
+    """
+    Reads the frames published by a running ManyCamFlux
+
+    Example:
+        reader = FrameBusReader()
+        for key, info in reader.channels().items():
+            frame = reader.read(key)
+            if frame is not None:
+                print(info["name"], frame.seq, frame.image.shape)
+    """
+    def __init__(self, bus_name=DEFAULT_BUS_NAME):
+        self.bus_name = bus_name
+        self.segments = {}
+        self.last_seq = {}
+
+    def channels(self):
+        """Returns {key: {"name", "segment"}} of the published cameras"""
+        index = _attach(f"{self.bus_name}_index")
+        try:
+            length = struct.unpack_from("<I", index.buf, 0)[0]
+            return json.loads(bytes(index.buf[4:4 + length]).decode()) if length else {}
+        finally:
+            index.close()
+
+    def _segment(self, key):
+        segment = self.segments.get(key)
+        if segment is not None:
+            state = struct.unpack_from("<H", segment.buf, STATE_OFFSET)[0]
+            if state == STATE_LIVE:
+                return segment
+            self.segments.pop(key)
+            try:
+                segment.close()
+            except BufferError:
+                # Views still held by the caller keep the old mapping alive
+                pass
+        segment = _attach(channel_segment_name(self.bus_name, key))
+        magic, version, _, _, _, _ = SEGMENT_HEADER.unpack_from(segment.buf, 0)
+        if magic != BUS_MAGIC or version != BUS_VERSION:
+            segment.close()
+            raise ValueError(f"Not a ManyCamFlux frame bus segment: {key}")
+        self.segments[key] = segment
+        return segment
+
+    def read(self, key, copy=False, only_new=False):
+        """
+        Returns the latest frame of a channel as a BusFrame, or None if there is none (yet).
+
+        Without copy, the image is a view into shared memory: it stays valid until the writer
+        has published as many newer frames as there are slots (check with BusFrame.is_valid).
+        """
+        segment = self._segment(str(key))
+        buf = segment.buf
+        _, _, _, slots, slot_size, latest = SEGMENT_HEADER.unpack_from(buf, 0)
+        if latest == 0 or (only_new and latest == self.last_seq.get(key)):
+            return None
+        offset = SEGMENT_HEADER.size + (latest % slots) * (SLOT_DATA_OFFSET + slot_size)
+        seq_start, seq_end, timestamp, height, width, channels, dtype_code, name = SLOT_HEADER.unpack_from(buf, offset)
+        if seq_start != latest or seq_end != latest:
+            # Overwritten while reading the header, the writer lapped the ring
+            return None
+        shape = (height, width, channels) if channels > 1 else (height, width)
+        image = np.ndarray(shape, dtype=DTYPES[dtype_code], buffer=buf, offset=offset + SLOT_DATA_OFFSET)
+        frame = BusFrame(self, str(key), offset, latest, timestamp, name.rstrip(b"\0").decode(errors="replace"),
+                         image.copy() if copy else image)
+        if copy and not frame.is_valid():
+            return None
+        self.last_seq[key] = latest
+        return frame
+
+    def close(self):
+        for segment in self.segments.values():
+            try:
+                segment.close()
+            except BufferError:
+                # Views still held by the caller keep the mapping alive
+                pass
+        self.segments.clear()
+
+
+class BusFrame:
+    """Frame read from the bus, image is a shared-memory view unless read with copy=True"""
+    def __init__(self, reader, key, offset, seq, timestamp, name, image):
+        self.reader = reader
+        self.key = key
+        self.offset = offset
+        self.seq = seq
+        self.timestamp = timestamp
+        self.name = name
+        self.image = image
+
+    def is_valid(self):
+        """False once the writer started reusing the slot of this frame"""
+        segment = self.reader.segments.get(self.key)
+        if segment is None:
+            return False
+        return struct.unpack_from("<Q", segment.buf, self.offset)[0] == self.seq
@@ -0,0 +1,116 @@
+import threading
+
+from utils import print_debug, print_info, print_warning
+
+# 0 MB means no ceiling, usage is still tracked
+DEFAULT_MEMORY_SETTINGS = {
+    "limit_mb": 0,
+}
+
+# Degradation steps, taken in this order (one per check) while usage stays above the ceiling
+LEVEL_NORMAL = 0
+LEVEL_DROP_PREVIEWS = 1
+LEVEL_SHRINK_BUFFERS = 2
+LEVEL_THROTTLE_CAPTURE = 3
+LEVEL_NAMES = ["normal", "drop previews", "shrink buffers", "throttle capture"]
+
+# Steps are undone one at a time once usage is back under this share of the ceiling
+RECOVER_RATIO = 0.8
+
+MB = 1024 * 1024
+
+
+def array_bytes(*arrays):
+    """Bytes held by the given arrays, None entries ignored"""
+    return sum(array.nbytes for array in arrays if array is not None)
+
+
+class MemoryAccountant:
+    """
+    Keeps account of the memory held by the frame buffers of every component and enforces
+    the RAM ceiling of the memory settings by degrading in a fixed order.
+
+    Components register a function returning the bytes they hold, and optionally a function
+    called with the new level whenever it changes.
+    """
+    def __init__(self, settings):
+        self.settings = settings
+        self.lock = threading.Lock()
+        self.components = {}
+        self.level = LEVEL_NORMAL
+        self.last_usage = {}
+        self.peak = 0
+        # Captures skipped by the capture throttle
+        self.skipped_captures = 0
+
+    def register(self, name, usage, degrade=None):
+        with self.lock:
+            self.components[name] = (usage, degrade)
+        if degrade is not None and self.level != LEVEL_NORMAL:
+            degrade(self.level)
+
+    def unregister(self, name):
+        with self.lock:
+            self.components.pop(name, None)
+
+    def limit(self):
+        return int(self.settings["limit_mb"] * MB)
+
+    def usage(self):
+        """Returns the bytes held by each component"""
+        with self.lock:
+            components = list(self.components.items())
+        usage = {}
+        for name, (usage_function, _) in components:
+            try:
+                usage[name] = usage_function()
+            except Exception as e:
+                print_debug(f"Memory usage of {name} unavailable: {str(e)}")
+                usage[name] = 0
+        return usage
+
+    def check(self):
+        """Measures the usage and moves one degradation step up or down. Returns the level."""
+        usage = self.usage()
+        total = sum(usage.values())
+        self.last_usage = usage
+        self.peak = max(self.peak, total)
+
+        limit = self.limit()
+        level = self.level
+        if limit and total > limit:
+            level = min(level + 1, LEVEL_THROTTLE_CAPTURE)
+        elif level != LEVEL_NORMAL and (not limit or total < limit * RECOVER_RATIO):
+            level -= 1
+        if level != self.level:
+            self.set_level(level, total)
+        return self.level
+
+    def set_level(self, level, total=None):
+        if total is None:
+            total = sum(self.usage().values())
+        if level > self.level:
+            print_warning(f"Memory use {total / MB:.0f} MB over the {self.settings['limit_mb']} MB budget, "
+                          f"degrading: {LEVEL_NAMES[level]}")
+        else:
+            print_info(f"Memory use {total / MB:.0f} MB, back to: {LEVEL_NAMES[level]}")
+        self.level = level
+        with self.lock:
+            degrades = [degrade for _, degrade in self.components.values() if degrade is not None]
+        for degrade in degrades:
+            degrade(level)
+
+    def throttling(self):
+        return self.level >= LEVEL_THROTTLE_CAPTURE
+
+    def report(self):
+        """Usage per component, largest first"""
+        usage = self.last_usage or self.usage()
+        total = sum(usage.values())
+        limit = f"{self.settings['limit_mb']} MB" if self.settings["limit_mb"] else "no limit"
+        lines = [f"{total / MB:.1f} MB ({limit}, peak {self.peak / MB:.1f} MB), {LEVEL_NAMES[self.level]}"]
+        for name, used in sorted(usage.items(), key=lambda item: -item[1]):
+            lines.append(f"{name}: {used / MB:.1f} MB")
+        if self.skipped_captures:
+            lines.append(f"{self.skipped_captures} capture(s) skipped by the throttle")
+        return "\n".join(lines)
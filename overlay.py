@@ -0,0 +1,134 @@
+import time
+from functools import lru_cache
+
+import cv2
+import numpy as np
+
+# "bar" positions add a black band to the image, "inside" ones darken the image under the text
+OVERLAY_POSITIONS = ["Bottom bar", "Top bar", "Bottom inside", "Top inside"]
+
+DEFAULT_OVERLAY_SETTINGS = {
+    "position": "Bottom bar",
+    "timestamp": False,
+    "timestamp_format": "%Y-%m-%d %H:%M:%S",
+}
+
+LABEL_HEIGHT = 30
+LABEL_MARGIN = 10
+FONT = cv2.FONT_HERSHEY_SIMPLEX
+FONT_SCALE = 0.7
+FONT_THICKNESS = 2
+# Baseline of the text in the label band
+BASELINE = LABEL_HEIGHT - 10
+# Room for strokes drawn left of the glyph origin
+GLYPH_PAD = 4
+
+
+@lru_cache(maxsize=256)
+def label_bitmap(text):
+    """White-on-black mask of a label, rendered once per text (camera names do not change often)"""
+    width = cv2.getTextSize(text, FONT, FONT_SCALE, FONT_THICKNESS)[0][0]
+    mask = np.zeros((LABEL_HEIGHT, width + GLYPH_PAD * 2), dtype=np.uint8)
+    cv2.putText(mask, text, (GLYPH_PAD, BASELINE), FONT, FONT_SCALE, 255, FONT_THICKNESS)
+    return mask
+
+
+class GlyphAtlas:
+    """
+    Pre-rendered glyphs of the overlay font, for text that changes on every image (timestamps).
+    Strings are assembled from the cached glyphs, with the same result as cv2.putText.
+    """
+    def __init__(self):
+        self.glyphs = {}
+
+    def glyph(self, char):
+        cached = self.glyphs.get(char)
+        if cached is None:
+            width = cv2.getTextSize(char, FONT, FONT_SCALE, FONT_THICKNESS)[0][0]
+            # Hershey glyphs have a fixed advance, measured on a pair of them
+            advance = cv2.getTextSize(char * 2, FONT, FONT_SCALE, FONT_THICKNESS)[0][0] - width
+            mask = np.zeros((LABEL_HEIGHT, width + GLYPH_PAD * 2), dtype=np.uint8)
+            cv2.putText(mask, char, (GLYPH_PAD, BASELINE), FONT, FONT_SCALE, 255, FONT_THICKNESS)
+            cached = (mask, advance)
+            self.glyphs[char] = cached
+        return cached
+
+    def render(self, text):
+        glyphs = [self.glyph(char) for char in text]
+        width = sum(advance for _, advance in glyphs)
+        mask = np.zeros((LABEL_HEIGHT, width + max((m.shape[1] for m, _ in glyphs), default=0)), dtype=np.uint8)
+        x = 0
+        for glyph_mask, advance in glyphs:
+            region = mask[:, x:x + glyph_mask.shape[1]]
+            np.maximum(region, glyph_mask, out=region)
+            x += advance
+        return mask
+
+
+_atlas = GlyphAtlas()
+
+
+def overlay_enabled(show_name, settings):
+    return show_name or settings["timestamp"]
+
+
+def reserved_height(show_name, settings):
+    """Rows to reserve under or above the image for the label band"""
+    if overlay_enabled(show_name, settings) and settings["position"].endswith("bar"):
+        return LABEL_HEIGHT
+    return 0
+
+
+def content_offset(show_name, settings):
+    """Row of the image below a top band"""
+    return reserved_height(show_name, settings) if settings["position"].startswith("Top") else 0
+
+
+def format_timestamp(settings, when=None):
+    return time.strftime(settings["timestamp_format"], time.localtime(when))
+
+
+def _blit(band, mask, x):
+    """Writes a white mask into a band (grayscale or BGR), clipped to its width"""
+    width = min(mask.shape[1], band.shape[1] - x)
+    if width <= 0:
+        return
+    region = band[:, x:x + width]
+    mask = mask[:, :width] if band.ndim == 2 else mask[:, :width, None]
+    np.maximum(region, mask, out=region)
+
+
+def draw_overlay(image, x, y, width, height, name, settings, timestamp=None):
+    """
+    Draws the label of the image occupying image[y:y+height, x:x+width], reserved band included,
+    in place: the name on the left and the timestamp on the right
+    """
+    if settings["position"].startswith("Top"):
+        band = image[y:y + LABEL_HEIGHT, x:x + width]
+    else:
+        band = image[y + height - LABEL_HEIGHT:y + height, x:x + width]
+    if settings["position"].endswith("bar"):
+        band[:] = 0
+    else:
+        # Semi-transparent background, as on the live tiles
+        band[:] = band // 4
+    if name:
+        _blit(band, label_bitmap(name), LABEL_MARGIN - GLYPH_PAD)
+    if timestamp:
+        mask = _atlas.render(timestamp)
+        text_width = mask.shape[1] - GLYPH_PAD * 2
+        _blit(band, mask, max(0, width - LABEL_MARGIN - text_width - GLYPH_PAD))
+
+
+def label_image(frame, name, settings, timestamp=None):
+    """Returns the frame with its label, the output being allocated once at its final size"""
+    reserved = reserved_height(bool(name), settings)
+    h, w = frame.shape[:2]
+    if reserved:
+        labelled = np.empty((h + reserved, w) + frame.shape[2:], dtype=np.uint8)
+        top = content_offset(bool(name), settings)
+        labelled[top:top + h] = frame
+    else:
+        labelled = frame.copy()
+    draw_overlay(labelled, 0, 0, w, h + reserved, name, settings, timestamp)
+    return labelled
@@ -0,0 +1,157 @@
+import os
+import sys
+import json
+import time
+import threading
+from datetime import datetime
+
+from utils import print_error, print_info, print_success
+
+# Pipeline stage currently running on each thread, keyed by thread id
+_stages = {}
+
+
+class stage:
+    """
+    Marks the pipeline stage run by the current thread, reported with the profiler samples.
+    Used as a context manager, it costs the same whether a profile is running or not: one
+    small object and a few dict operations on the thread's entry.
+    """
+    __slots__ = ("name", "previous")
+
+    def __init__(self, name):
+        self.name = name
+        self.previous = None
+
+    def __enter__(self):
+        ident = threading.get_ident()
+        self.previous = _stages.get(ident)
+        _stages[ident] = self.name
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        ident = threading.get_ident()
+        if self.previous is None:
+            _stages.pop(ident, None)
+        else:
+            _stages[ident] = self.previous
+
+
+class SamplingProfiler:
+    """
+    Samples the stacks of all threads at a fixed interval for a given duration and writes
+    them as collapsed stacks (flamegraph.pl, speedscope) and as a speedscope JSON file
+    """
+    def __init__(self, output_folder, duration=10.0, interval=0.005, max_depth=64):
+        self.output_folder = output_folder
+        self.duration = duration
+        self.interval = interval
+        self.max_depth = max_depth
+
+        # (thread name, stage, frames from root to leaf) -> sample count
+        self.samples = {}
+        self.sample_count = 0
+        self.elapsed = None
+        self.running = False
+        self.thread = None
+        self.output_paths = []
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self._run, name="SamplingProfiler", daemon=True)
+        self.thread.start()
+        print_info(f"Profiling all threads for {self.duration:.0f}s")
+
+    def stop(self):
+        """Ends the profile early, the results are still written"""
+        self.running = False
+
+    def is_running(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def _run(self):
+        own_ident = threading.get_ident()
+        started = time.perf_counter()
+        end = started + self.duration
+        try:
+            while self.running and time.perf_counter() < end:
+                self._sample(own_ident)
+                time.sleep(self.interval)
+            self.elapsed = time.perf_counter() - started
+            self.output_paths = self.write()
+        except Exception as e:
+            print_error(f"Profiler failed: {str(e)}")
+        self.running = False
+
+    def _sample(self, own_ident):
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == own_ident:
+                continue
+            stack = []
+            while frame is not None and len(stack) < self.max_depth:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            stack.reverse()
+            key = (names.get(ident, str(ident)), _stages.get(ident), tuple(stack))
+            self.samples[key] = self.samples.get(key, 0) + 1
+        self.sample_count += 1
+
+    def write(self):
+        """Writes the .folded and .speedscope.json files. Returns their paths."""
+        if not os.path.exists(self.output_folder):
+            os.makedirs(self.output_folder)
+        base = os.path.join(self.output_folder, f"profile_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+
+        folded_path = base + ".folded"
+        with open(folded_path, 'w') as folded_file:
+            for (thread_name, stage_name, stack), count in sorted(self.samples.items(), key=lambda item: -item[1]):
+                # The stage is shown as a frame under the thread, so flame graphs group by stage
+                root = [thread_name] + ([f"[{stage_name}]"] if stage_name else [])
+                line = ";".join(part.replace(";", ":") for part in root + list(stack))
+                folded_file.write(f"{line} {count}\n")
+
+        speedscope_path = base + ".speedscope.json"
+        with open(speedscope_path, 'w') as speedscope_file:
+            json.dump(self.to_speedscope(), speedscope_file)
+
+        print_success(f"Profile of {self.sample_count} sample(s) written to {folded_path} and {speedscope_path}")
+        return [folded_path, speedscope_path]
+
+    def to_speedscope(self):
+        frames = []
+        frame_indices = {}
+
+        def frame_index(name):
+            if name not in frame_indices:
+                frame_indices[name] = len(frames)
+                frames.append({"name": name})
+            return frame_indices[name]
+
+        # Average time between two samples, sampling itself takes time on top of the interval
+        elapsed = self.elapsed or self.duration
+        period = elapsed / self.sample_count if self.sample_count else self.interval
+
+        # One sampled profile per thread
+        profiles = {}
+        for (thread_name, stage_name, stack), count in self.samples.items():
+            profile = profiles.setdefault(thread_name, {
+                "type": "sampled",
+                "name": thread_name,
+                "unit": "seconds",
+                "startValue": 0,
+                "endValue": elapsed,
+                "samples": [],
+                "weights": [],
+            })
+            root = [f"[{stage_name}]"] if stage_name else []
+            profile["samples"].append([frame_index(name) for name in root + list(stack)])
+            profile["weights"].append(count * period)
+
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": "ManyCamFlux profile",
+            "exporter": "ManyCamFlux",
+            "shared": {"frames": frames},
+            "profiles": sorted(profiles.values(), key=lambda profile: profile["name"]),
+        }
@@ -0,0 +1,361 @@
+import hmac
+import json
+import queue
+import socket
+import struct
+import threading
+import time
+
+import cv2
+import numpy as np
+
+from utils import print_debug, print_error, print_info, print_success, print_warning
+from camera_source import STATE_OK, STATE_DEGRADED, open_available_cameras
+from profiler import stage
+from memory_budget import array_bytes
+from auto_normalize import AutoNormalizer
+
+# Every message: magic, type, payload length
+MAGIC = b"MCF1"
+MESSAGE_HEADER = struct.Struct("!4sBI")
+# Frame payload prefix: camera id, sequence, capture timestamp (node clock), width, height
+FRAME_HEADER = struct.Struct("!HIdHH")
+
+MSG_HELLO = 1
+MSG_FRAME = 2
+
+MAX_PAYLOAD = 64 * 1024 * 1024
+# Cameras accepted from one node, a larger hello is refused
+MAX_NODE_CAMERAS = 64
+
+
+def send_message(sock, message_type, payload):
+    sock.sendall(MESSAGE_HEADER.pack(MAGIC, message_type, len(payload)) + payload)
+
+
+def _recv_exact(sock, size):
+    buffer = bytearray(size)
+    view = memoryview(buffer)
+    received = 0
+    while received < size:
+        count = sock.recv_into(view[received:], size - received)
+        if count == 0:
+            raise ConnectionError("Connection closed")
+        received += count
+    return buffer
+
+
+def recv_message(sock):
+    """Returns (message type, payload) of the next message"""
+    magic, message_type, length = MESSAGE_HEADER.unpack(_recv_exact(sock, MESSAGE_HEADER.size))
+    if magic != MAGIC or length > MAX_PAYLOAD:
+        raise ConnectionError("Invalid message header")
+    return message_type, _recv_exact(sock, length)
+
+
+class CaptureNode:
+    """Headless node: captures the local cameras and pushes JPEG frames to a viewer"""
+    def __init__(self, host, port, name=None, resolution=None, quality=80, max_fps=15, token=None):
+        self.host = host
+        self.port = port
+        self.name = name or socket.gethostname()
+        self.resolution = resolution
+        self.quality = quality
+        self.max_fps = max_fps
+        self.token = token
+        self.sources = []
+        self.running = False
+
+    def run(self):
+        """Captures and sends until interrupted, reconnecting to the viewer when the link drops"""
+        self.sources = open_available_cameras()
+        if not self.sources:
+            print_error("No cameras detected, node has nothing to send")
+            return
+        for source in self.sources:
+            if self.resolution is not None:
+                source.set(cv2.CAP_PROP_FRAME_WIDTH, self.resolution[0])
+                source.set(cv2.CAP_PROP_FRAME_HEIGHT, self.resolution[1])
+            source.start()
+        print_success(f"Node '{self.name}' capturing {len(self.sources)} camera(s)")
+
+        self.running = True
+        delay = 1.0
+        try:
+            while self.running:
+                try:
+                    with socket.create_connection((self.host, self.port), timeout=5) as sock:
+                        sock.settimeout(None)
+                        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                        print_info(f"Node '{self.name}' connected to {self.host}:{self.port}")
+                        delay = 1.0
+                        self._send_loop(sock)
+                except OSError as e:
+                    print_warning(f"Link to viewer lost ({str(e)}), retrying in {delay:.0f}s")
+                    time.sleep(delay)
+                    delay = min(delay * 2, 30.0)
+        finally:
+            for source in self.sources:
+                source.release()
+
+    def stop(self):
+        self.running = False
+
+    def _send_loop(self, sock):
+        hello = {
+            "node": self.name,
+            "cameras": [
+                {
+                    "id": source.index,
+                    "width": int(source.get(cv2.CAP_PROP_FRAME_WIDTH)),
+                    "height": int(source.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+                }
+                for source in self.sources
+            ],
+        }
+        if self.token:
+            hello["token"] = self.token
+        send_message(sock, MSG_HELLO, json.dumps(hello).encode())
+
+        period = 1.0 / self.max_fps
+        sent_seq = {source.index: 0 for source in self.sources}
+        while self.running:
+            started = time.monotonic()
+            for source in self.sources:
+                seq, frame = source.latest()
+                # Only the newest frame is sent, a slow link drops frames instead of queueing
+                if frame is None or seq == sent_seq[source.index]:
+                    continue
+                sent_seq[source.index] = seq
+                with stage("node encode"):
+                    ok, jpeg = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, self.quality])
+                if not ok:
+                    continue
+                # Wall-clock time at which the frame was read from the camera
+                capture_time = time.time() - (time.monotonic() - source.frame_time)
+                header = FRAME_HEADER.pack(source.index, seq & 0xFFFFFFFF, capture_time,
+                                           frame.shape[1], frame.shape[0])
+                send_message(sock, MSG_FRAME, header + jpeg.tobytes())
+            time.sleep(max(0.0, period - (time.monotonic() - started)))
+
+
+class RemoteSource:
+    """Camera of a remote node, with the same API as CameraSource"""
+    def __init__(self, node, camera_id, width, height):
+        self.node = node
+        self.camera_id = camera_id
+        self.index = f"{node}:{camera_id}"
+        self.width = width
+        self.height = height
+
+        self.lock = threading.Lock()
+        self.frame = None
+        self.seq = 0
+        self.state = STATE_DEGRADED
+        self.link = None
+        self.grayscale = False
+        self.normalizer = None
+
+    def read(self):
+        with self.lock:
+            return self.frame is not None, self.frame
+
+    def latest(self):
+        with self.lock:
+            return self.seq, self.frame
+
+    def get(self, prop):
+        if prop == cv2.CAP_PROP_FRAME_WIDTH:
+            return float(self.width)
+        if prop == cv2.CAP_PROP_FRAME_HEIGHT:
+            return float(self.height)
+        return 0.0
+
+    def set(self, prop, value):
+        # The resolution is chosen on the node
+        return False
+
+    def isOpened(self):
+        return True
+
+    def release(self):
+        pass
+
+    def start(self):
+        pass
+
+    def set_grayscale(self, enabled):
+        # Frames are decoded single-channel by the link from then on
+        self.grayscale = enabled
+
+    def set_auto_normalize(self, enabled):
+        if not enabled:
+            self.normalizer = None
+        elif self.normalizer is None:
+            self.normalizer = AutoNormalizer()
+
+    def push_frame(self, frame):
+        # Called on the link thread, which also takes the auto-normalization measurements
+        normalizer = self.normalizer
+        if normalizer is not None:
+            normalizer.observe(frame)
+        with self.lock:
+            self.frame = frame
+            self.seq += 1
+
+    def memory_usage(self):
+        with self.lock:
+            return array_bytes(self.frame)
+
+    def health_report(self):
+        report = {
+            "state": self.state,
+            "faults": {},
+            "recoveries": 0,
+            "last_recovery_time": None,
+            "average_recovery_time": None,
+            "frames": self.seq,
+        }
+        if self.link is not None:
+            report.update(self.link.stats())
+        return report
+
+
+class RemoteLink:
+    """Statistics of one node connection"""
+    def __init__(self, node, address, sock):
+        self.node = node
+        self.address = address
+        self.socket = sock
+        self.connected_at = time.monotonic()
+        self.bytes_received = 0
+        self.frames_received = 0
+        self.bandwidth = 0.0
+        self.latency = None
+        self._window_start = time.monotonic()
+        self._window_bytes = 0
+
+    def record(self, size, capture_time):
+        now = time.monotonic()
+        self.bytes_received += size
+        self.frames_received += 1
+        self._window_bytes += size
+        if now - self._window_start >= 1.0:
+            self.bandwidth = self._window_bytes / (now - self._window_start)
+            self._window_start = now
+            self._window_bytes = 0
+        # Node and viewer clocks must be in sync (NTP) for this to be meaningful
+        latency = time.time() - capture_time
+        self.latency = latency if self.latency is None else 0.9 * self.latency + 0.1 * latency
+
+    def stats(self):
+        return {
+            "link": f"{self.node} ({self.address[0]})",
+            "bandwidth_kbps": round(self.bandwidth * 8 / 1000, 1),
+            "latency_ms": round(self.latency * 1000, 1) if self.latency is not None else None,
+            "link_frames": self.frames_received,
+        }
+
+
+class RemoteFeedServer:
+    """
+    Accepts node connections and exposes their cameras as RemoteSource objects.
+
+    Listens on loopback unless another host is given. When a token is set, nodes must send
+    the same token in their hello or are disconnected.
+    """
+    def __init__(self, host="127.0.0.1", port=8765, token=None):
+        self.host = host
+        self.port = port
+        self.token = token
+        self.sources = {}
+        # New sources, picked up by the GUI thread to create tiles
+        self.new_sources = queue.Queue()
+        self.links = []
+        self.running = False
+        self.server_socket = None
+        self.accept_thread = None
+
+    def start(self):
+        self.server_socket = socket.create_server((self.host, self.port))
+        self.port = self.server_socket.getsockname()[1]
+        self.running = True
+        self.accept_thread = threading.Thread(target=self._accept_loop, name="RemoteFeedServer", daemon=True)
+        self.accept_thread.start()
+        print_info(f"Waiting for capture nodes on port {self.port}")
+
+    def stop(self):
+        self.running = False
+        if self.server_socket is not None:
+            self.server_socket.close()
+        for link in list(self.links):
+            try:
+                link.socket.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    def _accept_loop(self):
+        while self.running:
+            try:
+                sock, address = self.server_socket.accept()
+            except OSError:
+                break
+            threading.Thread(target=self._connection_loop, args=(sock, address),
+                             name=f"RemoteLink-{address[0]}", daemon=True).start()
+
+    def _connection_loop(self, sock, address):
+        link = None
+        link_sources = {}
+        try:
+            message_type, payload = recv_message(sock)
+            if message_type != MSG_HELLO:
+                raise ConnectionError("Expected hello message")
+            hello = json.loads(bytes(payload).decode())
+            if self.token and not hmac.compare_digest(str(hello.get("token", "")).encode(), self.token.encode()):
+                raise ConnectionError("Invalid token")
+            if len(hello["cameras"]) > MAX_NODE_CAMERAS:
+                raise ConnectionError(f"Too many cameras ({len(hello['cameras'])}, at most {MAX_NODE_CAMERAS})")
+            link = RemoteLink(hello["node"], address, sock)
+            self.links.append(link)
+            print_success(f"Node '{link.node}' connected from {address[0]} with {len(hello['cameras'])} camera(s)")
+
+            for camera in hello["cameras"]:
+                key = (link.node, camera["id"])
+                source = self.sources.get(key)
+                if source is None:
+                    source = RemoteSource(link.node, camera["id"], camera["width"], camera["height"])
+                    self.sources[key] = source
+                    self.new_sources.put(source)
+                source.link = link
+                source.state = STATE_OK
+                link_sources[camera["id"]] = source
+
+            while self.running:
+                message_type, payload = recv_message(sock)
+                if message_type != MSG_FRAME:
+                    continue
+                camera_id, seq, capture_time, width, height = FRAME_HEADER.unpack_from(payload)
+                source = link_sources.get(camera_id)
+                if source is None:
+                    continue
+                # imdecode releases the GIL, links decode in parallel
+                jpeg = np.frombuffer(payload, dtype=np.uint8, offset=FRAME_HEADER.size)
+                with stage("remote decode"):
+                    frame = cv2.imdecode(jpeg, cv2.IMREAD_GRAYSCALE if source.grayscale else cv2.IMREAD_COLOR)
+                if frame is None:
+                    continue
+                source.push_frame(frame)
+                link.record(len(payload) + MESSAGE_HEADER.size, capture_time)
+        except (OSError, ConnectionError, ValueError, KeyError, TypeError, AttributeError) as e:
+            if self.running:
+                print_warning(f"Node link from {address[0]} closed: {str(e)}")
+        finally:
+            for source in link_sources.values():
+                # Tiles stay in place and show as degraded until the node reconnects, unless
+                # the node already came back on a newer link
+                if source.link is link:
+                    source.state = STATE_DEGRADED
+            if link is not None and link in self.links:
+                self.links.remove(link)
+            sock.close()
+            print_debug(f"Node link from {address[0]} ended")
@@ -0,0 +1,207 @@
+import os
+import re
+import heapq
+import shutil
+import threading
+import time
+
+from utils import print_debug, print_error, print_info, print_warning
+from capture_catalog import CAPTURE_NAME_PATTERN
+
+# 0 disables a limit
+DEFAULT_RETENTION_SETTINGS = {
+    "max_size_gb": 0.0,
+    "max_age_days": 0,
+    "min_free_gb": 1.0,
+}
+
+# Per-camera capture manifests, deleted with the images (scheduled captures add the camera name)
+MANIFEST_NAME_PATTERN = re.compile(r"^[a-z]+_\d{8}_\d{6}(?:_.+)?\.json$")
+
+GB = 1024 ** 3
+
+
+class RetentionManager:
+    """
+    Keeps a capture folder within its size and age quotas, deleting the oldest files first
+
+    The folder is scanned once when the manager starts, after that the index is kept up to
+    date by the exporter (record), so enforcing the quotas never lists the directory again.
+    Deletions run in small batches on a background thread. When the disk free space drops
+    below min_free_gb the manager is paused and capture is skipped until space is back.
+
+    The size quota counts capture images and manifests, hard-linked duplicates once. The
+    thumbnail cache and the catalog database are not counted (thumbnails go with their capture).
+    """
+    def __init__(self, folder, settings=None, on_delete=None, interval=2.0, batch_size=50):
+        self.folder = folder
+        self.settings = settings if settings is not None else dict(DEFAULT_RETENTION_SETTINGS)
+        # Called with the list of deleted paths (catalog cleanup)
+        self.on_delete = on_delete
+        self.interval = interval
+        self.batch_size = batch_size
+
+        self.lock = threading.Lock()
+        # Heap of (time, path, size), the oldest file first
+        self.index = []
+        self.total_bytes = 0
+        self.pending = []
+        self.loaded = False
+
+        self.paused = False
+        self.free_bytes = None
+        self.deleted_files = 0
+        self.deleted_bytes = 0
+
+        self.running = False
+        self.wake_event = threading.Event()
+        self.thread = None
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self._loop, name=f"Retention-{os.path.basename(self.folder)}",
+                                       daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+        self.wake_event.set()
+        if self.thread is not None:
+            self.thread.join(timeout=2)
+
+    def record(self, path, size, timestamp=None):
+        """Adds a newly written file to the index (called from the exporter workers)"""
+        entry = (timestamp if timestamp is not None else time.time(), path, size)
+        with self.lock:
+            if not self.loaded:
+                # Merged with the initial scan once it completes
+                self.pending.append(entry)
+                return
+            # Writers finish out of order, the heap keeps the insert logarithmic either way
+            heapq.heappush(self.index, entry)
+            self.total_bytes += size
+        if self._over_quota():
+            self.wake_event.set()
+
+    def can_capture(self):
+        """False while the disk is too full to write captures"""
+        return not self.paused
+
+    def _loop(self):
+        self._scan()
+        while self.running:
+            try:
+                self.check_free_space()
+                while self.running and self._over_quota():
+                    self._delete_batch()
+                    # Give the disk to the capture writers between two batches
+                    time.sleep(0.05)
+                self.check_free_space()
+            except Exception as e:
+                print_error(f"Retention check failed for {self.folder}: {str(e)}")
+            self.wake_event.wait(self.interval)
+            self.wake_event.clear()
+
+    def _scan(self):
+        started = time.time()
+        entries = []
+        # Hard-linked duplicates share their inode, its size is counted once
+        inodes = set()
+        try:
+            with os.scandir(self.folder) as folder_entries:
+                for entry in folder_entries:
+                    if not (CAPTURE_NAME_PATTERN.match(entry.name) or MANIFEST_NAME_PATTERN.match(entry.name)):
+                        continue
+                    try:
+                        stat = entry.stat()
+                    except OSError:
+                        continue
+                    size = stat.st_size
+                    if stat.st_nlink > 1 and stat.st_ino:
+                        if (stat.st_dev, stat.st_ino) in inodes:
+                            size = 0
+                        inodes.add((stat.st_dev, stat.st_ino))
+                    entries.append((stat.st_mtime, entry.path, size))
+        except OSError as e:
+            print_error(f"Retention scan of {self.folder} failed: {str(e)}")
+
+        with self.lock:
+            known = {path for _, path, _ in entries}
+            entries.extend(entry for entry in self.pending if entry[1] not in known)
+            # A sorted list is a valid heap
+            entries.sort()
+            self.index = entries
+            self.total_bytes = sum(size for _, _, size in entries)
+            self.pending = []
+            self.loaded = True
+        print_debug(f"Retention index of {self.folder}: {len(entries)} file(s), "
+                    f"{self.total_bytes / GB:.2f} GB ({time.time() - started:.2f}s)")
+
+    def _over_quota(self):
+        with self.lock:
+            return self._over_quota_locked(time.time())
+
+    def _over_quota_locked(self, now):
+        if not self.index:
+            return False
+        max_size = self.settings.get("max_size_gb", 0) * GB
+        if max_size > 0 and self.total_bytes > max_size:
+            return True
+        max_age = self.settings.get("max_age_days", 0) * 86400
+        return max_age > 0 and now - self.index[0][0] > max_age
+
+    def _delete_batch(self):
+        now = time.time()
+        batch = []
+        with self.lock:
+            # Only what is needed to get back under the quotas, at most one batch
+            while len(batch) < self.batch_size and self._over_quota_locked(now):
+                entry = heapq.heappop(self.index)
+                self.total_bytes -= entry[2]
+                batch.append(entry)
+
+        deleted = []
+        for _, path, size in batch:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                print_warning(f"Retention could not delete {path}: {str(e)}")
+                continue
+            deleted.append(path)
+            self.deleted_bytes += size
+        self.deleted_files += len(deleted)
+
+        if deleted and self.on_delete is not None:
+            self.on_delete(deleted)
+        print_debug(f"Retention deleted {len(deleted)} file(s) from {self.folder}")
+
+    def check_free_space(self):
+        """Pauses capture below the free space threshold, resumes with some margin above it"""
+        min_free = self.settings.get("min_free_gb", 0) * GB
+        if min_free <= 0:
+            self.paused = False
+            return
+        try:
+            self.free_bytes = shutil.disk_usage(self.folder).free
+        except OSError as e:
+            print_error(f"Cannot read free space of {self.folder}: {str(e)}")
+            return
+        if not self.paused and self.free_bytes < min_free:
+            self.paused = True
+            print_warning(f"Only {self.free_bytes / GB:.2f} GB free in {self.folder}, capture paused")
+        elif self.paused and self.free_bytes > min_free * 1.1:
+            self.paused = False
+            print_info(f"{self.free_bytes / GB:.2f} GB free in {self.folder}, capture resumed")
+
+    def stats(self):
+        with self.lock:
+            return {
+                "files": len(self.index),
+                "bytes": self.total_bytes,
+                "deleted_files": self.deleted_files,
+                "deleted_bytes": self.deleted_bytes,
+                "free_bytes": self.free_bytes,
+                "paused": self.paused,
+            }
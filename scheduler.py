@@ -0,0 +1,151 @@
+import time
+from datetime import datetime
+
+from utils import print_info
+
+# Per-camera schedules replace the single capture of everything at each interval.
+# cameras: camera identity (or name) -> {"interval": seconds, 0 for the capture interval,
+# "window": "HH:MM-HH:MM", empty for the default window}
+DEFAULT_SCHEDULE_SETTINGS = {
+    "enabled": False,
+    "stagger": True,
+    "window": "",
+    "cameras": {},
+}
+
+COMPOSITE_KEY = "composite"
+
+
+def parse_window(text):
+    """'HH:MM-HH:MM' to (start, end) minutes of the day, None for no window. Windows can wrap past midnight."""
+    text = (text or "").strip()
+    if not text:
+        return None
+    try:
+        times = []
+        for part in text.split("-"):
+            hours, minutes = (int(value) for value in part.strip().split(":"))
+            if not (0 <= hours <= 23 and 0 <= minutes <= 59):
+                raise ValueError(part)
+            times.append(hours * 60 + minutes)
+        start, end = times
+        return start, end
+    except ValueError:
+        raise ValueError(f"Invalid time window '{text}', expected HH:MM-HH:MM")
+
+
+def validate_schedule_settings(settings):
+    """Raises ValueError on a malformed time window"""
+    parse_window(settings["window"])
+    for camera_schedule in settings["cameras"].values():
+        parse_window(camera_schedule.get("window"))
+
+
+def in_window(window, when):
+    if window is None:
+        return True
+    minute = when.hour * 60 + when.minute
+    start, end = window
+    if start <= end:
+        return start <= minute < end
+    return minute >= start or minute < end
+
+
+class ScheduleEntry:
+    def __init__(self, key, name, interval, window=None):
+        self.key = key
+        self.name = name
+        self.interval = interval
+        self.window = window
+        self.next_due = 0.0
+        self.captures = 0
+        self.missed = 0
+        self.last_capture = None
+        # Sum and count of the intervals between consecutive captures, gaps out of the window excluded
+        self.interval_total = 0.0
+        self.interval_count = 0
+
+    def achieved_interval(self):
+        return self.interval_total / self.interval_count if self.interval_count else None
+
+
+class CaptureScheduler:
+    """
+    Decides when each camera (and the composite) is due for capture.
+
+    With staggering, the entries are phase-shifted evenly across their interval, so encodes
+    and writes are spread over the period instead of all happening on the same tick.
+    """
+    def __init__(self, stagger=True):
+        self.stagger = stagger
+        self.entries = {}
+
+    def add(self, key, name, interval, window=None):
+        self.entries[key] = ScheduleEntry(key, name, interval, window)
+
+    def start(self, now=None):
+        now = time.monotonic() if now is None else now
+        count = len(self.entries)
+        for i, entry in enumerate(self.entries.values()):
+            phase = entry.interval * i / count if self.stagger else 0.0
+            entry.next_due = now + phase
+
+    def due(self, now=None, wall_time=None):
+        """Returns the keys due for capture and moves their schedule on"""
+        now = time.monotonic() if now is None else now
+        wall_time = datetime.now() if wall_time is None else wall_time
+        due = []
+        for entry in self.entries.values():
+            if now < entry.next_due:
+                continue
+            # Periods that passed without a tick (GUI busy) are counted, not captured in a burst
+            periods = int((now - entry.next_due) // entry.interval)
+            entry.missed += periods
+            entry.next_due += (periods + 1) * entry.interval
+            if in_window(entry.window, wall_time):
+                due.append(entry.key)
+            else:
+                entry.last_capture = None
+        return due
+
+    def record(self, key, now=None):
+        """Called once a due capture was taken"""
+        now = time.monotonic() if now is None else now
+        entry = self.entries[key]
+        if entry.last_capture is not None:
+            entry.interval_total += now - entry.last_capture
+            entry.interval_count += 1
+        entry.last_capture = now
+        entry.captures += 1
+
+    def stats(self):
+        return [
+            {
+                "name": entry.name,
+                "interval": entry.interval,
+                "achieved_interval": entry.achieved_interval(),
+                "captures": entry.captures,
+                "missed": entry.missed,
+            }
+            for entry in self.entries.values()
+        ]
+
+    def summary(self):
+        """Short status: worst cadence error among the entries"""
+        achieved = [(s["achieved_interval"] / s["interval"], s) for s in self.stats() if s["achieved_interval"]]
+        if not achieved:
+            return f"{len(self.entries)} schedule(s), waiting for captures"
+        _, worst = max(achieved, key=lambda item: abs(item[0] - 1))
+        return (f"{len(self.entries)} schedule(s), furthest from target: {worst['name']} every "
+                f"{worst['achieved_interval']:.2f}s (target {worst['interval']:g}s)")
+
+    def report(self):
+        """Achieved vs. target cadence of every entry, also printed to the console"""
+        lines = []
+        for s in self.stats():
+            achieved = f"{s['achieved_interval']:.2f}s" if s["achieved_interval"] else "-"
+            lines.append(f"{s['name']}: target {s['interval']:g}s, achieved {achieved}, "
+                         f"{s['captures']} capture(s), {s['missed']} missed")
+        message = "\n".join(lines)
+        print_info(f"Capture schedule:\n{message}")
+        return message
@@ -0,0 +1,285 @@
+import html
+import threading
+import time
+import json
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import quote, urlparse
+
+import cv2
+import numpy as np
+
+from utils import print_info, print_debug, print_error
+from profiler import stage
+from memory_budget import array_bytes
+
+BOUNDARY = "manycamfluxframe"
+
+
+class StreamChannel:
+    """Latest frame of one stream, JPEG-encoded at most once per new frame"""
+    def __init__(self, name, quality=80):
+        self.name = name
+        self.quality = quality
+        self.condition = threading.Condition()
+        self.encode_lock = threading.Lock()
+        self.frame = None
+        self.seq = 0
+        self.last_publish = 0.0
+        self.jpeg = None
+        self.jpeg_seq = 0
+        self.clients = 0
+        self.encode_count = 0
+
+    def publish(self, frame):
+        # Only keep a reference, encoding is done lazily by the first client that needs it
+        with self.condition:
+            self.frame = frame
+            self.seq += 1
+            self.last_publish = time.monotonic()
+            self.condition.notify_all()
+
+    def latest_frame(self):
+        with self.condition:
+            return self.seq, self.frame
+
+    def memory_usage(self):
+        with self.condition:
+            return array_bytes(self.frame) + len(self.jpeg or b"")
+
+    def wait_jpeg(self, last_seq, timeout=1.0):
+        """
+        Waits for a frame newer than last_seq and returns it encoded
+
+        Returns:
+            tuple: (seq, jpeg bytes) or (last_seq, None) on timeout
+        """
+        with self.condition:
+            if not self.condition.wait_for(lambda: self.seq > last_seq, timeout):
+                return last_seq, None
+            seq, frame = self.seq, self.frame
+
+        # Clients that wake up on the same frame share one encode
+        with self.encode_lock:
+            if self.jpeg_seq < seq:
+                with stage("stream encode"):
+                    ok, buffer = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, self.quality])
+                if not ok:
+                    return seq, None
+                self.jpeg = buffer.tobytes()
+                self.jpeg_seq = seq
+                self.encode_count += 1
+            return self.jpeg_seq, self.jpeg
+
+
+class _StreamRequestHandler(BaseHTTPRequestHandler):
+    server_version = "ManyCamFlux"
+
+    def log_message(self, format, *args):
+        print_debug(f"Stream request from {self.client_address[0]}: {format % args}")
+
+    def do_GET(self):
+        stream_server = self.server.stream_server
+        path = urlparse(self.path).path.rstrip("/")
+
+        if path == "":
+            self.send_index(stream_server)
+        elif path == "/status":
+            self.send_body(json.dumps(stream_server.stats(), indent=4).encode(), "application/json")
+        elif path.startswith("/stream/") and path.endswith(".mjpg"):
+            channel = stream_server.get_channel(path[len("/stream/"):-len(".mjpg")])
+            if channel is None:
+                self.send_error(404, "Unknown stream")
+            else:
+                self.send_mjpeg(stream_server, channel)
+        elif path.startswith("/snapshot/") and path.endswith(".jpg"):
+            channel = stream_server.get_channel(path[len("/snapshot/"):-len(".jpg")])
+            if channel is None:
+                self.send_error(404, "Unknown stream")
+                return
+            _, jpeg = channel.wait_jpeg(0, timeout=2.0)
+            if jpeg is None:
+                self.send_error(503, "No frame available")
+            else:
+                self.send_body(jpeg, "image/jpeg")
+        else:
+            self.send_error(404)
+
+    def send_body(self, body, content_type):
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_index(self, stream_server):
+        links = "".join(
+            f'<li><a href="/stream/{quote(key)}.mjpg">{html.escape(name)}</a></li>'
+            for key, name in stream_server.channel_names()
+        )
+        body = (
+            "<html><head><title>ManyCamFlux</title></head><body>"
+            "<h1>ManyCamFlux streams</h1>"
+            f"<ul>{links}</ul>"
+            '<img src="/stream/grid.mjpg">'
+            "</body></html>"
+        ).encode()
+        self.send_body(body, "text/html; charset=utf-8")
+
+    def send_mjpeg(self, stream_server, channel):
+        self.send_response(200)
+        self.send_header("Content-Type", f"multipart/x-mixed-replace; boundary={BOUNDARY}")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+
+        with channel.condition:
+            channel.clients += 1
+        print_debug(f"Client {self.client_address[0]} connected to stream '{channel.name}'")
+
+        last_seq = 0
+        try:
+            while stream_server.running:
+                # A slow client simply skips to the newest frame, nothing is queued for it
+                seq, jpeg = channel.wait_jpeg(last_seq, timeout=1.0)
+                if jpeg is None:
+                    continue
+                last_seq = seq
+                self.wfile.write(
+                    f"--{BOUNDARY}\r\nContent-Type: image/jpeg\r\nContent-Length: {len(jpeg)}\r\n\r\n".encode()
+                )
+                self.wfile.write(jpeg)
+                self.wfile.write(b"\r\n")
+        except (BrokenPipeError, ConnectionResetError, ConnectionAbortedError):
+            pass
+        finally:
+            with channel.condition:
+                channel.clients -= 1
+            print_debug(f"Client {self.client_address[0]} disconnected from stream '{channel.name}'")
+
+
+class MJPEGStreamServer:
+    """HTTP server restreaming the camera feeds and a composite grid as MJPEG"""
+    def __init__(self, host="127.0.0.1", port=8080, quality=80, grid_fps=5, tile_size=(320, 240)):
+        self.host = host
+        self.port = port
+        self.quality = quality
+        self.grid_fps = grid_fps
+        self.tile_size = tile_size
+
+        self.channels = {}
+        self.channels_lock = threading.Lock()
+        self.grid_channel = StreamChannel("Grid", quality)
+
+        self.running = False
+        self.httpd = None
+        self.server_thread = None
+        self.grid_thread = None
+
+    def start(self):
+        self.httpd = ThreadingHTTPServer((self.host, self.port), _StreamRequestHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.stream_server = self
+        # Port 0 lets the OS pick one, keep the real port for the URL
+        self.port = self.httpd.server_address[1]
+        self.running = True
+
+        self.server_thread = threading.Thread(target=self.httpd.serve_forever, name="MJPEGServer", daemon=True)
+        self.server_thread.start()
+        self.grid_thread = threading.Thread(target=self._grid_loop, name="MJPEGGrid", daemon=True)
+        self.grid_thread.start()
+        print_info(f"MJPEG stream server listening on {self.url}")
+
+    def stop(self):
+        if not self.running:
+            return
+        self.running = False
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        self.server_thread.join(timeout=2)
+        self.grid_thread.join(timeout=2)
+        print_info("MJPEG stream server stopped")
+
+    @property
+    def url(self):
+        host = "127.0.0.1" if self.host in ("", "0.0.0.0") else self.host
+        return f"http://{host}:{self.port}/"
+
+    def publish(self, key, name, frame):
+        """Hands the latest processed BGR frame of a camera to the server (no copy, no encode)"""
+        key = str(key)
+        channel = self.channels.get(key)
+        if channel is None:
+            with self.channels_lock:
+                channel = self.channels.setdefault(key, StreamChannel(name, self.quality))
+        channel.name = name
+        channel.publish(frame)
+
+    def remove_channel(self, key):
+        with self.channels_lock:
+            self.channels.pop(str(key), None)
+
+    def memory_usage(self):
+        """Bytes of the frames and JPEGs held for the clients (the frames are shared with the display)"""
+        with self.channels_lock:
+            channels = list(self.channels.values())
+        return sum(channel.memory_usage() for channel in channels) + self.grid_channel.memory_usage()
+
+    def get_channel(self, key):
+        if key == "grid":
+            return self.grid_channel
+        return self.channels.get(key)
+
+    def channel_names(self):
+        with self.channels_lock:
+            return [(key, channel.name) for key, channel in self.channels.items()]
+
+    def stats(self):
+        with self.channels_lock:
+            channels = dict(self.channels)
+        channels["grid"] = self.grid_channel
+        return {
+            key: {
+                "name": channel.name,
+                "clients": channel.clients,
+                "frames": channel.seq,
+                "encodes": channel.encode_count,
+            }
+            for key, channel in channels.items()
+        }
+
+    def _grid_loop(self):
+        period = 1.0 / max(1, self.grid_fps)
+        tile_w, tile_h = self.tile_size
+        while self.running:
+            started = time.monotonic()
+            # The composite is only built while someone is watching it
+            if self.grid_channel.clients > 0:
+                try:
+                    with stage("stream grid"):
+                        self.grid_channel.publish(self._build_grid(tile_w, tile_h))
+                except Exception as e:
+                    print_error(f"Failed to build stream grid: {str(e)}")
+            time.sleep(max(0.0, period - (time.monotonic() - started)))
+
+    def _build_grid(self, tile_w, tile_h):
+        now = time.monotonic()
+        with self.channels_lock:
+            channels = list(self.channels.values())
+        # Skip cameras that stopped publishing (hidden or disconnected)
+        frames = []
+        for channel in channels:
+            _, frame = channel.latest_frame()
+            if frame is not None and now - channel.last_publish < 2.0:
+                frames.append(frame)
+
+        n = max(1, len(frames))
+        cols = int(np.ceil(np.sqrt(n)))
+        rows = (n + cols - 1) // cols
+        grid = np.zeros((rows * tile_h, cols * tile_w, 3), dtype=np.uint8)
+        for i, frame in enumerate(frames):
+            row, col = divmod(i, cols)
+            tile = cv2.resize(frame, (tile_w, tile_h), interpolation=cv2.INTER_AREA)
+            # Grayscale tiles are resized first and broadcast to the three channels
+            grid[row*tile_h:(row+1)*tile_h, col*tile_w:(col+1)*tile_w] = tile[:, :, None] if tile.ndim == 2 else tile
+        return grid
@@ -0,0 +1,127 @@
+import os
+import sys
+import time
+
+# Must be set before Qt is loaded, so the suite runs on headless machines
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import cv2
+import numpy as np
+import pytest
+from PyQt5.QtWidgets import QApplication, QMessageBox
+
+# One distinct BGR color per camera index
+CAMERA_COLORS = [
+    (255, 0, 0), (0, 255, 0), (0, 0, 255), (255, 255, 0),
+    (255, 0, 255), (0, 255, 255), (128, 0, 0), (0, 128, 0),
+    (0, 0, 128), (128, 128, 0), (128, 0, 128), (0, 128, 128),
+    (64, 192, 0), (0, 64, 192), (192, 0, 64), (192, 192, 64),
+]
+MARKER_COLOR = (255, 255, 255)
+
+
+def camera_color(index):
+    return CAMERA_COLORS[index % len(CAMERA_COLORS)]
+
+
+def synthetic_frame(index, width, height):
+    """Solid camera color with a white marker in the top-left quarter, to check rotations"""
+    frame = np.empty((height, width, 3), dtype=np.uint8)
+    frame[:] = camera_color(index)
+    frame[:height // 2, :width // 2] = MARKER_COLOR
+    return frame
+
+
+class SyntheticCapture:
+    """Stands in for cv2.VideoCapture: SyntheticCapture.count cameras at 60 fps"""
+    count = 4
+    fps = 60
+
+    def __init__(self, index, *args):
+        self.index = index if isinstance(index, int) else -1
+        self.opened = 0 <= self.index < SyntheticCapture.count
+        self.width, self.height = 640, 480
+        self.frame = None
+
+    def isOpened(self):
+        return self.opened
+
+    def read(self):
+        # The reader threads call read() in a loop, pace them like a real camera
+        time.sleep(1.0 / SyntheticCapture.fps)
+        if not self.opened:
+            return False, None
+        if self.frame is None or self.frame.shape[:2] != (self.height, self.width):
+            self.frame = synthetic_frame(self.index, self.width, self.height)
+        return True, self.frame
+
+    def grab(self):
+        time.sleep(1.0 / SyntheticCapture.fps)
+        return self.opened
+
+    def get(self, prop):
+        if prop == cv2.CAP_PROP_FRAME_WIDTH:
+            return float(self.width)
+        if prop == cv2.CAP_PROP_FRAME_HEIGHT:
+            return float(self.height)
+        return 0.0
+
+    def set(self, prop, value):
+        if prop == cv2.CAP_PROP_FRAME_WIDTH:
+            self.width = int(value)
+        elif prop == cv2.CAP_PROP_FRAME_HEIGHT:
+            self.height = int(value)
+        return True
+
+    def release(self):
+        self.opened = False
+
+
+@pytest.fixture(scope="session")
+def qapp():
+    app = QApplication.instance() or QApplication([])
+    yield app
+
+
+def process_events(app, seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        app.processEvents()
+        time.sleep(0.002)
+
+
+@pytest.fixture
+def make_flux(qapp, monkeypatch, tmp_path):
+    """
+    Factory creating a CamFluxWidget over synthetic cameras, waiting for their first frames.
+    The configuration folder is redirected to a temporary home.
+    """
+    monkeypatch.setattr(cv2, "VideoCapture", SyntheticCapture)
+    monkeypatch.setenv("HOME", str(tmp_path))
+    monkeypatch.setenv("USERPROFILE", str(tmp_path))
+    monkeypatch.setattr(QMessageBox, "information", staticmethod(lambda *args, **kwargs: None))
+    monkeypatch.setattr(QMessageBox, "warning", staticmethod(lambda *args, **kwargs: None))
+    from camera_widgets import CamFluxWidget
+
+    widgets = []
+
+    def factory(count, resolution=(640, 480), adaptive_resolution=True, keep_aspect_ratio=False):
+        monkeypatch.setattr(SyntheticCapture, "count", count)
+        # /dev is left alone, hot-plug is covered by test_device_monitor.py
+        flux = CamFluxWidget(resolution, keep_aspect_ratio, adaptive_resolution, watch_devices=False)
+        widgets.append(flux)
+        flux.show_labels_in_screenshots = False
+        flux.show()
+        deadline = time.perf_counter() + 5.0
+        while any(cap.seq == 0 for cap in flux.caps) and time.perf_counter() < deadline:
+            process_events(qapp, 0.01)
+        assert all(cap.seq > 0 for cap in flux.caps), "synthetic cameras did not deliver frames"
+        return flux
+
+    yield factory
+
+    for flux in widgets:
+        flux.close()
+        flux.deleteLater()
+    qapp.processEvents()
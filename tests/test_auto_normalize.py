@@ -0,0 +1,95 @@
+import cv2
+import numpy as np
+
+from auto_normalize import MAX_BLACK_LEVEL, MIN_RANGE, AutoNormalizer
+
+
+def apply(normalizer, frame):
+    lut = normalizer.table[1]
+    return cv2.LUT(frame, lut.reshape(1, 256, -1)) if frame.ndim == 3 else cv2.LUT(frame, lut.reshape(256))
+
+
+def ramp(low, high, shape=(120, 160)):
+    values = np.linspace(low, high, shape[0] * shape[1]).reshape(shape)
+    return np.round(values).astype(np.uint8)
+
+
+def test_dim_low_contrast_scene_is_stretched():
+    frame = np.dstack([ramp(40, 120)] * 3)
+    normalizer = AutoNormalizer()
+    normalizer.observe(frame)
+    output = apply(normalizer, frame)
+    assert output.min() <= 5 and output.max() >= 250
+    # Monotonic: the stretch never swaps two levels
+    assert np.all(np.diff(normalizer.table[1][:, 0].astype(int)) >= 0)
+
+
+def test_color_cast_is_neutralized():
+    gray = ramp(30, 220)
+    frame = np.dstack([gray * 0.6, gray * 0.9, gray]).astype(np.uint8)
+    normalizer = AutoNormalizer()
+    normalizer.observe(frame)
+    means = apply(normalizer, frame).reshape(-1, 3).mean(axis=0)
+    assert means.max() - means.min() < 5
+    assert np.ptp(frame.reshape(-1, 3).mean(axis=0)) > 30
+
+
+def test_flat_scene_is_not_over_corrected():
+    frame = np.full((120, 160), 100, dtype=np.uint8)
+    normalizer = AutoNormalizer()
+    normalizer.observe(frame)
+    lut = normalizer.table[1].reshape(256).astype(int)
+    # At most 255 / MIN_RANGE gain around the measured level
+    assert lut[110] - lut[90] <= 20 * 255 / MIN_RANGE + 1
+
+
+def test_bright_scene_keeps_its_midtones():
+    frame = ramp(150, 250)
+    normalizer = AutoNormalizer()
+    normalizer.observe(frame)
+    lut = normalizer.table[1].reshape(256)
+    # The darkest pixels are not pulled to black, the black level stops at MAX_BLACK_LEVEL
+    assert lut[MAX_BLACK_LEVEL] == 0
+    assert lut[150] > 100
+
+
+def test_tables_follow_the_scene_smoothly_every_interval():
+    normalizer = AutoNormalizer(interval=5, smoothing=0.5)
+    dark = np.dstack([ramp(0, 100)] * 3)
+    bright = np.dstack([ramp(0, 250)] * 3)
+    normalizer.observe(dark)
+    assert normalizer.table[0] == 1
+    high = normalizer.high
+    for _ in range(4):
+        normalizer.observe(bright)
+    # Between two measurements the table is not touched
+    assert normalizer.table[0] == 1
+    normalizer.observe(bright)
+    assert normalizer.table[0] == 2
+    assert high < normalizer.high < 250
+    assert not normalizer.table[1].flags.writeable
+
+
+def test_switching_to_grayscale_restarts_the_measurement():
+    normalizer = AutoNormalizer(interval=1)
+    normalizer.observe(np.dstack([ramp(0, 255)] * 3))
+    assert normalizer.table[1].shape == (256, 3)
+    normalizer.observe(ramp(40, 120))
+    assert normalizer.table[1].shape == (256, 1)
+    assert normalizer.low > 35
+
+
+def test_widget_folds_the_table_into_its_adjustments(qapp, make_flux):
+    flux = make_flux(1)
+    widget = flux.cam_widgets[0]
+    frame = np.dstack([ramp(40, 120, (480, 640))] * 3)
+    assert widget.adjustment_lut(3) is None
+    # Neutral settings and no measurement: the frame is returned without a lookup pass
+    assert widget.apply_brightness_contrast(frame) is frame
+
+    flux.set_auto_normalize(0, True)
+    flux.caps[0].normalizer.observe(frame)
+    adjusted = widget.apply_brightness_contrast(frame)
+    assert np.array_equal(adjusted, apply(flux.caps[0].normalizer, frame))
+    # The combined table is cached until the next measurement
+    assert widget.adjustment_lut(3) is widget.adjustment_lut(3)
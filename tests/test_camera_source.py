@@ -0,0 +1,261 @@
+import threading
+import time
+
+import cv2
+import numpy as np
+
+import camera_source
+from camera_source import STATE_DEGRADED, STATE_OK, CameraSource
+
+
+class BlockingCapture:
+    """Capture whose read() blocks until unblocked, recording whether release() overlapped it"""
+    def __init__(self):
+        self.unblock = threading.Event()
+        self.reading = threading.Event()
+        self.in_read = False
+        self.released = False
+        self.released_during_read = False
+
+    def isOpened(self):
+        return not self.released
+
+    def read(self):
+        self.in_read = True
+        self.reading.set()
+        self.unblock.wait(5)
+        self.in_read = False
+        return True, np.zeros((8, 8, 3), dtype=np.uint8)
+
+    def set(self, prop, value):
+        return True
+
+    def get(self, prop):
+        return 0.0
+
+    def release(self):
+        self.released_during_read = self.released_during_read or self.in_read
+        self.released = True
+
+
+class StaticCapture:
+    """Capture returning the same frame forever, like a static scene or a covered lens"""
+    opened = 0
+
+    def __init__(self, *args):
+        StaticCapture.opened += 1
+        self.released = False
+
+    def isOpened(self):
+        return not self.released
+
+    def read(self):
+        time.sleep(0.001)
+        return True, np.full((32, 32, 3), 40, dtype=np.uint8)
+
+    def set(self, prop, value):
+        return True
+
+    def get(self, prop):
+        return 0.0
+
+    def release(self):
+        self.released = True
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_stop_releases_wedged_capture_after_read_returns():
+    cap = BlockingCapture()
+    source = CameraSource(0, cap)
+    source.start()
+    assert cap.reading.wait(2)
+
+    source.reader_thread.join = lambda timeout=None: None
+    source.stop()
+    assert not cap.released
+
+    cap.unblock.set()
+    assert wait_for(lambda: cap.released)
+    assert not cap.released_during_read
+
+
+def test_reopen_hands_old_capture_to_orphaned_reader(monkeypatch):
+    monkeypatch.setattr(camera_source.cv2, "VideoCapture", StaticCapture)
+    old = BlockingCapture()
+    source = CameraSource(0, old)
+    source.start()
+    assert old.reading.wait(2)
+
+    # The read is wedged: the watchdog sees a stall and reopens while the read is still stuck
+    source.frame_time = time.monotonic() - 10
+    assert source.check_health(time.monotonic()) == "stall"
+    assert wait_for(lambda: source.state == STATE_OK)
+    assert isinstance(source.cap, StaticCapture)
+    assert not old.released
+
+    old.unblock.set()
+    assert wait_for(lambda: old.released)
+    assert not old.released_during_read
+    source.stop()
+
+
+def test_stop_during_reopen_releases_the_new_capture(monkeypatch):
+    opening = threading.Event()
+    proceed = threading.Event()
+    opened = []
+
+    class SlowCapture(StaticCapture):
+        def __init__(self, *args):
+            opening.set()
+            proceed.wait(5)
+            super().__init__(*args)
+            opened.append(self)
+
+    monkeypatch.setattr(camera_source.cv2, "VideoCapture", SlowCapture)
+    old = BlockingCapture()
+    source = CameraSource(0, old)
+    source.start()
+    assert old.reading.wait(2)
+    reader = source.reader_thread
+
+    source.frame_time = time.monotonic() - 10
+    assert source.check_health(time.monotonic()) == "stall"
+    assert opening.wait(5)
+    # Closed while the device is still opening
+    source.reader_thread.join = lambda timeout=None: None
+    source.stop()
+    proceed.set()
+    source.reopen_thread.join(5)
+
+    assert opened and opened[0].released
+    assert source.cap is old and source.reader_thread is reader
+    old.unblock.set()
+    assert wait_for(lambda: old.released)
+
+
+def test_static_scene_is_not_reopened_forever(monkeypatch):
+    monkeypatch.setattr(camera_source.cv2, "VideoCapture", StaticCapture)
+    StaticCapture.opened = 0
+    source = CameraSource(0, StaticCapture())
+    source.start()
+    assert wait_for(lambda: source.identical_frames >= 20)
+
+    assert source.check_health(time.monotonic(), frozen_threshold=20) == "frozen"
+    assert source.state == STATE_DEGRADED
+    assert wait_for(lambda: source.state == STATE_OK)
+
+    # The same image comes back after the reopen: a static scene, left alone
+    assert wait_for(lambda: source.identical_frames >= 20)
+    assert source.check_health(time.monotonic(), frozen_threshold=20) is None
+    assert source.faults["frozen"] == 1
+    assert StaticCapture.opened == 2
+    source.stop()
+
+
+YUYV = float(cv2.VideoWriter_fourcc(*"YUYV"))
+
+
+class JpegCapture:
+    """MJPEG camera: compressed payloads once CAP_PROP_CONVERT_RGB is turned off"""
+    def __init__(self, frame):
+        self.frame = frame
+        self.payload = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, 95])[1].reshape(1, -1)
+        self.convert_rgb = True
+        self.fourcc = YUYV
+
+    def isOpened(self):
+        return True
+
+    def read(self):
+        time.sleep(0.005)
+        return True, self.frame if self.convert_rgb else self.payload
+
+    def set(self, prop, value):
+        if prop == cv2.CAP_PROP_CONVERT_RGB:
+            self.convert_rgb = bool(value)
+        elif prop == cv2.CAP_PROP_FOURCC:
+            self.fourcc = float(value)
+        return True
+
+    def get(self, prop):
+        return self.fourcc if prop == cv2.CAP_PROP_FOURCC else 0.0
+
+    def release(self):
+        pass
+
+
+def quadrants(height=480, width=640):
+    frame = np.zeros((height, width, 3), dtype=np.uint8)
+    frame[:height // 2, :width // 2] = (255, 0, 0)
+    frame[height // 2:, width // 2:] = (0, 0, 255)
+    return frame
+
+
+def test_reduced_decoding_keeps_full_frames_on_read():
+    source = CameraSource(0, JpegCapture(quadrants()))
+    source.set_raw_mode(True)
+    source.start()
+    try:
+        assert wait_for(lambda: source.payload is not None)
+        assert source.full_size == (640, 480)
+        # A 160x120 tile only needs a quarter of the resolution
+        source.set_preview_size(160, 120)
+        assert source.preview_scale == 4
+        seq = source.seq
+        assert wait_for(lambda: source.seq > seq + 1)
+
+        _, preview = source.latest()
+        assert preview.shape == (120, 160, 3)
+        ok, full = source.read()
+        assert ok and full.shape == (480, 640, 3)
+        assert np.abs(full.astype(int) - quadrants()).mean() < 3
+        assert np.abs(cv2.resize(full, (160, 120), interpolation=cv2.INTER_AREA).astype(int) - preview).mean() < 5
+    finally:
+        source.stop()
+
+
+def test_reduced_decoding_can_be_turned_off():
+    cap = JpegCapture(quadrants())
+    source = CameraSource(0, cap)
+    source.set_raw_mode(True)
+    source.set_preview_size(160, 120)
+    source.start()
+    try:
+        assert wait_for(lambda: source.payload is not None)
+        assert cap.fourcc == cv2.VideoWriter_fourcc(*"MJPG")
+        source.set_raw_mode(False)
+        assert wait_for(lambda: source.payload is None and not source.raw_active)
+        # The camera gets its own pixel format back
+        assert cap.fourcc == YUYV
+        seq = source.seq
+        assert wait_for(lambda: source.seq > seq)
+        assert source.latest()[1].shape == (480, 640, 3)
+    finally:
+        source.stop()
+
+
+def test_grayscale_frames_are_single_channel():
+    source = CameraSource(0, JpegCapture(quadrants()))
+    source.set_grayscale(True)
+    source.start()
+    try:
+        assert wait_for(lambda: source.seq > 0)
+        frame = source.latest()[1]
+        assert frame.shape == (480, 640)
+        assert np.array_equal(frame, cv2.cvtColor(quadrants(), cv2.COLOR_BGR2GRAY))
+        assert source.memory_usage() == 480 * 640
+
+        # MJPEG payloads are decoded straight to grayscale, previews and full frames alike
+        source.set_raw_mode(True)
+        source.set_preview_size(320, 240)
+        assert wait_for(lambda: source.payload is not None and source.latest()[1].shape == (240, 320))
+        ok, full = source.read()
+        assert ok and full.shape == (480, 640)
+    finally:
+        source.stop()
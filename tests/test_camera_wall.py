@@ -0,0 +1,52 @@
+from types import SimpleNamespace
+
+from camera_wall import paginate
+
+
+def cameras(count, pinned=()):
+    return [SimpleNamespace(name=i, pinned=i in pinned) for i in range(count)]
+
+
+def names(pages):
+    return [[camera.name for camera in page] for page in pages]
+
+
+def test_single_page_when_everything_fits():
+    assert names(paginate(cameras(4), 0)) == [[0, 1, 2, 3]]
+    assert names(paginate(cameras(4), 4)) == [[0, 1, 2, 3]]
+
+
+def test_pages_in_order_with_a_short_last_page():
+    assert names(paginate(cameras(10), 4)) == [[0, 1, 2, 3], [4, 5, 6, 7], [8, 9]]
+
+
+def test_pinned_cameras_are_on_every_page():
+    assert names(paginate(cameras(7, pinned=(5,)), 3)) == [[5, 0, 1], [5, 2, 3], [5, 4, 6]]
+
+
+def test_page_of_pinned_cameras_only_still_pages_the_others():
+    assert names(paginate(cameras(4, pinned=(0, 1, 2)), 2)) == [[0, 1, 2, 3]]
+    assert names(paginate(cameras(3, pinned=(0, 1, 2)), 2)) == [[0, 1, 2]]
+
+
+def test_off_page_cameras_are_hidden_and_throttled(make_flux):
+    flux = make_flux(6, adaptive_resolution=False)
+    flux.set_wall_setting("page_size", 4)
+    assert flux.page_count == 2
+    assert [w.on_page for w in flux.cam_widgets] == [True] * 4 + [False] * 2
+    offpage_fps = flux.wall_settings["offpage_fps"]
+    assert [cap.max_fps for cap in flux.caps] == [0] * 4 + [offpage_fps] * 2
+    assert [w.isVisible() for w in flux.cam_widgets] == [True] * 4 + [False] * 2
+    # Captures still include every camera
+    assert len(flux.get_visible_widgets()) == 6
+
+    flux.next_page()
+    assert flux.wall_page == 1
+    assert [w.on_page for w in flux.cam_widgets] == [False] * 4 + [True] * 2
+    assert [cap.max_fps for cap in flux.caps] == [offpage_fps] * 4 + [0] * 2
+
+    flux.set_pinned(0, True)
+    assert flux.cam_widgets[0].on_page
+    flux.set_wall_setting("page_size", 0)
+    assert flux.page_count == 1
+    assert all(cap.max_fps == 0 for cap in flux.caps)
@@ -0,0 +1,82 @@
+import os
+from datetime import datetime
+
+import cv2
+import numpy as np
+import pytest
+
+from capture_catalog import THUMBNAIL_DIR, CaptureCatalog
+
+
+def write_capture(folder, name, value=128, size=(120, 320)):
+    path = os.path.join(str(folder), name)
+    frame = np.full(size + (3,), value, dtype=np.uint8)
+    cv2.imwrite(path, frame)
+    return path, frame
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    catalog = CaptureCatalog(str(tmp_path))
+    yield catalog
+    catalog.close()
+
+
+def test_added_captures_are_queried_by_time_and_camera(catalog, tmp_path):
+    for i, (camera, value) in enumerate([("Door", 10), ("Yard", 20), ("Door", 200)]):
+        path, frame = write_capture(tmp_path, f"screenshot_2024010{i + 1}_000000_{camera}.jpg", value)
+        catalog.add(path, camera, 1000.0 + i, frame)
+
+    assert catalog.count() == 3
+    assert catalog.cameras() == ["Door", "Yard"]
+    assert catalog.time_range() == (1000.0, 1002.0)
+    door = catalog.query(camera="Door")
+    assert [entry["timestamp"] for entry in door] == [1000.0, 1002.0]
+    assert door[0]["path"] == os.path.join(str(tmp_path), "screenshot_20240101_000000_Door.jpg")
+    assert door[0]["size"] == os.path.getsize(door[0]["path"])
+    assert [entry["camera"] for entry in catalog.query(start=1001.0, end=1002.0)] == ["Yard", "Door"]
+    assert len(catalog.query(limit=2)) == 2
+
+    # First capture of a camera has nothing to compare with, the next one is scored
+    assert door[0]["motion_score"] is None
+    assert door[1]["motion_score"] == pytest.approx(190 / 255, abs=0.01)
+
+
+def test_thumbnails_are_written_at_the_thumbnail_width(catalog, tmp_path):
+    path, frame = write_capture(tmp_path, "screenshot_20240101_000000.png", size=(120, 320))
+    catalog.add(path, "Composite", 1000.0, frame)
+    entry = catalog.query()[0]
+    assert entry["thumbnail"] == os.path.join(str(tmp_path), THUMBNAIL_DIR, "screenshot_20240101_000000.jpg")
+    assert cv2.imread(entry["thumbnail"]).shape[:2] == (60, 160)
+
+
+def test_existing_files_are_imported_once_with_lazy_thumbnails(catalog, tmp_path):
+    write_capture(tmp_path, "screenshot_20240102_030405.jpg")
+    write_capture(tmp_path, "timelapse_20240102_030406_Front_door.png")
+    write_capture(tmp_path, "holiday.jpg")
+    (tmp_path / "screenshot_20240102_030405.json").write_text("{}")
+
+    assert catalog.import_existing() == 2
+    assert catalog.import_existing() == 0
+    entries = catalog.query()
+    assert [entry["camera"] for entry in entries] == ["Composite", "Front_door"]
+    assert entries[0]["timestamp"] == datetime(2024, 1, 2, 3, 4, 5).timestamp()
+    assert all(entry["thumbnail"] is None for entry in entries)
+
+    thumbnail = catalog.ensure_thumbnail(entries[0])
+    assert os.path.exists(thumbnail)
+    assert catalog.query()[0]["thumbnail"] == thumbnail
+
+
+def test_removed_files_lose_their_entry_and_thumbnail(catalog, tmp_path):
+    paths = []
+    for i in range(3):
+        path, frame = write_capture(tmp_path, f"screenshot_20240101_00000{i}.jpg")
+        catalog.add(path, "Composite", 1000.0 + i, frame)
+        paths.append(path)
+    thumbnails = [entry["thumbnail"] for entry in catalog.query()]
+
+    catalog.remove(paths[:2])
+    catalog.remove([])
+    assert [entry["path"] for entry in catalog.query()] == paths[2:]
+    assert [os.path.exists(thumbnail) for thumbnail in thumbnails] == [False, False, True]
@@ -0,0 +1,84 @@
+import json
+import os
+import threading
+
+import cv2
+import numpy as np
+import pytest
+
+import capture_export
+from capture_export import DEFAULT_EXPORT_SETTINGS, CaptureExporter
+
+
+def tile(name, value, size=(48, 64)):
+    return {"name": name, "index": 0}, np.full(size + (3,), value, dtype=np.uint8)
+
+
+@pytest.fixture
+def exporter():
+    exporter = CaptureExporter(max_workers=2)
+    yield exporter
+    exporter.shutdown()
+
+
+def test_each_camera_gets_its_own_file(exporter, tmp_path):
+    settings = dict(DEFAULT_EXPORT_SETTINGS, catalog=False, save_individual=True, format="PNG")
+    tiles = [tile("Front door", 10), tile("Front door", 20), tile("Yard/East", 30, (32, 40))]
+    composite = np.zeros((96, 128, 3), dtype=np.uint8)
+    for future in exporter.export(str(tmp_path), "screenshot", "20240101_000000", tiles, settings, composite):
+        future.result()
+
+    with open(tmp_path / "screenshot_20240101_000000.json") as manifest_file:
+        manifest = json.load(manifest_file)
+    assert manifest["composite"] == "screenshot_20240101_000000.png"
+    # Cameras sharing a name do not overwrite each other's file
+    assert [entry["file"] for entry in manifest["cameras"]] == [
+        "screenshot_20240101_000000_Front_door.png",
+        "screenshot_20240101_000000_Front_door_1.png",
+        "screenshot_20240101_000000_Yard_East.png",
+    ]
+    assert (manifest["cameras"][2]["width"], manifest["cameras"][2]["height"]) == (40, 32)
+    for entry, (_, frame) in zip(manifest["cameras"], tiles):
+        saved = cv2.imread(str(tmp_path / entry["file"]))
+        assert np.array_equal(saved, frame)
+    assert exporter.pending_bytes == 0
+
+
+def test_manifest_is_written_after_every_file(exporter, tmp_path, monkeypatch):
+    release = threading.Event()
+    started = threading.Event()
+    imwrite = cv2.imwrite
+
+    def slow_imwrite(path, frame, params):
+        if path.endswith("_Slow.jpg"):
+            started.set()
+            release.wait(5)
+        return imwrite(path, frame, params)
+
+    monkeypatch.setattr(capture_export.cv2, "imwrite", slow_imwrite)
+    settings = dict(DEFAULT_EXPORT_SETTINGS, catalog=False, save_individual=True)
+    tiles = [tile("Fast", 10), tile("Slow", 20)]
+    futures = exporter.export(str(tmp_path), "screenshot", "20240101_000000", tiles, settings)
+    assert started.wait(5)
+
+    manifest_path = tmp_path / "screenshot_20240101_000000.json"
+    futures[0].result()
+    # The frames stay accounted for until their file is written
+    assert exporter.pending_bytes == tiles[1][1].nbytes
+    assert exporter.memory_usage() == exporter.pending_bytes
+    assert not manifest_path.exists()
+
+    release.set()
+    for future in futures:
+        future.result()
+    assert manifest_path.exists()
+    assert exporter.pending_bytes == 0
+
+
+def test_failed_writes_release_their_bytes(exporter, tmp_path):
+    settings = dict(DEFAULT_EXPORT_SETTINGS, catalog=False, save_individual=True)
+    missing = str(tmp_path / "missing")
+    for future in exporter.export(missing, "screenshot", "20240101_000000", [tile("Cam", 10)], settings):
+        future.result()
+    assert exporter.pending_bytes == 0
+    assert not os.path.exists(missing)
@@ -0,0 +1,181 @@
+import threading
+import time
+from concurrent.futures import Future
+
+import cv2
+import numpy as np
+import pytest
+
+from conftest import MARKER_COLOR, camera_color, process_events
+
+BLACK = (0, 0, 0)
+
+
+def assert_color(image, y, x, color, tolerance=3):
+    actual = image[y, x].astype(int)
+    assert np.all(np.abs(actual - np.array(color)) <= tolerance), f"pixel ({x}, {y}) is {tuple(actual)}, expected {color}"
+
+
+def screenshot(flux):
+    widgets = flux.get_visible_widgets()
+    return flux.compose_screenshot(widgets, flux.capture_tiles(widgets))
+
+
+@pytest.mark.parametrize("adaptive", [True, False])
+def test_grid_placement(make_flux, adaptive):
+    flux = make_flux(4, adaptive_resolution=adaptive)
+    image = screenshot(flux)
+    assert image.shape == (960, 1280, 3)
+    for idx in range(4):
+        top, left = (idx // 2) * 480, (idx % 2) * 640
+        # Marker in the top-left quarter, camera color elsewhere
+        assert_color(image, top + 100, left + 100, MARKER_COLOR)
+        assert_color(image, top + 400, left + 500, camera_color(idx))
+        assert_color(image, top + 100, left + 500, camera_color(idx))
+
+
+def test_odd_count_leaves_last_cells_empty(make_flux):
+    flux = make_flux(3, adaptive_resolution=False)
+    image = screenshot(flux)
+    assert image.shape == (960, 1280, 3)
+    assert_color(image, 480 + 100, 100, MARKER_COLOR)
+    assert_color(image, 480 + 400, 500, camera_color(2))
+    assert_color(image, 480 + 400, 640 + 500, BLACK)
+
+
+def test_adaptive_rotation_gets_portrait_cell(make_flux):
+    flux = make_flux(4, adaptive_resolution=True)
+    flux.rotate_camera(1, 90)
+    image = screenshot(flux)
+    # First row is as tall as the rotated camera
+    assert image.shape == (640 + 480, 1280, 3)
+    # Rotated clockwise: the marker moves to the top-right quarter
+    assert_color(image, 100, 640 + 500, MARKER_COLOR)
+    assert_color(image, 100, 640 + 100, camera_color(1))
+    assert_color(image, 500, 640 + 500, camera_color(1))
+    # The unrotated camera of the same row is unaffected
+    assert_color(image, 100, 100, MARKER_COLOR)
+    assert_color(image, 400, 500, camera_color(0))
+
+
+def test_fixed_rotation_is_pillarboxed(make_flux):
+    flux = make_flux(4, adaptive_resolution=False)
+    flux.rotate_camera(1, 90)
+    image = screenshot(flux)
+    assert image.shape == (960, 1280, 3)
+    # Portrait tile scaled to 360x480, centered in the 640x480 cell
+    assert_color(image, 100, 640 + 50, BLACK)
+    assert_color(image, 100, 640 + 600, BLACK)
+    assert_color(image, 100, 640 + 400, MARKER_COLOR)
+    assert_color(image, 100, 640 + 200, camera_color(1))
+    assert_color(image, 400, 640 + 400, camera_color(1))
+
+
+def test_rotation_180(make_flux):
+    flux = make_flux(1, adaptive_resolution=False)
+    flux.rotate_camera(0, 180)
+    image = screenshot(flux)
+    assert image.shape == (480, 640, 3)
+    assert_color(image, 400, 500, MARKER_COLOR)
+    assert_color(image, 100, 100, camera_color(0))
+
+
+def test_take_screenshot_writes_composite(make_flux, tmp_path):
+    flux = make_flux(2, adaptive_resolution=True)
+    path = str(tmp_path / "composite.png")
+    flux.take_screenshot(path)
+    image = cv2.imread(path)
+    assert image is not None
+    assert image.shape == (480, 1280, 3)
+    assert_color(image, 400, 500, camera_color(0))
+    assert_color(image, 400, 640 + 500, camera_color(1))
+
+
+def test_hidden_camera_is_not_captured(make_flux):
+    flux = make_flux(4, adaptive_resolution=False)
+    flux.toggle_camera(0, 0)
+    image = screenshot(flux)
+    # Three cameras left, the first cell now holds camera 1
+    assert image.shape == (960, 1280, 3)
+    assert_color(image, 400, 500, camera_color(1))
+
+
+class InlineExecutor:
+    """Runs submitted calls right away, the sequential reference of the parallel composite"""
+    def submit(self, function, *args):
+        future = Future()
+        future.set_result(function(*args))
+        return future
+
+
+@pytest.mark.parametrize("adaptive", [True, False])
+def test_parallel_composite_matches_sequential(make_flux, monkeypatch, adaptive):
+    flux = make_flux(5, adaptive_resolution=adaptive)
+    flux.show_labels_in_screenshots = True
+    flux.rotate_camera(2, 90)
+    widgets = flux.get_visible_widgets()
+    tiles = flux.capture_tiles(widgets)
+
+    threads = set()
+    draw_tile = flux.draw_tile
+
+    def recording_draw_tile(*args):
+        threads.add(threading.get_ident())
+        draw_tile(*args)
+
+    monkeypatch.setattr(flux, "draw_tile", recording_draw_tile)
+    parallel = flux.compose_screenshot(widgets, tiles)
+    assert threading.get_ident() not in threads
+
+    monkeypatch.setattr(flux, "get_compose_executor", lambda: InlineExecutor())
+    sequential = flux.compose_screenshot(widgets, tiles)
+    assert np.array_equal(parallel, sequential)
+
+
+def test_failed_read_leaves_its_cell_empty(make_flux):
+    flux = make_flux(4, adaptive_resolution=False)
+    widgets = flux.get_visible_widgets()
+    tiles = flux.capture_tiles(widgets)
+    tiles[1] = None
+    image = flux.compose_screenshot(widgets, tiles)
+    assert_color(image, 400, 640 + 500, BLACK)
+    assert_color(image, 480 + 400, 640 + 500, camera_color(3))
+
+
+def wait_for_new_frames(qapp, flux):
+    seqs = [cap.seq for cap in flux.caps]
+    deadline = time.perf_counter() + 5.0
+    while any(cap.seq <= seq + 1 for cap, seq in zip(flux.caps, seqs)) and time.perf_counter() < deadline:
+        process_events(qapp, 0.01)
+
+
+def gray_of(color):
+    return cv2.cvtColor(np.uint8([[color]]), cv2.COLOR_BGR2GRAY)[0, 0]
+
+
+def test_grayscale_cameras_give_a_single_channel_composite(qapp, make_flux):
+    flux = make_flux(2, adaptive_resolution=False)
+    for idx in range(2):
+        flux.set_grayscale(idx, True)
+    wait_for_new_frames(qapp, flux)
+    assert all(cap.latest()[1].ndim == 2 for cap in flux.caps)
+
+    image = screenshot(flux)
+    assert image.shape == (480, 1280)
+    assert abs(int(image[400, 500]) - int(gray_of(camera_color(0)))) <= 3
+    assert abs(int(image[400, 640 + 500]) - int(gray_of(camera_color(1)))) <= 3
+
+    # Previews and adjustments work on the single-channel frames too
+    flux.apply_adjustments({0: {"brightness": 20}})
+    flux.update_frames()
+    assert flux.cam_widgets[0].original_pixmap is not None
+
+
+def test_mixed_grayscale_composite_stays_color(qapp, make_flux):
+    flux = make_flux(2, adaptive_resolution=False)
+    flux.set_grayscale(1, True)
+    wait_for_new_frames(qapp, flux)
+    image = screenshot(flux)
+    assert image.shape == (480, 1280, 3)
+    assert_color(image, 400, 500, camera_color(0))
+    assert_color(image, 400, 640 + 500, (gray_of(camera_color(1)),) * 3)
@@ -0,0 +1,96 @@
+import os
+import time
+
+import numpy as np
+import pytest
+
+from capture_export import DEFAULT_EXPORT_SETTINGS, CaptureExporter
+from dedup import CaptureDeduplicator, difference_hash, hash_distance
+
+
+def gradient(shift=0):
+    frame = np.tile(np.arange(64, dtype=np.uint8) * 4, (48, 1))
+    return np.dstack([np.roll(frame, shift, axis=1)] * 3)
+
+
+@pytest.fixture
+def exporter():
+    exporter = CaptureExporter(max_workers=1)
+    yield exporter
+    exporter.shutdown()
+
+
+def export(exporter, folder, timestamp, frame, mode="Skip"):
+    settings = dict(DEFAULT_EXPORT_SETTINGS, catalog=False, dedup=True, dedup_mode=mode)
+    for future in exporter.export(str(folder), "screenshot", timestamp, [], settings, composite=frame):
+        future.result()
+    return os.path.join(str(folder), f"screenshot_{timestamp}.jpg")
+
+
+def test_hash_ignores_noise_but_not_content():
+    frame = gradient()
+    noisy = np.clip(frame.astype(int) + np.random.default_rng(0).integers(-2, 3, frame.shape), 0, 255)
+    assert hash_distance(difference_hash(frame), difference_hash(noisy.astype(np.uint8))) <= 4
+    assert hash_distance(difference_hash(frame), difference_hash(gradient(32))) > 4
+
+
+def test_reference_only_after_successful_write():
+    dedup = CaptureDeduplicator()
+    frame = gradient()
+    assert dedup.check("folder", "cam", frame, "a.jpg", 4) is None
+    # Not on disk yet, nothing to be a duplicate of
+    assert dedup.check("folder", "cam", frame, "b.jpg", 4) is None
+    dedup.write_failed("folder", "cam", "b.jpg")
+    assert dedup.check("folder", "cam", frame, "c.jpg", 4) is None
+    dedup.file_written("folder", "cam", "c.jpg", 100)
+    assert dedup.check("folder", "cam", frame, "d.jpg", 4) == "c.jpg"
+
+
+def test_failed_write_is_not_a_reference(exporter, tmp_path):
+    missing = tmp_path / "missing"
+    path = export(exporter, missing, "20240101_000000", gradient())
+    assert not os.path.exists(path)
+    assert exporter.deduplicator.check(str(missing), "Composite", gradient(), "x.jpg", 4) is None
+
+
+def test_duplicate_is_skipped(exporter, tmp_path):
+    first = export(exporter, tmp_path, "20240101_000000", gradient())
+    second = export(exporter, tmp_path, "20240101_000001", gradient())
+    assert os.path.exists(first)
+    assert not os.path.exists(second)
+    assert exporter.deduplicator.stats()["skipped"] == 1
+    assert exporter.deduplicator.stats()["bytes_saved"] == os.path.getsize(first)
+
+
+def test_hard_link_to_deleted_reference_falls_back_and_forgets_it(exporter, tmp_path):
+    first = export(exporter, tmp_path, "20240101_000000", gradient(), "Hard link")
+    os.remove(first)
+    second = export(exporter, tmp_path, "20240101_000001", gradient(), "Hard link")
+    # Written in full, and no longer linking to the missing file
+    assert os.path.exists(second)
+    assert os.stat(second).st_nlink == 1
+    third = export(exporter, tmp_path, "20240101_000002", gradient(), "Hard link")
+    assert os.stat(third).st_nlink == 1
+    fourth = export(exporter, tmp_path, "20240101_000003", gradient(), "Hard link")
+    assert os.path.samefile(third, fourth)
+
+
+def test_retention_delete_drops_reference(exporter, tmp_path):
+    first = export(exporter, tmp_path, "20240101_000000", gradient())
+    os.remove(first)
+    exporter.get_retention(str(tmp_path)).on_delete([first])
+    second = export(exporter, tmp_path, "20240101_000001", gradient())
+    assert os.path.exists(second)
+
+
+def test_hard_links_do_not_count_against_the_quota(exporter, tmp_path):
+    exporter.retention_settings = {"max_size_gb": 0.0, "max_age_days": 0, "min_free_gb": 0.0}
+    first = export(exporter, tmp_path, "20240101_000000", gradient(), "Hard link")
+    second = export(exporter, tmp_path, "20240101_000001", gradient(), "Hard link")
+    assert os.path.samefile(first, second)
+    retention = exporter.get_retention(str(tmp_path))
+    deadline = time.monotonic() + 5
+    while not retention.loaded and time.monotonic() < deadline:
+        time.sleep(0.01)
+    # Whether recorded by the exporter or found by the initial scan, the inode counts once
+    assert retention.stats()["bytes"] == os.path.getsize(first)
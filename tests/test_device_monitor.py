@@ -0,0 +1,61 @@
+import time
+
+import pytest
+
+from device_monitor import DeviceMonitor, InotifyWatcher, PollingWatcher
+
+
+def wait_event(monitor, timeout=5.0):
+    return monitor.events.get(timeout=timeout)
+
+
+@pytest.fixture(params=["polling", "inotify"])
+def watcher(request, tmp_path):
+    if request.param == "polling":
+        return PollingWatcher(str(tmp_path), interval=0.02)
+    try:
+        return InotifyWatcher(str(tmp_path))
+    except (OSError, AttributeError) as e:
+        pytest.skip(f"inotify unavailable: {e}")
+
+
+def test_added_and_removed_nodes_are_reported(tmp_path, watcher):
+    opened = []
+
+    def open_device(index):
+        opened.append(index)
+        return f"source-{index}"
+
+    monitor = DeviceMonitor(str(tmp_path), open_device=open_device, watcher=watcher, probe_delay=0.01)
+    monitor.start()
+    try:
+        (tmp_path / "video3").touch()
+        assert wait_event(monitor) == ("added", 3, "source-3")
+        (tmp_path / "video3").unlink()
+        assert wait_event(monitor) == ("removed", 3, None)
+        assert opened == [3]
+    finally:
+        monitor.stop()
+
+
+def test_other_nodes_and_unopenable_devices_are_ignored(tmp_path, watcher):
+    attempts = []
+
+    def open_device(index):
+        attempts.append(index)
+        return None
+
+    monitor = DeviceMonitor(str(tmp_path), open_device=open_device, watcher=watcher,
+                            probe_attempts=2, probe_delay=0.01)
+    monitor.start()
+    try:
+        (tmp_path / "ttyS0").touch()
+        (tmp_path / "video1").touch()
+        deadline = time.monotonic() + 5.0
+        while len(attempts) < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        time.sleep(0.1)
+        assert attempts == [1, 1]
+        assert monitor.events.empty()
+    finally:
+        monitor.stop()
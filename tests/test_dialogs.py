@@ -0,0 +1,100 @@
+from PyQt5.QtCore import Qt
+
+from camera_source import CameraSource
+from conftest import SyntheticCapture, process_events
+from dialogs import GlobalControlDialog, ScreenshotDialog
+
+
+def open_dialog(flux, monkeypatch):
+    batches = []
+    apply_adjustments = flux.apply_adjustments
+    monkeypatch.setattr(flux, "apply_adjustments",
+                        lambda adjustments: (batches.append(adjustments), apply_adjustments(adjustments)))
+    return GlobalControlDialog(flux), batches
+
+
+def test_tabs_are_built_when_first_shown(make_flux, monkeypatch):
+    flux = make_flux(4)
+    cameras = list(flux.cam_widgets)
+    dialog, _ = open_dialog(flux, monkeypatch)
+    assert list(dialog.tab_sliders) == [cameras[0]]
+    dialog.tab_widget.setCurrentIndex(2)
+    assert list(dialog.tab_sliders) == [cameras[0], cameras[2]]
+    dialog.done(0)
+
+
+def test_slider_moves_are_applied_in_one_batch(qapp, make_flux, monkeypatch):
+    flux = make_flux(2)
+    first = flux.cam_widgets[0]
+    dialog, batches = open_dialog(flux, monkeypatch)
+    slider = dialog.tab_sliders[first]["brightness"].slider
+    for value in range(1, 11):
+        slider.setValue(value)
+    dialog.tab_sliders[first]["contrast"].slider.setValue(-5)
+    assert batches == []
+
+    process_events(qapp, 3 * GlobalControlDialog.ADJUST_DELAY_MS / 1000)
+    assert batches == [{0: {"brightness": 10, "contrast": -5}}]
+    assert (flux.cam_widgets[0].brightness, flux.cam_widgets[0].contrast) == (10, -5)
+    assert flux.cam_widgets[1].brightness == 0
+    dialog.done(0)
+
+
+def test_group_mode_adjusts_every_checked_camera(make_flux, monkeypatch):
+    flux = make_flux(4)
+    cameras = list(flux.cam_widgets)
+    dialog, batches = open_dialog(flux, monkeypatch)
+    dialog.tab_widget.setCurrentIndex(3)
+    dialog.group_cb.setChecked(True)
+    dialog.group_list.item(1).setCheckState(Qt.Checked)
+    dialog.group_list.item(3).setCheckState(Qt.Checked)
+
+    dialog.tab_sliders[cameras[0]]["saturation"].slider.setValue(20)
+    # Closing flushes the moves still waiting for the timer
+    dialog.done(0)
+    assert batches == [{1: {"saturation": 20}, 3: {"saturation": 20}, 0: {"saturation": 20}}]
+    assert [w.saturation for w in flux.cam_widgets] == [20, 20, 0, 20]
+    assert dialog.tab_sliders[cameras[3]]["saturation"].slider.value() == 20
+
+
+def test_cameras_removed_and_added_while_open(make_flux, monkeypatch):
+    flux = make_flux(3)
+    cameras = list(flux.cam_widgets)
+    dialog, batches = open_dialog(flux, monkeypatch)
+    dialog.tab_widget.setCurrentIndex(2)
+    dialog.tab_sliders[cameras[2]]["brightness"].slider.setValue(15)
+
+    # The last camera moves to index 1, its pending move and its controls follow it
+    flux.remove_camera_source(1)
+    assert dialog.tab_widget.count() == 2 and dialog.group_list.count() == 2
+    dialog.tab_sliders[cameras[2]]["contrast"].slider.setValue(-10)
+    dialog.rotate_cameras(cameras[2], 90)
+    assert cameras[2].rotation_angle == 90 and cameras[0].rotation_angle == 0
+
+    # A camera plugged in while the dialog is open gets its tab and group entry
+    monkeypatch.setattr(SyntheticCapture, "count", 4)
+    added = flux.add_local_camera(CameraSource(3))
+    assert dialog.tab_widget.count() == 3 and dialog.group_list.item(2).text() == "Camera 3"
+    dialog.tab_widget.setCurrentIndex(2)
+    dialog.tab_sliders[added]["saturation"].slider.setValue(30)
+
+    # A removed camera's controls do nothing
+    flux.remove_camera_source(0)
+    dialog.rotate_cameras(cameras[0], 90)
+    dialog.done(0)
+    assert batches == [{0: {"brightness": 15, "contrast": -10}, 1: {"saturation": 30}}]
+    assert (cameras[2].brightness, cameras[2].contrast, added.saturation) == (15, -10, 30)
+    assert cameras[0].rotation_angle == 0
+
+
+def test_screenshot_schedules_follow_removed_cameras(make_flux):
+    flux = make_flux(3)
+    dialog = ScreenshotDialog(flux)
+    last = flux.cam_widgets[2]
+    dialog.schedule_camera_combo.setCurrentIndex(2)
+    flux.remove_camera_source(1)
+    combo = dialog.schedule_camera_combo
+    assert [combo.itemText(i) for i in range(combo.count())] == [w.name for w in flux.cam_widgets]
+    assert combo.currentData() == flux.schedule_key(last)
+    assert flux.camera_index(last) == 1
+    dialog.done(0)
@@ -0,0 +1,71 @@
+import cv2
+import numpy as np
+import pytest
+
+from frame_batch import apply_luts, brightness_contrast_lut, process_frames
+
+# (brightness, contrast, saturation, rotation) of each camera
+SETTINGS = [(0, 0, 0, 0), (20, -10, 30, 0), (-15, 25, -40, 90), (20, -10, 30, 0)]
+
+
+def random_frames(count, shape, seed=0):
+    rng = np.random.default_rng(seed)
+    return [rng.integers(0, 256, shape, dtype=np.uint8) for _ in range(count)]
+
+
+def per_camera(widget, frame, to_rgb=False):
+    processed = widget.apply_saturation(widget.apply_brightness_contrast(widget.apply_rotation(frame)))
+    return cv2.cvtColor(processed, cv2.COLOR_BGR2RGB) if to_rgb and processed.ndim == 3 else processed
+
+
+@pytest.fixture
+def widgets(make_flux):
+    widgets = make_flux(len(SETTINGS)).cam_widgets
+    for widget, (brightness, contrast, saturation, rotation) in zip(widgets, SETTINGS):
+        widget.brightness, widget.contrast, widget.saturation = brightness, contrast, saturation
+        widget.rotation_angle = rotation
+    return widgets
+
+
+@pytest.mark.parametrize("to_rgb", [False, True])
+@pytest.mark.parametrize("shape", [(48, 64, 3), (48, 64)])
+def test_batch_matches_the_per_camera_path(widgets, shape, to_rgb):
+    frames = random_frames(len(widgets), shape)
+    originals = [frame.copy() for frame in frames]
+    batched = process_frames(widgets, frames, to_rgb)
+    for widget, frame, result in zip(widgets, frames, batched):
+        expected = per_camera(widget, frame, to_rgb)
+        assert result.shape == expected.shape
+        # Saturation goes through HSV in both paths, rounding may differ by one level
+        assert np.abs(result.astype(int) - expected.astype(int)).max() <= 1
+    # The camera frames are shared with the readers and must not be modified
+    assert all(np.array_equal(frame, original) for frame, original in zip(frames, originals))
+
+
+def test_mixed_frame_sizes_are_grouped(widgets):
+    frames = random_frames(2, (48, 64, 3)) + random_frames(2, (30, 40, 3), seed=1)
+    for widget, frame, result in zip(widgets, frames, process_frames(widgets, frames)):
+        assert np.abs(result.astype(int) - per_camera(widget, frame).astype(int)).max() <= 1
+
+
+def test_images_without_a_table_are_left_unchanged():
+    stack = np.stack(random_frames(3, (8, 8, 3)))
+    original = stack.copy()
+    lut = brightness_contrast_lut(30, 0)
+    apply_luts(stack, [None, lut, None])
+    assert np.array_equal(stack[0], original[0]) and np.array_equal(stack[2], original[2])
+    assert np.array_equal(stack[1], cv2.LUT(original[1], lut))
+
+
+def test_per_image_and_shared_tables():
+    stack = np.stack(random_frames(3, (8, 8)))
+    original = stack.copy()
+    luts = [brightness_contrast_lut(10, 0), brightness_contrast_lut(-10, 20), brightness_contrast_lut(10, 0)]
+    apply_luts(stack, luts)
+    for image, source, lut in zip(stack, original, luts):
+        assert np.array_equal(image, cv2.LUT(source, lut))
+
+    shared = np.stack(random_frames(2, (8, 8, 3)))
+    expected = cv2.LUT(shared, luts[0])
+    apply_luts(shared, [luts[0], luts[0]])
+    assert np.array_equal(shared, expected)
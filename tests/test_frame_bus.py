@@ -0,0 +1,96 @@
+import struct
+import uuid
+from multiprocessing import shared_memory
+
+import numpy as np
+import pytest
+
+from frame_bus import INDEX_SIZE, FrameBus, FrameBusReader, channel_segment_name
+
+
+@pytest.fixture
+def bus_name():
+    return f"mcftest_{uuid.uuid4().hex[:8]}"
+
+
+@pytest.fixture
+def bus(bus_name):
+    bus = FrameBus(bus_name)
+    yield bus
+    bus.close()
+
+
+@pytest.fixture
+def reader(bus, bus_name):
+    reader = FrameBusReader(bus_name)
+    yield reader
+    reader.close()
+
+
+def frame(value, shape=(48, 64, 3)):
+    return np.full(shape, value, dtype=np.uint8)
+
+
+def test_round_trip(bus, reader):
+    bus.publish(0, "Camera 0", frame(7), timestamp=12.5)
+    bus.publish("gray", "Mono", frame(9, (48, 64)))
+    assert reader.channels() == {
+        "0": {"name": "Camera 0", "segment": channel_segment_name(bus.bus_name, "0")},
+        "gray": {"name": "Mono", "segment": channel_segment_name(bus.bus_name, "gray")},
+    }
+
+    result = reader.read(0, copy=True)
+    assert (result.seq, result.name, result.timestamp) == (1, "Camera 0", 12.5)
+    assert np.array_equal(result.image, frame(7))
+    assert np.array_equal(reader.read("gray").image, frame(9, (48, 64)))
+
+
+def test_only_new_frames(bus, reader):
+    bus.publish(0, "Camera 0", frame(1))
+    assert reader.read(0, only_new=True).seq == 1
+    assert reader.read(0, only_new=True) is None
+    bus.publish(0, "Camera 0", frame(2))
+    assert reader.read(0, only_new=True).seq == 2
+
+
+def test_growing_channel_keeps_sequence(bus, reader):
+    bus.publish(0, "Camera 0", frame(1))
+    assert reader.read(0, only_new=True).seq == 1
+    bus.publish(0, "Camera 0", frame(2, (96, 128, 3)))
+    result = reader.read(0, only_new=True, copy=True)
+    assert result.seq == 2
+    assert result.image.shape == (96, 128, 3)
+
+
+def test_slot_being_written_is_not_returned(bus, reader):
+    bus.publish(0, "Camera 0", frame(1))
+    bus.publish(0, "Camera 0", frame(2))
+    assert reader.read(0).seq == 2
+    # The writer lapped the ring and started overwriting the latest slot
+    channel = bus.channels["0"]
+    struct.pack_into("<Q", channel.segment.buf, channel.slot_offset(2 % channel.slots), 2 + channel.slots)
+    assert reader.read(0) is None
+
+
+def test_view_is_invalidated_when_the_ring_laps(bus, reader):
+    bus.publish(0, "Camera 0", frame(1))
+    view = reader.read(0)
+    for value in range(2, 2 + bus.slots - 1):
+        bus.publish(0, "Camera 0", frame(value))
+        assert view.is_valid()
+    bus.publish(0, "Camera 0", frame(99))
+    assert not view.is_valid()
+
+
+def test_stale_segment_is_replaced(bus_name):
+    stale = shared_memory.SharedMemory(name=f"{bus_name}_index", create=True, size=16)
+    stale.close()
+    bus = FrameBus(bus_name)
+    try:
+        assert bus.index.size >= INDEX_SIZE
+        bus.publish(0, "Camera 0", frame(3))
+        reader = FrameBusReader(bus_name)
+        assert reader.channels()["0"]["name"] == "Camera 0"
+        reader.close()
+    finally:
+        bus.close()
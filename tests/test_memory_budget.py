@@ -0,0 +1,74 @@
+import numpy as np
+
+from memory_budget import (LEVEL_DROP_PREVIEWS, LEVEL_NORMAL, LEVEL_SHRINK_BUFFERS, LEVEL_THROTTLE_CAPTURE, MB,
+                           MemoryAccountant, array_bytes)
+
+
+def accountant(limit_mb, usage):
+    memory = MemoryAccountant({"limit_mb": limit_mb})
+    levels = []
+    memory.register("frames", lambda: usage[0], levels.append)
+    return memory, levels
+
+
+def test_array_bytes_ignores_missing_buffers():
+    assert array_bytes(np.zeros(10, dtype=np.uint8), None, np.zeros((2, 3), dtype=np.float32)) == 34
+
+
+def test_degrades_one_step_per_check_while_over_budget():
+    usage = [150 * MB]
+    memory, levels = accountant(100, usage)
+    assert [memory.check() for _ in range(4)] == [LEVEL_DROP_PREVIEWS, LEVEL_SHRINK_BUFFERS,
+                                                  LEVEL_THROTTLE_CAPTURE, LEVEL_THROTTLE_CAPTURE]
+    assert levels == [LEVEL_DROP_PREVIEWS, LEVEL_SHRINK_BUFFERS, LEVEL_THROTTLE_CAPTURE]
+    assert memory.throttling()
+    assert memory.peak == 150 * MB
+
+
+def test_recovers_only_well_under_the_budget():
+    usage = [150 * MB]
+    memory, levels = accountant(100, usage)
+    memory.check()
+    memory.check()
+    # Under the ceiling but above the recovery ratio: the level holds
+    usage[0] = 90 * MB
+    assert memory.check() == LEVEL_SHRINK_BUFFERS
+    usage[0] = 50 * MB
+    assert [memory.check() for _ in range(3)] == [LEVEL_DROP_PREVIEWS, LEVEL_NORMAL, LEVEL_NORMAL]
+    assert levels == [LEVEL_DROP_PREVIEWS, LEVEL_SHRINK_BUFFERS, LEVEL_DROP_PREVIEWS, LEVEL_NORMAL]
+
+
+def test_no_limit_only_tracks_usage():
+    usage = [10 ** 12]
+    memory, levels = accountant(0, usage)
+    assert memory.check() == LEVEL_NORMAL
+    assert levels == []
+    assert "no limit" in memory.report()
+
+
+def test_late_component_gets_the_current_level_and_failures_count_as_zero():
+    usage = [150 * MB]
+    memory, _ = accountant(100, usage)
+    memory.check()
+    late = []
+    memory.register("late", lambda: 1 / 0, late.append)
+    assert late == [LEVEL_DROP_PREVIEWS]
+    assert memory.usage() == {"frames": 150 * MB, "late": 0}
+    memory.unregister("late")
+    assert list(memory.usage()) == ["frames"]
+
+
+def test_widget_drops_offpage_previews_and_throttles_cameras(make_flux):
+    flux = make_flux(6, adaptive_resolution=False)
+    flux.set_wall_setting("page_size", 4)
+    flux.memory.set_level(LEVEL_DROP_PREVIEWS)
+    assert all(widget.original_pixmap is None for widget in flux.cam_widgets[4:])
+    assert all(not cap.cache_full_frames for cap in flux.caps)
+
+    flux.memory.set_level(LEVEL_THROTTLE_CAPTURE)
+    offpage_fps = flux.wall_settings["offpage_fps"]
+    assert all(cap.max_fps == offpage_fps for cap in flux.caps)
+
+    flux.memory.set_level(LEVEL_NORMAL)
+    assert [cap.max_fps for cap in flux.caps] == [0] * 4 + [offpage_fps] * 2
+    assert all(cap.cache_full_frames for cap in flux.caps)
@@ -0,0 +1,48 @@
+import cv2
+import numpy as np
+import pytest
+
+from overlay import (BASELINE, DEFAULT_OVERLAY_SETTINGS, FONT, FONT_SCALE, FONT_THICKNESS, GLYPH_PAD,
+                     LABEL_HEIGHT, GlyphAtlas, label_bitmap, label_image)
+
+
+def put_text(text, width):
+    mask = np.zeros((LABEL_HEIGHT, width), dtype=np.uint8)
+    cv2.putText(mask, text, (GLYPH_PAD, BASELINE), FONT, FONT_SCALE, 255, FONT_THICKNESS)
+    return mask
+
+
+@pytest.mark.parametrize("text", ["2024-01-01 12:34:56", "01/12/2024 09:05", "11:11:11", "Cam 0"])
+def test_atlas_matches_put_text(text):
+    mask = GlyphAtlas().render(text)
+    assert np.array_equal(mask, put_text(text, mask.shape[1]))
+
+
+def test_label_bitmap_matches_put_text_and_is_cached():
+    mask = label_bitmap("Front door")
+    assert np.array_equal(mask, put_text("Front door", mask.shape[1]))
+    assert label_bitmap("Front door") is mask
+
+
+def settings(position, timestamp=False):
+    return dict(DEFAULT_OVERLAY_SETTINGS, position=position, timestamp=timestamp)
+
+
+def test_bar_adds_a_band_under_the_image():
+    frame = np.full((100, 300, 3), 128, dtype=np.uint8)
+    labelled = label_image(frame, "Cam", settings("Bottom bar"))
+    assert labelled.shape == (100 + LABEL_HEIGHT, 300, 3)
+    assert np.array_equal(labelled[:100], frame)
+    band = labelled[100:]
+    assert band.max() == 255 and np.count_nonzero(band == 0) > band.size // 2
+
+
+def test_top_inside_darkens_the_image_under_the_text():
+    frame = np.full((100, 300), 200, dtype=np.uint8)
+    labelled = label_image(frame, "Cam", settings("Top inside", timestamp=True), timestamp="12:00:00")
+    assert labelled.shape == frame.shape
+    assert np.array_equal(labelled[LABEL_HEIGHT:], frame[LABEL_HEIGHT:])
+    band = labelled[:LABEL_HEIGHT]
+    assert band.min() == 200 // 4
+    # Name on the left, timestamp on the right
+    assert band[:, :60].max() == 255 and band[:, -60:].max() == 255
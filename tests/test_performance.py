@@ -0,0 +1,114 @@
+"""
+Performance budgets of the GUI paths, on synthetic 640x480 cameras.
+
+Budgets are deliberately generous so they only catch regressions (an accidental copy per
+pixel, a relayout that rebuilds widgets...). Slow CI machines can scale them with
+MANYCAMFLUX_PERF_SCALE (e.g. 2 doubles every budget).
+"""
+import os
+import statistics
+import time
+
+import pytest
+
+from dialogs import GlobalControlDialog
+
+BUDGET_SCALE = float(os.environ.get("MANYCAMFLUX_PERF_SCALE", "1"))
+CAMERA_COUNTS = [1, 4, 9, 16]
+
+
+def median_ms(function, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def budget(base_ms, per_camera_ms, count):
+    return (base_ms + per_camera_ms * count) * BUDGET_SCALE
+
+
+@pytest.mark.parametrize("count", CAMERA_COUNTS)
+def test_frame_time(make_flux, count):
+    flux = make_flux(count)
+
+    def tick():
+        # Every tile has to be processed and redrawn, as when all cameras deliver a new frame
+        for widget in flux.cam_widgets:
+            widget.invalidate()
+        flux.update_frames()
+
+    tick()
+    elapsed = median_ms(tick, 15)
+    assert all(widget.original_pixmap is not None for widget in flux.cam_widgets)
+    assert elapsed < budget(5, 6, count), f"{count} camera(s): {elapsed:.1f} ms per frame"
+
+
+@pytest.mark.parametrize("count", CAMERA_COUNTS)
+def test_unchanged_frames_are_cheap(make_flux, count):
+    flux = make_flux(count)
+    flux.timer.stop()
+    flux.update_frames()
+    # Without new camera frames nothing is reprocessed
+    for cap in flux.caps:
+        cap.stop()
+    flux.update_frames()
+    elapsed = median_ms(flux.update_frames, 30)
+    assert elapsed < budget(1, 0.1, count), f"{count} camera(s): {elapsed:.2f} ms per idle tick"
+
+
+def test_unchanged_frames_are_not_redrawn(make_flux, monkeypatch):
+    flux = make_flux(2)
+    flux.timer.stop()
+    flux.update_frames()
+    for cap in flux.caps:
+        cap.stop()
+    flux.update_frames()
+    calls = []
+    for widget in flux.cam_widgets:
+        assert not widget.settings_dirty
+        monkeypatch.setattr(widget, "apply_roi", lambda frame: calls.append("apply_roi") or frame)
+        monkeypatch.setattr(widget, "setPixmap", lambda pixmap: calls.append("setPixmap"))
+    for _ in range(5):
+        flux.update_frames()
+    assert calls == []
+
+    # A setting change reprocesses the same camera frame once
+    flux.cam_widgets[0].invalidate()
+    flux.update_frames()
+    flux.update_frames()
+    assert calls.count("apply_roi") == 1 and "setPixmap" in calls
+
+
+@pytest.mark.parametrize("count", CAMERA_COUNTS)
+def test_relayout_time(make_flux, count):
+    flux = make_flux(count)
+    elapsed = median_ms(flux.update_grid_layout, 10)
+    assert elapsed < budget(5, 1, count), f"{count} camera(s): {elapsed:.1f} ms per relayout"
+
+
+@pytest.mark.parametrize("count", CAMERA_COUNTS)
+def test_screenshot_time(make_flux, count):
+    flux = make_flux(count)
+
+    def capture():
+        widgets = flux.get_visible_widgets()
+        flux.compose_screenshot(widgets, flux.capture_tiles(widgets))
+
+    elapsed = median_ms(capture, 5)
+    assert elapsed < budget(5, 4, count), f"{count} camera(s): {elapsed:.1f} ms per composite"
+
+
+@pytest.mark.parametrize("count", CAMERA_COUNTS)
+def test_settings_dialog_open_time(make_flux, count):
+    flux = make_flux(count)
+
+    def open_dialog():
+        dialog = GlobalControlDialog(flux)
+        dialog.deleteLater()
+
+    elapsed = median_ms(open_dialog, 3)
+    # Camera tabs are built on first view, only the first one counts here
+    assert elapsed < budget(20, 1, count), f"{count} camera(s): {elapsed:.1f} ms to build the dialog"
@@ -0,0 +1,75 @@
+import json
+import threading
+import time
+
+import profiler
+from profiler import SamplingProfiler, stage
+
+
+def busy_worker(stop, ready):
+    with stage("export encode"):
+        ready.set()
+        while not stop.is_set():
+            time.sleep(0.001)
+
+
+def test_stages_nest_and_are_cleared():
+    ident = threading.get_ident()
+    with stage("capture tiles"):
+        with stage("dedup hash"):
+            assert profiler._stages[ident] == "dedup hash"
+        assert profiler._stages[ident] == "capture tiles"
+    assert ident not in profiler._stages
+
+    # Left by an exception too
+    try:
+        with stage("catalog"):
+            raise ValueError
+    except ValueError:
+        pass
+    assert ident not in profiler._stages
+
+
+def test_samples_are_written_with_their_stage(tmp_path):
+    stop, ready = threading.Event(), threading.Event()
+    worker = threading.Thread(target=busy_worker, args=(stop, ready), name="Worker")
+    worker.start()
+    ready.wait(5)
+    sampler = SamplingProfiler(str(tmp_path / "profiles"), duration=5.0, interval=0.002)
+    for _ in range(5):
+        sampler._sample(threading.get_ident())
+    sampler.elapsed = 0.01
+    stop.set()
+    worker.join()
+    folded_path, speedscope_path = sampler.write()
+    assert folded_path.endswith(".folded") and speedscope_path.endswith(".speedscope.json")
+
+    with open(folded_path) as folded_file:
+        lines = folded_file.read().splitlines()
+    worker_lines = [line for line in lines if line.startswith("Worker;")]
+    assert worker_lines
+    frames = worker_lines[0].rsplit(" ", 1)[0].split(";")
+    # Thread, then the stage, then the frames from the root of the thread to the leaf
+    assert frames[1] == "[export encode]"
+    assert any(frame.startswith("busy_worker (test_profiler.py:") for frame in frames[2:])
+    assert sum(int(line.rsplit(" ", 1)[1]) for line in worker_lines) == 5
+
+    with open(speedscope_path) as speedscope_file:
+        speedscope = json.load(speedscope_file)
+    assert speedscope["$schema"] == "https://www.speedscope.app/file-format-schema.json"
+    names = [frame["name"] for frame in speedscope["shared"]["frames"]]
+    profile = next(p for p in speedscope["profiles"] if p["name"] == "Worker")
+    assert profile["type"] == "sampled" and profile["unit"] == "seconds"
+    assert len(profile["samples"]) == len(profile["weights"])
+    assert all(names[sample[0]] == "[export encode]" for sample in profile["samples"])
+    # Weights are the sample counts times the average period between samples
+    assert abs(sum(profile["weights"]) - 0.01) < 1e-9
+
+
+def test_profile_runs_for_its_duration(tmp_path):
+    sampler = SamplingProfiler(str(tmp_path), duration=0.05, interval=0.005)
+    sampler.start()
+    sampler.thread.join(5)
+    assert not sampler.is_running()
+    assert sampler.sample_count > 0
+    assert len(sampler.output_paths) == 2
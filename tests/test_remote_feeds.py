@@ -0,0 +1,111 @@
+import json
+import socket
+import time
+
+import cv2
+import numpy as np
+import pytest
+
+from camera_source import STATE_DEGRADED, STATE_OK
+from remote_feeds import (FRAME_HEADER, MAX_NODE_CAMERAS, MSG_FRAME, MSG_HELLO, RemoteFeedServer,
+                          send_message)
+
+
+@pytest.fixture
+def server():
+    server = RemoteFeedServer(port=0, token="secret")
+    server.start()
+    yield server
+    server.stop()
+
+
+def connect(server, cameras=1, token="secret", node="node"):
+    sock = socket.create_connection(("127.0.0.1", server.port), timeout=5)
+    hello = {"node": node, "token": token,
+             "cameras": [{"id": i, "width": 64, "height": 48} for i in range(cameras)]}
+    send_message(sock, MSG_HELLO, json.dumps(hello).encode())
+    return sock
+
+
+def send_frame(sock, camera_id, seq, frame):
+    ok, jpeg = cv2.imencode(".jpg", frame)
+    header = FRAME_HEADER.pack(camera_id, seq, time.time(), frame.shape[1], frame.shape[0])
+    send_message(sock, MSG_FRAME, header + jpeg.tobytes())
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def refused(sock):
+    """True once the server has closed the connection"""
+    try:
+        return sock.recv(1) == b""
+    except ConnectionResetError:
+        return True
+
+
+def test_defaults_to_loopback():
+    assert RemoteFeedServer().host == "127.0.0.1"
+
+
+def test_hello_and_frames_reach_the_source(server):
+    with connect(server, cameras=2) as sock:
+        source = server.new_sources.get(timeout=5)
+        assert server.new_sources.get(timeout=5).index == "node:1"
+        assert source.index == "node:0"
+        assert (source.get(cv2.CAP_PROP_FRAME_WIDTH), source.get(cv2.CAP_PROP_FRAME_HEIGHT)) == (64, 48)
+
+        frame = np.full((48, 64, 3), 200, dtype=np.uint8)
+        send_frame(sock, 0, 1, frame)
+        assert wait_for(lambda: source.seq == 1)
+        ok, received = source.read()
+        assert ok and received.shape == frame.shape
+        assert np.abs(received.astype(int) - 200).max() < 10
+        assert source.state == STATE_OK
+        assert source.link.frames_received == 1
+
+
+def test_reconnect_keeps_source_and_state(server):
+    first = connect(server)
+    source = server.new_sources.get(timeout=5)
+    assert wait_for(lambda: source.state == STATE_OK)
+    first.close()
+    assert wait_for(lambda: source.state == STATE_DEGRADED)
+
+    with connect(server) as second:
+        assert wait_for(lambda: source.state == STATE_OK)
+        assert server.new_sources.empty()
+        send_frame(second, 0, 1, np.zeros((48, 64, 3), dtype=np.uint8))
+        assert wait_for(lambda: source.seq == 1)
+
+
+def test_stale_link_closing_does_not_degrade_new_link(server):
+    first = connect(server)
+    source = server.new_sources.get(timeout=5)
+    assert wait_for(lambda: source.link is not None)
+    old_link = source.link
+
+    with connect(server) as second:
+        assert wait_for(lambda: source.link is not old_link)
+        first.close()
+        assert wait_for(lambda: old_link not in server.links)
+        assert source.state == STATE_OK
+        second.close()
+    assert wait_for(lambda: source.state == STATE_DEGRADED)
+
+
+def test_wrong_token_is_refused(server):
+    with connect(server, token="guess") as sock:
+        assert refused(sock)
+    assert server.new_sources.empty()
+
+
+def test_too_many_cameras_is_refused(server):
+    with connect(server, cameras=MAX_NODE_CAMERAS + 1) as sock:
+        assert refused(sock)
+    assert server.new_sources.empty()
+    assert not server.sources
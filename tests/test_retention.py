@@ -0,0 +1,149 @@
+import os
+import time
+from collections import namedtuple
+
+import retention
+from retention import GB, MANIFEST_NAME_PATTERN, RetentionManager
+
+DiskUsage = namedtuple("DiskUsage", "total used free")
+NOW = time.time()
+
+
+def write(folder, name, size=100, age_days=0.0):
+    path = os.path.join(str(folder), name)
+    with open(path, "wb") as capture_file:
+        capture_file.write(b"\0" * size)
+    mtime = NOW - age_days * 86400
+    os.utime(path, (mtime, mtime))
+    return path
+
+
+def manager(folder, deleted=None, **settings):
+    values = {"max_size_gb": 0.0, "max_age_days": 0, "min_free_gb": 0.0}
+    values.update(settings)
+    return RetentionManager(str(folder), values, on_delete=deleted.extend if deleted is not None else None,
+                            batch_size=2)
+
+
+def enforce(retention_manager):
+    while retention_manager._over_quota():
+        retention_manager._delete_batch()
+
+
+def test_size_quota_deletes_oldest_first(tmp_path):
+    newest = write(tmp_path, "screenshot_20240103_000000.jpg", age_days=1)
+    oldest = write(tmp_path, "screenshot_20240101_000000.jpg", age_days=3)
+    middle = write(tmp_path, "screenshot_20240102_000000_Cam_1.jpg", age_days=2)
+    deleted = []
+    retention_manager = manager(tmp_path, deleted, max_size_gb=250 / GB)
+    retention_manager._scan()
+    assert retention_manager.stats()["bytes"] == 300
+
+    enforce(retention_manager)
+    # Just enough to get back under the quota
+    assert deleted == [oldest]
+    assert os.path.exists(middle) and os.path.exists(newest)
+    assert retention_manager.stats()["bytes"] == 200
+
+
+def test_age_limit_deletes_only_expired_files_in_order(tmp_path):
+    expired = [write(tmp_path, f"screenshot_2024010{day}_000000.jpg", age_days=10 - day) for day in range(1, 5)]
+    kept = write(tmp_path, "screenshot_20240109_000000.jpg", age_days=1)
+    deleted = []
+    retention_manager = manager(tmp_path, deleted, max_age_days=5)
+    retention_manager._scan()
+    enforce(retention_manager)
+    # Two batches of two, oldest first
+    assert deleted == expired
+    assert os.listdir(str(tmp_path)) == [os.path.basename(kept)]
+
+
+def test_record_before_and_after_the_initial_scan(tmp_path):
+    scanned = write(tmp_path, "screenshot_20240101_000000.jpg", age_days=3)
+    retention_manager = manager(tmp_path, max_size_gb=1.0)
+    # Written while the scan runs: kept aside and merged, not counted twice
+    early = write(tmp_path, "screenshot_20240102_000000.jpg", age_days=2)
+    retention_manager.record(early, 100, NOW - 2 * 86400)
+    retention_manager.record(scanned, 100, NOW - 3 * 86400)
+    assert retention_manager.stats()["files"] == 0
+    retention_manager._scan()
+    assert retention_manager.stats()["files"] == 2
+    assert retention_manager.stats()["bytes"] == 200
+
+    # Written after the scan, out of order: still deleted by age
+    retention_manager.record("late_new.jpg", 50, NOW)
+    retention_manager.record("late_old.jpg", 50, NOW - 5 * 86400)
+    assert retention_manager.index[0][1] == "late_old.jpg"
+    assert retention_manager.stats()["bytes"] == 300
+
+
+def test_only_capture_files_and_manifests_are_indexed(tmp_path):
+    names = [
+        "screenshot_20240101_000000.jpg",
+        "screenshot_20240101_000000_Front_door.png",
+        "screenshot_20240101_000000.json",
+        # Scheduled captures name their manifest after the camera
+        "scheduled_20240101_000000_Front_door.json",
+        "notes.txt",
+        "holiday.jpg",
+        "screenshot_2024_000000.json",
+        "ManyCamFlux_catalog.db",
+    ]
+    for name in names:
+        write(tmp_path, name)
+    retention_manager = manager(tmp_path)
+    retention_manager._scan()
+    indexed = sorted(os.path.basename(path) for _, path, _ in retention_manager.index)
+    assert indexed == sorted(names[:4])
+    assert MANIFEST_NAME_PATTERN.match("scheduled_20240101_000000_Cam_1.json")
+    assert not MANIFEST_NAME_PATTERN.match("Screenshot_20240101_000000.json")
+
+
+def test_free_space_pauses_and_resumes_with_margin(tmp_path, monkeypatch):
+    free = [0.5 * GB]
+    monkeypatch.setattr(retention.shutil, "disk_usage", lambda folder: DiskUsage(0, 0, free[0]))
+    retention_manager = manager(tmp_path, min_free_gb=1.0)
+
+    retention_manager.check_free_space()
+    assert not retention_manager.can_capture()
+    # Back over the threshold but within the 10% margin: still paused
+    free[0] = 1.05 * GB
+    retention_manager.check_free_space()
+    assert not retention_manager.can_capture()
+    free[0] = 1.2 * GB
+    retention_manager.check_free_space()
+    assert retention_manager.can_capture()
+    free[0] = 0.99 * GB
+    retention_manager.check_free_space()
+    assert not retention_manager.can_capture()
+
+    retention_manager.settings["min_free_gb"] = 0
+    retention_manager.check_free_space()
+    assert retention_manager.can_capture()
+
+
+def test_background_thread_enforces_recorded_files(tmp_path):
+    deleted = []
+    retention_manager = manager(tmp_path, deleted, max_size_gb=150 / GB)
+    retention_manager.interval = 0.05
+    retention_manager.start()
+    try:
+        first = write(tmp_path, "screenshot_20240101_000000.jpg")
+        retention_manager.record(first, 100, NOW - 10)
+        second = write(tmp_path, "screenshot_20240101_000001.jpg")
+        retention_manager.record(second, 100, NOW)
+        deadline = time.monotonic() + 5
+        while not deleted and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert deleted == [first]
+    finally:
+        retention_manager.stop()
+
+
+def test_scan_counts_hard_links_once(tmp_path):
+    first = write(tmp_path, "screenshot_20240101_000000.jpg", size=300)
+    os.link(first, os.path.join(str(tmp_path), "screenshot_20240101_000001.jpg"))
+    retention_manager = manager(tmp_path)
+    retention_manager._scan()
+    assert retention_manager.stats()["files"] == 2
+    assert retention_manager.stats()["bytes"] == 300
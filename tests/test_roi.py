@@ -0,0 +1,87 @@
+import numpy as np
+import pytest
+from PyQt5.QtCore import QRect
+
+from camera_source import CameraSource
+
+# Quadrant colors of the test frame: top-left, top-right, bottom-left, bottom-right
+QUADRANTS = [(255, 0, 0), (0, 255, 0), (0, 0, 255), (255, 255, 255)]
+
+
+def quadrant_frame(width=400, height=300):
+    frame = np.zeros((height, width, 3), dtype=np.uint8)
+    frame[:height // 2, :width // 2] = QUADRANTS[0]
+    frame[:height // 2, width // 2:] = QUADRANTS[1]
+    frame[height // 2:, :width // 2] = QUADRANTS[2]
+    frame[height // 2:, width // 2:] = QUADRANTS[3]
+    return frame
+
+
+@pytest.fixture
+def widget(make_flux, monkeypatch):
+    widget = make_flux(1).cam_widgets[0]
+    monkeypatch.setattr(widget, "pixmap_rect", lambda: QRect(0, 0, 400, 300))
+    return widget
+
+
+@pytest.mark.parametrize("angle, expected", [
+    (0, (0.0, 0.0)),
+    (90, (0.0, 0.5)),
+    (180, (0.5, 0.5)),
+    (270, (0.5, 0.0)),
+])
+def test_selection_follows_the_display_rotation(widget, angle, expected):
+    widget.rotation_angle = angle
+    # Top-left quarter of the tile as displayed
+    roi = widget.selection_to_roi(QRect(0, 0, 201, 151))
+    assert roi == pytest.approx(expected + (0.5, 0.5), abs=0.01)
+
+    # Cropping the camera frame to the ROI then rotating shows what was selected
+    frame = quadrant_frame()
+    displayed = widget.apply_rotation(frame)
+    widget.roi = roi
+    cropped = widget.apply_rotation(widget.apply_roi(frame))
+    h, w = cropped.shape[:2]
+    assert tuple(cropped[h // 2, w // 2]) == tuple(displayed[displayed.shape[0] // 4, displayed.shape[1] // 4])
+
+
+def test_selection_is_relative_to_the_region_shown(widget):
+    widget.roi = (0.5, 0.5, 0.5, 0.5)
+    widget.zoom = 2.0
+    # The zoom shows the centre quarter of the ROI, (0.625, 0.625, 0.25, 0.25)
+    assert widget.selection_to_roi(QRect(0, 0, 401, 301)) == pytest.approx((0.625, 0.625, 0.25, 0.25), abs=0.01)
+    assert widget.selection_to_roi(QRect(200, 150, 201, 151)) == pytest.approx((0.75, 0.75, 0.125, 0.125),
+                                                                                  abs=0.01)
+    # Too small to be meant as a region
+    assert widget.selection_to_roi(QRect(10, 10, 2, 2)) is None
+
+
+def test_preview_size_covers_the_region_shown(widget, monkeypatch):
+    requests = []
+    monkeypatch.setattr(widget.cap, "set_preview_size", lambda w, h: requests.append((w, h)))
+    monkeypatch.setattr(widget, "devicePixelRatioF", lambda: 1.0)
+    monkeypatch.setattr(widget, "width", lambda: 320)
+    monkeypatch.setattr(widget, "height", lambda: 240)
+
+    widget.update_preview_size()
+    widget.rotation_angle = 90
+    widget.update_preview_size()
+    # A region needs more camera pixels for the same tile size
+    widget.roi = (0.0, 0.0, 0.5, 0.25)
+    widget.update_preview_size()
+    widget.rotation_angle = 0
+    widget.roi = None
+    widget.zoom = 2.0
+    widget.update_preview_size()
+    assert requests == [(320, 240), (240, 320), (480, 1280), (640, 480)]
+
+
+def test_preview_scale_is_the_largest_that_covers_the_request():
+    source = CameraSource(0, cap=object())
+    source.full_size = (1920, 1080)
+    source.set_preview_size(480, 270)
+    assert source.preview_scale == 4
+    source.set_preview_size(640, 480)
+    assert source.preview_scale == 2
+    source.set_preview_size(1920, 1080)
+    assert source.preview_scale == 1
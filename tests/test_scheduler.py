@@ -0,0 +1,77 @@
+from datetime import datetime
+
+import pytest
+
+from scheduler import CaptureScheduler, in_window, parse_window, validate_schedule_settings
+
+NOON = datetime(2024, 1, 1, 12, 0)
+
+
+def scheduler(stagger, intervals):
+    scheduler = CaptureScheduler(stagger)
+    for key, interval in intervals.items():
+        scheduler.add(key, key, interval)
+    scheduler.start(now=100.0)
+    return scheduler
+
+
+def test_staggered_phases_are_spread_over_the_interval():
+    schedule = scheduler(True, {"a": 4.0, "b": 4.0, "c": 4.0, "d": 4.0})
+    assert [entry.next_due for entry in schedule.entries.values()] == [100.0, 101.0, 102.0, 103.0]
+    # One camera per tick instead of all four on the first one
+    assert [schedule.due(now=100.0 + t, wall_time=NOON) for t in range(5)] == [["a"], ["b"], ["c"], ["d"], ["a"]]
+
+
+def test_unstaggered_entries_are_due_together():
+    schedule = scheduler(False, {"a": 2.0, "b": 2.0})
+    assert schedule.due(now=100.0, wall_time=NOON) == ["a", "b"]
+    assert schedule.due(now=101.0, wall_time=NOON) == []
+    assert schedule.due(now=102.0, wall_time=NOON) == ["a", "b"]
+
+
+def test_phase_follows_each_interval():
+    schedule = scheduler(True, {"fast": 1.0, "slow": 10.0})
+    assert schedule.entries["fast"].next_due == 100.0
+    assert schedule.entries["slow"].next_due == 105.0
+
+
+def test_missed_periods_are_counted_not_burst():
+    schedule = scheduler(False, {"a": 1.0})
+    assert schedule.due(now=100.0, wall_time=NOON) == ["a"]
+    # GUI busy for 3.5 s: a single capture, three periods missed, cadence kept
+    assert schedule.due(now=104.5, wall_time=NOON) == ["a"]
+    entry = schedule.entries["a"]
+    assert entry.missed == 3
+    assert entry.next_due == 105.0
+
+
+def test_achieved_interval():
+    schedule = scheduler(False, {"a": 2.0})
+    for now in (100.0, 102.0, 104.5):
+        assert schedule.due(now=now, wall_time=NOON) == ["a"]
+        schedule.record("a", now=now)
+    assert schedule.entries["a"].achieved_interval() == pytest.approx(2.25)
+
+
+def test_windows():
+    assert parse_window("") is None
+    assert parse_window("08:30-17:00") == (510, 1020)
+    assert in_window((510, 1020), NOON)
+    assert not in_window((510, 1020), datetime(2024, 1, 1, 17, 0))
+    # Wrapping past midnight
+    assert in_window((22 * 60, 6 * 60), datetime(2024, 1, 1, 23, 30))
+    assert not in_window((22 * 60, 6 * 60), NOON)
+    with pytest.raises(ValueError):
+        validate_schedule_settings({"window": "", "cameras": {"cam": {"window": "8-17"}}})
+    assert parse_window("00:00-23:59") == (0, 1439)
+    for text in ["24:00-06:00", "08:60-17:00", "08:00--1:00", "08:00-17:00-18:00"]:
+        with pytest.raises(ValueError):
+            parse_window(text)
+
+
+def test_out_of_window_entries_are_skipped():
+    schedule = CaptureScheduler(stagger=False)
+    schedule.add("night", "night", 1.0, parse_window("22:00-06:00"))
+    schedule.start(now=0.0)
+    assert schedule.due(now=0.0, wall_time=NOON) == []
+    assert schedule.due(now=1.0, wall_time=datetime(2024, 1, 1, 23, 0)) == ["night"]
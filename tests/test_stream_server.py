@@ -0,0 +1,61 @@
+import urllib.error
+import urllib.request
+
+import cv2
+import numpy as np
+import pytest
+
+from stream_server import BOUNDARY, MJPEGStreamServer
+
+
+@pytest.fixture
+def server():
+    server = MJPEGStreamServer(port=0)
+    server.start()
+    yield server
+    server.stop()
+
+
+def get(server, path):
+    return urllib.request.urlopen(server.url.rstrip("/") + path, timeout=5)
+
+
+def test_defaults_to_loopback(server):
+    assert server.httpd.server_address[0] == "127.0.0.1"
+
+
+def test_snapshot_is_jpeg_of_published_frame(server):
+    frame = np.full((48, 64, 3), (255, 0, 0), dtype=np.uint8)
+    server.publish(0, "Camera 0", frame)
+    with get(server, "/snapshot/0.jpg") as response:
+        assert response.headers["Content-Type"] == "image/jpeg"
+        image = cv2.imdecode(np.frombuffer(response.read(), dtype=np.uint8), cv2.IMREAD_COLOR)
+    assert image.shape == frame.shape
+    assert np.abs(image.astype(int) - frame).max() < 10
+
+
+def test_stream_sends_multipart_parts(server):
+    server.publish(0, "Camera 0", np.zeros((48, 64, 3), dtype=np.uint8))
+    with get(server, "/stream/0.mjpg") as response:
+        assert response.headers["Content-Type"] == f"multipart/x-mixed-replace; boundary={BOUNDARY}"
+        assert response.readline() == f"--{BOUNDARY}\r\n".encode()
+        assert response.readline() == b"Content-Type: image/jpeg\r\n"
+        length = int(response.readline().decode().split(":")[1])
+        assert response.readline() == b"\r\n"
+        jpeg = response.read(length)
+    assert jpeg[:2] == b"\xff\xd8"
+
+
+def test_unknown_stream_is_404(server):
+    with pytest.raises(urllib.error.HTTPError) as error:
+        get(server, "/snapshot/missing.jpg")
+    assert error.value.code == 404
+
+
+def test_index_escapes_camera_names(server):
+    server.publish("a b", "<script>x</script>", np.zeros((8, 8, 3), dtype=np.uint8))
+    with get(server, "/") as response:
+        body = response.read().decode()
+    assert "<script>" not in body
+    assert "&lt;script&gt;x&lt;/script&gt;" in body
+    assert 'href="/stream/a%20b.mjpg"' in body
@@ -0,0 +1,69 @@
+import os
+import threading
+
+import cv2
+import numpy as np
+
+from timelapse import TimelapseBuilder, iter_capture_files
+
+
+def write_captures(folder, count):
+    for i in range(count):
+        frame = np.full((48, 64, 3), i * 10 % 256, dtype=np.uint8)
+        cv2.imwrite(os.path.join(folder, f"screenshot_20240101_0000{i:02d}.jpg"), frame)
+
+
+def test_capture_files_are_listed_in_time_order_by_chunks(tmp_path):
+    write_captures(str(tmp_path), 7)
+    for name in ["screenshot_20240101_000003_Door.jpg", "holiday.jpg", "screenshot_20240101_000003.json"]:
+        (tmp_path / name).write_bytes(b"")
+    expected = [os.path.join(str(tmp_path), f"screenshot_20240101_0000{i:02d}.jpg") for i in range(7)]
+
+    assert list(iter_capture_files(str(tmp_path), chunk_size=3)) == expected
+    assert list(iter_capture_files(str(tmp_path), chunk_size=7)) == expected
+    assert list(iter_capture_files(str(tmp_path), after="screenshot_20240101_000002.jpg", chunk_size=2)) == expected[3:]
+    assert list(iter_capture_files(str(tmp_path), camera="Door", chunk_size=2)) == [
+        os.path.join(str(tmp_path), "screenshot_20240101_000003_Door.jpg")]
+
+
+def test_stop_live_without_start_is_harmless(tmp_path):
+    builder = TimelapseBuilder(str(tmp_path / "out.mp4"))
+    builder.stop_live()
+    builder.start_live()
+    builder.stop_live()
+    builder.stop_live()
+
+
+def test_cancel_before_checkpoint_leaves_no_segments(tmp_path):
+    write_captures(str(tmp_path), 6)
+    output = str(tmp_path / "timelapse.mp4")
+    # Averaging pairs keeps the first file from being a checkpoint
+    builder = TimelapseBuilder(output, average=4)
+    cancel = threading.Event()
+
+    def progress(done, written):
+        if done == 2:
+            cancel.set()
+
+    assert builder.build_from_folder(str(tmp_path), progress=progress, cancel_event=cancel) is False
+    assert not os.path.exists(builder.state_path)
+    assert not [name for name in os.listdir(tmp_path) if ".part" in name]
+
+
+def test_cancelled_build_resumes(tmp_path):
+    write_captures(str(tmp_path), 6)
+    output = str(tmp_path / "timelapse.mp4")
+    cancel = threading.Event()
+
+    def progress(done, written):
+        if done == 3:
+            cancel.set()
+
+    assert TimelapseBuilder(output).build_from_folder(str(tmp_path), progress=progress, cancel_event=cancel) is False
+    assert os.path.exists(output + ".progress.json")
+
+    builder = TimelapseBuilder(output)
+    assert builder.build_from_folder(str(tmp_path)) is True
+    assert builder.frames_written == 6
+    assert os.path.exists(output)
+    assert not os.path.exists(builder.state_path)
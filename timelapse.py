@@ -0,0 +1,323 @@
+import os
+import json
+import heapq
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+from utils import print_debug, print_info, print_error, print_success, print_warning
+from capture_catalog import CAPTURE_NAME_PATTERN
+from capture_export import safe_filename
+from profiler import stage
+
+DEFAULT_TIMELAPSE_SETTINGS = {
+    "fps": 25,
+    "skip": 1,
+    "average": 1,
+}
+
+
+def iter_capture_files(folder, camera=None, after=None, chunk_size=4096):
+    """
+    Yields capture files of a folder in time order. Only chunk_size names are held at a time,
+    the folder is scanned again for each chunk.
+
+    Args:
+        folder (str): Capture folder
+        camera (str): Camera name, or None for the composite images
+        after (str): Only yield files whose name sorts after this one (resume)
+        chunk_size (int): Names sorted per scan
+    """
+    wanted = safe_filename(camera) if camera else None
+
+    def matching_names(cursor):
+        with os.scandir(folder) as entries:
+            for entry in entries:
+                if cursor is not None and entry.name <= cursor:
+                    continue
+                match = CAPTURE_NAME_PATTERN.match(entry.name)
+                if match is not None and match.group("camera") == wanted:
+                    yield entry.name
+
+    cursor = after
+    while True:
+        # Timestamps are zero-padded, so name order is time order
+        names = heapq.nsmallest(chunk_size, matching_names(cursor))
+        for name in names:
+            yield os.path.join(folder, name)
+        if len(names) < chunk_size:
+            return
+        cursor = names[-1]
+
+
+class TimelapseBuilder:
+    """Writes a time-lapse one frame at a time, with frame skipping and averaging"""
+    def __init__(self, output_path, fps=25, skip=1, average=1, frame_size=None, fourcc="mp4v"):
+        self.output_path = output_path
+        self.fps = fps
+        self.skip = max(1, int(skip))
+        self.average = max(1, int(average))
+        self.frame_size = frame_size
+        self.fourcc = fourcc
+
+        self.writer = None
+        self.segment_path = None
+        self.segments = []
+        self.frames_in = 0
+        self.frames_written = 0
+
+        # Running sum of the frames being averaged, the only frame buffer held
+        self.accumulator = None
+        self.accumulated = 0
+
+        self.live_executor = None
+        # Bytes of the live frames queued for the writer thread
+        self.live_pending_bytes = 0
+        self.live_lock = threading.Lock()
+
+    @property
+    def state_path(self):
+        return self.output_path + ".progress.json"
+
+    def add_frame(self, frame):
+        """
+        Feeds one frame. Returns True when a video frame was written.
+        """
+        self.frames_in += 1
+        if (self.frames_in - 1) % self.skip != 0:
+            return False
+
+        if self.frame_size is None:
+            self.frame_size = (frame.shape[1], frame.shape[0])
+        if frame.ndim == 2:
+            frame = cv2.cvtColor(frame, cv2.COLOR_GRAY2BGR)
+        if (frame.shape[1], frame.shape[0]) != self.frame_size:
+            frame = cv2.resize(frame, self.frame_size, interpolation=cv2.INTER_AREA)
+
+        if self.average == 1:
+            self._write(frame)
+            return True
+
+        if self.accumulator is None:
+            self.accumulator = np.zeros((self.frame_size[1], self.frame_size[0], 3), dtype=np.float32)
+        cv2.accumulate(frame, self.accumulator)
+        self.accumulated += 1
+        if self.accumulated < self.average:
+            return False
+
+        self._write(cv2.convertScaleAbs(self.accumulator, alpha=1.0 / self.accumulated))
+        self.accumulator.fill(0)
+        self.accumulated = 0
+        return True
+
+    def _write(self, frame):
+        if self.writer is None:
+            self._open_segment()
+        self.writer.write(frame)
+        self.frames_written += 1
+
+    def _open_segment(self):
+        # Every run writes its own segment, VideoWriter cannot append to a file
+        stem, extension = os.path.splitext(self.output_path)
+        self.segment_path = f"{stem}.part{len(self.segments):03d}{extension}"
+        self.writer = cv2.VideoWriter(self.segment_path, cv2.VideoWriter_fourcc(*self.fourcc),
+                                      self.fps, self.frame_size)
+        if not self.writer.isOpened():
+            raise IOError(f"Cannot open video writer for {self.segment_path}")
+        self.segments.append(self.segment_path)
+        print_debug(f"Time-lapse segment started: {self.segment_path}")
+
+    def load_state(self):
+        """Restores progress of an interrupted build. Returns the last consumed file or None."""
+        if not os.path.exists(self.state_path):
+            return None
+        try:
+            with open(self.state_path, 'r') as state_file:
+                state = json.load(state_file)
+        except Exception as e:
+            print_warning(f"Ignoring unreadable time-lapse progress file: {str(e)}")
+            return None
+        self.segments = [path for path in state["segments"] if os.path.exists(path)]
+        self.frames_in = state["frames_in"]
+        self.frames_written = state["frames_written"]
+        if state.get("frame_size"):
+            self.frame_size = tuple(state["frame_size"])
+        print_info(f"Resuming time-lapse after {state['last_file']} ({self.frames_written} frame(s) written)")
+        return state["last_file"]
+
+    def save_state(self, last_file):
+        state = {
+            "last_file": last_file,
+            "segments": self.segments,
+            "frames_in": self.frames_in,
+            "frames_written": self.frames_written,
+            "frame_size": self.frame_size,
+        }
+        with open(self.state_path, 'w') as state_file:
+            json.dump(state, state_file, indent=4)
+
+    def build_from_folder(self, folder, camera=None, progress=None, cancel_event=None, checkpoint_every=500):
+        """
+        Streams capture files of a folder into the video, resuming a previous run if any
+
+        Args:
+            folder (str): Capture folder
+            camera (str): Camera name, or None for the composite images
+            progress (callable): Called with (files done, output frames written)
+            cancel_event (threading.Event): Set to stop; progress is kept for resuming
+            checkpoint_every (int): Files between two checkpoints (closed segment + saved progress)
+
+        Returns:
+            bool: True if the video was completed, False if cancelled
+        """
+        checkpoint_file = self.load_state()
+        checkpoint_frames_in = self.frames_in
+        done = 0
+        for path in iter_capture_files(folder, camera, after=checkpoint_file):
+            if cancel_event is not None and cancel_event.is_set():
+                # Frames still being averaged are dropped, the resume restarts from the checkpoint
+                self._close_segment()
+                self.frames_in = checkpoint_frames_in
+                if checkpoint_file is not None:
+                    self.save_state(checkpoint_file)
+                    print_info(f"Time-lapse cancelled, progress saved to {self.state_path}")
+                else:
+                    # Nothing to resume from, the next run would overwrite the segments
+                    self._remove_segments()
+                    print_info("Time-lapse cancelled before any progress")
+                return False
+
+            frame = cv2.imread(path)
+            if frame is None:
+                print_warning(f"Skipping unreadable capture: {path}")
+            else:
+                self.add_frame(frame)
+            done += 1
+
+            # Everything up to this file is in the video when no average is pending
+            if self.accumulated == 0:
+                checkpoint_file = os.path.basename(path)
+                checkpoint_frames_in = self.frames_in
+                if done % checkpoint_every == 0:
+                    # A closed segment survives a crash, the next frame starts a new one
+                    self._close_segment()
+                    self.save_state(checkpoint_file)
+            if progress is not None:
+                progress(done, self.frames_written)
+
+        self.finish()
+        return True
+
+    def _close_segment(self):
+        if self.writer is not None:
+            self.writer.release()
+            self.writer = None
+
+    def _remove_segments(self):
+        for segment in self.segments:
+            if os.path.exists(segment):
+                os.remove(segment)
+        self.segments = []
+        self.frames_written = 0
+
+    def finish(self):
+        """Flushes the last partial average and joins the segments into the output file"""
+        if self.accumulated > 0:
+            self._write(cv2.convertScaleAbs(self.accumulator, alpha=1.0 / self.accumulated))
+            self.accumulated = 0
+        self._close_segment()
+
+        if not self.segments:
+            print_warning("Time-lapse has no frames, nothing written")
+        elif len(self.segments) == 1:
+            os.replace(self.segments[0], self.output_path)
+        else:
+            self._concatenate_segments()
+
+        if os.path.exists(self.state_path):
+            os.remove(self.state_path)
+        self.segments = []
+        if self.frames_written:
+            print_success(f"Time-lapse saved: {self.output_path} ({self.frames_written} frame(s))")
+
+    def _concatenate_segments(self):
+        writer = cv2.VideoWriter(self.output_path, cv2.VideoWriter_fourcc(*self.fourcc),
+                                 self.fps, self.frame_size)
+        for segment in self.segments:
+            reader = cv2.VideoCapture(segment)
+            while True:
+                ret, frame = reader.read()
+                if not ret:
+                    break
+                writer.write(frame)
+            reader.release()
+            os.remove(segment)
+        writer.release()
+
+    # Live mode: frames come from the interval capture, written on a background thread
+
+    def start_live(self):
+        self.live_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="Timelapse")
+        print_info(f"Live time-lapse started: {self.output_path}")
+
+    def submit(self, frame):
+        with self.live_lock:
+            self.live_pending_bytes += frame.nbytes
+        self.live_executor.submit(self._add_live_frame, frame)
+
+    def memory_usage(self):
+        return self.live_pending_bytes + (self.accumulator.nbytes if self.accumulator is not None else 0)
+
+    def _add_live_frame(self, frame):
+        try:
+            with stage("timelapse"):
+                self.add_frame(frame)
+        except Exception as e:
+            print_error(f"Failed to add frame to time-lapse: {str(e)}")
+        finally:
+            with self.live_lock:
+                self.live_pending_bytes -= frame.nbytes
+
+    def stop_live(self):
+        if self.live_executor is None:
+            # Never started or already stopped
+            return
+        self.live_executor.submit(self.finish)
+        self.live_executor.shutdown(wait=True)
+        self.live_executor = None
+
+
+class TimelapseJob:
+    """Runs a folder time-lapse build on a background thread"""
+    def __init__(self, builder, folder, camera=None):
+        self.builder = builder
+        self.folder = folder
+        self.camera = camera
+        self.cancel_event = threading.Event()
+        self.files_done = 0
+        self.frames_written = 0
+        self.finished = False
+        self.completed = False
+        self.error = None
+        self.thread = threading.Thread(target=self._run, name="TimelapseBuild", daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    def _progress(self, files_done, frames_written):
+        self.files_done = files_done
+        self.frames_written = frames_written
+
+    def _run(self):
+        try:
+            self.completed = self.builder.build_from_folder(
+                self.folder, self.camera, self._progress, self.cancel_event)
+        except Exception as e:
+            self.error = str(e)
+            print_error(f"Time-lapse build failed: {str(e)}")
+        self.finished = True
@@ -1,14 +1,5 @@
-import cv2
-
-def get_available_cameras(max_cameras=10):
-    """Detects available cameras on the system"""
-    cams = []
-    for i in range(max_cameras):
-        cap = cv2.VideoCapture(i)
-        if cap.isOpened():
-            cams.append(i)
-            cap.release()
-    return cams
+import time
+from contextlib import contextmanager
 
 # ANSI COLORS for terminal output
 class Colors:
@@ -60,4 +51,26 @@ def print_info(message):
     color_print(f"[INFO] {message}", Colors.BLUE)
 
 def print_debug(message):
-    color_print(f"[DEBUG] {message}", Colors.CYAN)
\ No newline at end of file
+    color_print(f"[DEBUG] {message}", Colors.CYAN)
+
+class StartupTimer:
+    """Measures and logs the startup phases, relative to the creation of the timer"""
+    def __init__(self):
+        self.start_time = time.perf_counter()
+        self.phases = []
+
+    def elapsed_ms(self):
+        return (time.perf_counter() - self.start_time) * 1000
+
+    @contextmanager
+    def phase(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = (time.perf_counter() - started) * 1000
+            self.phases.append((name, duration))
+            print_debug(f"Startup phase '{name}': {duration:.0f} ms (at {self.elapsed_ms():.0f} ms)")
+
+    def mark(self, name):
+        print_debug(f"Startup: {name} at {self.elapsed_ms():.0f} ms")